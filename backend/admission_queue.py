@@ -0,0 +1,133 @@
+import asyncio
+import math
+import os
+import threading
+import time as timer
+from collections import deque
+from typing import Callable, List
+
+# Submissions waiting to be committed before new ones get `429 Too Many Requests` (SWIM_ADMISSION_QUEUE)
+queue_capacity = int(os.environ.get("SWIM_ADMISSION_QUEUE", "1024"))
+
+# Most submissions committed together in one batch (SWIM_ADMISSION_BATCH)
+max_batch_size = int(os.environ.get("SWIM_ADMISSION_BATCH", "256"))
+
+
+class QueueFull(Exception):
+    """
+    Raised by `AdmissionQueue.submit` when the queue is at capacity.
+
+    Attributes:
+        retry_after (int): Suggested wait in seconds before retrying (for the Retry-After header).
+    """
+
+    def __init__(self, depth: int, retry_after: int):
+        super().__init__(f"Admission queue is full ({depth} submissions waiting)")
+        self.retry_after = retry_after
+
+
+class AdmissionQueue:
+    """
+    Bounded queue in front of roster writes, drained by one committer thread.
+
+    Requests enqueue their item and await the result; the committer takes everything
+    queued (up to `max_batch`) and hands it to `commit_batch` in one call, so a burst
+    of submissions shares one lock round, one log fsync and one database transaction.
+    There is no artificial delay: a batch is simply whatever arrived while the
+    previous batch was being committed.
+
+    When `capacity` items are already waiting, `submit` fails fast with `QueueFull`
+    instead of queueing, which bounds how long an accepted request can wait.
+    """
+
+    def __init__(self, commit_batch: Callable[[list], list], capacity: int = queue_capacity,
+                 max_batch: int = max_batch_size):
+        self.commit_batch = commit_batch
+        self.capacity = capacity
+        self.max_batch = max_batch
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.committer = None
+
+        # Statistics exposed by `stats()`
+        self.batches = 0
+        self.committed = 0
+        self.rejected = 0
+        self.largest_batch = 0
+        self.seconds_per_item = 0.0  # Moving average of commit time per item, for Retry-After
+
+    def depth(self) -> int:
+        return len(self.pending)
+
+    def retry_after(self) -> int:
+        """
+        Estimates (in whole seconds, at least 1) how long the current queue takes to drain.
+        """
+        return max(1, math.ceil(len(self.pending) * self.seconds_per_item))
+
+    async def submit(self, item):
+        """
+        Queues `item` and waits until its batch was committed.
+
+        Returns:
+            The result `commit_batch` returned for this item.
+
+        Raises:
+            QueueFull: If the queue is at capacity.
+            Exception: Whatever `commit_batch` raised for the batch.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self.condition:
+            if len(self.pending) >= self.capacity:
+                self.rejected += 1
+                raise QueueFull(len(self.pending), self.retry_after())
+            self.pending.append((item, loop, future))
+            if self.committer is None:
+                self.committer = threading.Thread(target=self.commit_loop, name="admission-committer", daemon=True)
+                self.committer.start()
+            self.condition.notify()
+        return await future
+
+    def commit_loop(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                batch = [self.pending.popleft() for _ in range(min(len(self.pending), self.max_batch))]
+
+            started = timer.perf_counter()
+            try:
+                results = self.commit_batch([item for item, _, _ in batch])
+                failure = None
+            except Exception as error:  # Fail every request of the batch, keep serving later ones
+                results, failure = [None] * len(batch), error
+            elapsed = timer.perf_counter() - started
+
+            self.batches += 1
+            self.committed += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.seconds_per_item = 0.8 * self.seconds_per_item + 0.2 * (elapsed / len(batch))
+
+            for (_, loop, future), result in zip(batch, results):
+                loop.call_soon_threadsafe(resolve, future, result, failure)
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self.pending),
+            "capacity": self.capacity,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "committed": self.committed,
+            "rejected": self.rejected,
+            "largest_batch": self.largest_batch,
+            "average_batch": round(self.committed / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+def resolve(future: asyncio.Future, result, failure: Exception = None):
+    if future.done():  # The request was cancelled (client went away)
+        return
+    if failure is not None:
+        future.set_exception(failure)
+    else:
+        future.set_result(result)
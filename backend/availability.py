@@ -0,0 +1,101 @@
+import sys
+from datetime import datetime, time
+from functools import lru_cache
+from typing import Dict, Iterator, List
+
+# Canonical day order of normalized availability (days outside it sort last, by name)
+DAY_ORDER = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+DAY_RANKS = {day: rank for rank, day in enumerate(DAY_ORDER)}
+
+
+def to_time(value) -> time:
+    """
+    Accepts a `datetime.time` or an "H:MM" / "HH:MM" string (as sent by the frontend).
+    """
+    if isinstance(value, time):
+        return value
+    return parse_clock(value)
+
+
+@lru_cache(maxsize=1024)
+def parse_clock(value: str) -> time:
+    """
+    Parses "H:MM" / "HH:MM". Cached: rosters repeat a few dozen distinct times, and
+    strptime dominated building a Student.
+    """
+    return datetime.strptime(value, "%H:%M").time()
+
+
+def canonical_windows(windows: List[dict]) -> List[dict]:
+    """
+    Normalizes availability windows: times parsed, empty windows dropped, and
+    overlapping or touching windows of the same day merged, sorted by day and start.
+
+    Tue 10-12 + Tue 11-13 becomes Tue 10-13, so every (day, hour) slot is expanded
+    once instead of once per window that covers it.
+    """
+    parsed = []
+    for window in windows:
+        start, end = to_time(window["start"]), to_time(window["end"])
+        if start < end:
+            parsed.append((DAY_RANKS.get(window["day"], len(DAY_RANKS)), window["day"], start, end))
+    parsed.sort()
+
+    merged: List[dict] = []
+    for _, day, start, end in parsed:
+        last = merged[-1] if merged else None
+        if last is not None and last["day"] == day and start <= last["end"]:
+            last["end"] = max(last["end"], end)
+        else:
+            merged.append({"day": day, "start": start, "end": end})
+    return merged
+
+
+def hour_masks(windows: List[dict]) -> Dict[str, int]:
+    """
+    Encodes windows as one bitmask per day: bit h is set if the window covers the h:00
+    slot (start.hour <= h < end.hour, the scheduler's expansion). Day order follows `windows`.
+    """
+    masks: Dict[str, int] = {}
+    for window in windows:
+        start_hour, end_hour = window["start"].hour, window["end"].hour
+        if end_hour > start_hour:
+            masks[window["day"]] = masks.get(window["day"], 0) | ((1 << end_hour) - (1 << start_hour))
+    return masks
+
+
+def mask_hours(mask: int) -> Iterator[int]:
+    """
+    Yields the hours set in a day mask, in increasing order.
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def report(count: int = 10000, seed: int = 0):
+    """
+    Prints how much normalization shrinks a synthetic roster's availability.
+    """
+    import random
+    from test_data import random_availability
+
+    for label, repeat_days in (("one window per day", False), ("repeated days (as the form allows)", True)):
+        rng = random.Random(seed)
+        stats = {"windows_sent": 0, "windows_kept": 0, "slots_sent": 0, "slots_kept": 0}
+        for _ in range(count):
+            windows = random_availability(rng, repeat_days)
+            merged = canonical_windows(windows)
+            stats["windows_sent"] += len(windows)
+            stats["windows_kept"] += len(merged)
+            stats["slots_sent"] += sum(max(0, window["end"].hour - window["start"].hour) for window in windows)
+            stats["slots_kept"] += sum(bin(mask).count("1") for mask in hour_masks(merged).values())
+        print(f"{label}: {count} students, {stats['windows_sent']} windows -> {stats['windows_kept']} "
+              f"({1 - stats['windows_kept'] / stats['windows_sent']:.1%} fewer), "
+              f"{stats['slots_sent']} expanded slots -> {stats['slots_kept']} "
+              f"({1 - stats['slots_kept'] / stats['slots_sent']:.1%} fewer)")
+
+
+if __name__ == "__main__":
+    report(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,316 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+import time as timer
+from typing import Dict, List, Optional, Tuple
+
+import http_cache
+import tenants
+from availability import to_time
+from latency_stats import percentile
+
+# Roster / instructor file formats, by extension
+JSON_SUFFIXES = (".json",)
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+CSV_SUFFIXES = (".csv",)
+ROSTER_SUFFIXES = JSON_SUFFIXES + NDJSON_SUFFIXES + CSV_SUFFIXES
+
+# The built-in instructors of `main`, captured by each worker before any roster state is swapped in
+default_instructors: list = []
+
+
+def parse_csv_windows(value: str) -> List[dict]:
+    """
+    Parses the availability column of a CSV row: "Tuesday 10:00-12:00; Wednesday 8:00-9:00".
+    """
+    windows = []
+    for part in value.split(";"):
+        if not part.strip():
+            continue
+        day, _, hours = part.strip().partition(" ")
+        start, _, end = hours.strip().partition("-")
+        windows.append({"day": day, "start": start.strip(), "end": end.strip()})
+    return windows
+
+
+def csv_record(row: Dict[str, str]) -> dict:
+    """
+    Converts a CSV row (name, lesson_type, swim_style, availability; styles separated
+    by "|") into the JSON shape of a student or instructor.
+    """
+    record = {
+        "name": row["name"].strip(),
+        "swim_style": [style.strip() for style in row.get("swim_style", "").split("|") if style.strip()],
+        "availability": parse_csv_windows(row.get("availability", "")),
+    }
+    if row.get("lesson_type"):
+        record["lesson_type"] = row["lesson_type"].strip()
+    return record
+
+
+def read_records(path: str) -> Tuple[List[dict], Optional[List[dict]]]:
+    """
+    Reads a roster or instructor file.
+
+    JSON files hold a list of records or {"students": [...], "instructors": [...]};
+    NDJSON files hold one record per line; CSV files have a header row with
+    name, lesson_type (students only), swim_style and availability columns.
+
+    Returns:
+        tuple: (records, instructors listed in the same JSON file or None).
+
+    Raises:
+        ValueError: If the extension is not one of `ROSTER_SUFFIXES`.
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8", newline="") as source:
+        if suffix in JSON_SUFFIXES:
+            document = json.load(source)
+            if isinstance(document, dict):
+                return document.get("students", []), document.get("instructors")
+            return document, None
+        if suffix in NDJSON_SUFFIXES:
+            return [json.loads(line) for line in source if line.strip()], None
+        if suffix in CSV_SUFFIXES:
+            return [csv_record(row) for row in csv.DictReader(source)], None
+    raise ValueError(f"Unsupported file type: {path} (expected {', '.join(ROSTER_SUFFIXES)})")
+
+
+def build_instructors(records: List[dict]) -> list:
+    from models import Instructor
+    instructors = []
+    for record in records:
+        instructor = Instructor(**record)
+        for window in instructor.availability:
+            window["start"], window["end"] = to_time(window["start"]), to_time(window["end"])
+        instructors.append(instructor)
+    return instructors
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    """
+    Expands directories into the roster files they contain (sorted), keeping files as given.
+    """
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            expanded.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                   if name.lower().endswith(ROSTER_SUFFIXES)))
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def output_paths(roster_paths: List[str], output_directory: str) -> List[str]:
+    """
+    Names the result file of every roster `<stem>.schedule.json`, numbering repeated stems.
+    """
+    seen: Dict[str, int] = {}
+    outputs = []
+    for path in roster_paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        seen[stem] = seen.get(stem, 0) + 1
+        name = stem if seen[stem] == 1 else f"{stem}-{seen[stem]}"
+        outputs.append(os.path.join(output_directory, f"{name}.schedule.json"))
+    return outputs
+
+
+def init_worker():
+    """
+    Pool initializer: isolates the worker's settings and imports `main` once.
+    """
+    global default_instructors
+    tenants.isolate_worker_settings()
+    import main
+    default_instructors = list(main.instructors)
+
+
+def schedule_roster(job: Tuple[str, str, Optional[List[dict]]]) -> dict:
+    """
+    Schedules one roster file with the `main.py` scheduling phases and writes the
+    result to its output file (atomically, via a temporary file).
+
+    Returns:
+        dict: Per-roster statistics, or {"roster", "error"} if the roster failed.
+    """
+    import main
+    from models import Student
+
+    roster_path, output_path, instructor_records = job
+    started = timer.perf_counter()
+    try:
+        records, roster_instructors = read_records(roster_path)
+        roster = [Student(**record) for record in records]
+        if roster_instructors is not None:
+            instructors = build_instructors(roster_instructors)
+        elif instructor_records is not None:
+            instructors = build_instructors(instructor_records)
+        else:
+            instructors = default_instructors
+        parsed = timer.perf_counter()
+
+        state = tenants.new_tenant_state(main, instructors)
+        state["students"] = set(roster)
+        state["students_by_name"] = {student.name: student for student in roster}
+        schedule = tenants.with_tenant_state(main, state, lambda: tenants.tenant_schedule(main))
+        scheduled = timer.perf_counter()
+
+        temporary_path = output_path + ".tmp"
+        with open(temporary_path, "wb") as output:
+            output.write(http_cache.json_bytes({"roster": roster_path, **schedule}))
+        os.replace(temporary_path, output_path)
+        written = timer.perf_counter()
+    except Exception as error:  # One bad file must not stop the other rosters
+        return {"roster": roster_path, "error": f"{type(error).__name__}: {error}"}
+
+    placed = {name for lesson in schedule["assigned_lessons"] for name in lesson["students"]}
+    by_lesson_type: Dict[str, List[int]] = {}
+    for student in state["students"]:
+        counts = by_lesson_type.setdefault(student.lesson_type, [0, 0])
+        counts[0] += student.name in placed
+        counts[1] += 1
+    return {
+        "roster": roster_path,
+        "output": output_path,
+        "students": len(state["students"]),
+        "duplicates": len(roster) - len(state["students"]),
+        "placed": len(placed),
+        "lessons": len(schedule["assigned_lessons"]),
+        "by_lesson_type": by_lesson_type,
+        "parse_s": parsed - started,
+        "schedule_s": scheduled - parsed,
+        "write_s": written - scheduled,
+    }
+
+
+def start_pool(processes: int, hash_seed: int = 0) -> multiprocessing.pool.Pool:
+    """
+    Starts `processes` spawned scheduling workers (see `init_worker`).
+
+    The scheduler breaks ties in the iteration order of the `students` set, which
+    follows string hashing; the workers are started with PYTHONHASHSEED=`hash_seed`
+    so a roster gets the same schedule whichever worker (and run) handles it.
+    """
+    previous_seed = os.environ.get("PYTHONHASHSEED")
+    os.environ["PYTHONHASHSEED"] = str(hash_seed)  # Inherited by the spawned workers
+    try:
+        return multiprocessing.get_context("spawn").Pool(max(1, processes), initializer=init_worker)
+    finally:
+        if previous_seed is None:
+            os.environ.pop("PYTHONHASHSEED")
+        else:
+            os.environ["PYTHONHASHSEED"] = previous_seed
+
+
+def run_batch(roster_paths: List[str], output_directory: str, instructor_records: Optional[List[dict]],
+              processes: int, hash_seed: int = 0, on_result=None) -> List[dict]:
+    """
+    Schedules every roster across `processes` worker processes (see `start_pool`).
+    Results are written as rosters finish (in completion order) and passed to
+    `on_result` as they arrive.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    jobs = [(path, output, instructor_records)
+            for path, output in zip(roster_paths, output_paths(roster_paths, output_directory))]
+
+    results = []
+    pool = start_pool(processes, hash_seed)
+    try:
+        for outcome in pool.imap_unordered(schedule_roster, jobs):
+            results.append(outcome)
+            if on_result is not None:
+                on_result(outcome)
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def build_stats(results: List[dict], elapsed: float, processes: int) -> dict:
+    """
+    Summarizes per-roster results: placement rates (overall and per lesson type) and
+    p50/p99 scheduling times.
+    """
+    succeeded = [result for result in results if "error" not in result]
+    students = sum(result["students"] for result in succeeded)
+    placed = sum(result["placed"] for result in succeeded)
+    schedule_times = sorted(result["schedule_s"] for result in succeeded)
+
+    by_lesson_type: Dict[str, List[int]] = {}
+    for result in succeeded:
+        for lesson_type, (type_placed, type_total) in result["by_lesson_type"].items():
+            counts = by_lesson_type.setdefault(lesson_type, [0, 0])
+            counts[0] += type_placed
+            counts[1] += type_total
+
+    return {
+        "rosters": len(results),
+        "failed": len(results) - len(succeeded),
+        "processes": processes,
+        "elapsed_s": round(elapsed, 3),
+        "rosters_per_s": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "students": students,
+        "placed": placed,
+        "placement_rate": round(placed / students, 4) if students else 0.0,
+        "placement_rate_by_lesson_type": {
+            lesson_type: round(type_placed / type_total, 4)
+            for lesson_type, (type_placed, type_total) in sorted(by_lesson_type.items())
+        },
+        "schedule_p50_ms": round(percentile(schedule_times, 0.50) * 1000, 3),
+        "schedule_p99_ms": round(percentile(schedule_times, 0.99) * 1000, 3),
+        "parse_total_s": round(sum(result["parse_s"] for result in succeeded), 3),
+        "write_total_s": round(sum(result["write_s"] for result in succeeded), 3),
+    }
+
+
+def print_stats(stats: dict):
+    print(f"\n📊 {stats['rosters']} rosters ({stats['failed']} failed) in {stats['elapsed_s']} s "
+          f"with {stats['processes']} processes ({stats['rosters_per_s']} rosters/s)")
+    print(f"   Placed {stats['placed']} of {stats['students']} students ({stats['placement_rate']:.1%})")
+    for lesson_type, rate in stats["placement_rate_by_lesson_type"].items():
+        print(f"   {lesson_type:<18}{rate:>8.1%}")
+    print(f"   Scheduling p50 {stats['schedule_p50_ms']} ms, p99 {stats['schedule_p99_ms']} ms; "
+          f"parsing {stats['parse_total_s']} s, writing {stats['write_total_s']} s in total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule roster files offline, without the HTTP API.")
+    parser.add_argument("rosters", nargs="+",
+                        help="Roster files (.json, .ndjson/.jsonl, .csv) or directories containing them.")
+    parser.add_argument("--instructors", help="Instructor file for every roster (default: the built-in instructors). "
+                                              "A JSON roster with an \"instructors\" list uses that list instead.")
+    parser.add_argument("--out", default="schedules", help="Directory for the <roster>.schedule.json results.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    parser.add_argument("--hash-seed", type=int, default=0,
+                        help="PYTHONHASHSEED of the workers; fixes the scheduler's tie-breaks so runs are reproducible.")
+    parser.add_argument("--stats", action="store_true", help="Print a summary of placement rates and timings.")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON (implies --stats).")
+    args = parser.parse_args()
+
+    roster_paths = expand_paths(args.rosters)
+    instructor_records = read_records(args.instructors)[0] if args.instructors else None
+
+    def report(result: dict):
+        if "error" in result:
+            print(f"❌ {result['roster']}: {result['error']}", file=sys.stderr)
+        elif not args.json:
+            print(f"✅ {result['roster']} -> {result['output']} "
+                  f"({result['placed']}/{result['students']} placed, {result['schedule_s'] * 1000:.1f} ms)")
+
+    started = timer.perf_counter()
+    results = run_batch(roster_paths, args.out, instructor_records, args.processes, args.hash_seed, on_result=report)
+    stats = build_stats(results, timer.perf_counter() - started, args.processes)
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    elif args.stats:
+        print_stats(stats)
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+from collections import deque
+from typing import Dict, List
+
+# Tracing can be switched off with SWIM_TRACE=0. Call sites check `trace_enabled`
+# before building any event, so a disabled trace costs a single attribute lookup.
+trace_enabled = os.environ.get("SWIM_TRACE", "1") != "0"
+
+# Maximum number of events kept in memory. Oldest events are dropped first.
+trace_capacity = int(os.environ.get("SWIM_TRACE_CAPACITY", "4096"))
+
+# Ring buffer of compact events: (run_id, student_name, event, details)
+trace_buffer: deque = deque(maxlen=trace_capacity)
+
+# Incremented once per scheduling run so explanations only cover the latest run
+current_run_id = 0
+
+
+def start_run() -> int:
+    """
+    Marks the beginning of a new scheduling run.
+
+    Events recorded afterwards are tagged with the new run id, which lets
+    `explain_student` ignore leftovers from previous runs still in the buffer.
+
+    Returns:
+        int: The id of the new run.
+    """
+    global current_run_id
+    current_run_id += 1
+    return current_run_id
+
+
+def record(student_name: str, event: str, details: Dict = None):
+    """
+    Appends a single decision event for a student to the ring buffer.
+
+    Callers should guard this with `if decision_trace.trace_enabled:` so that
+    the details dictionary is never built when tracing is off.
+
+    Args:
+        student_name (str): Name of the student the decision concerns.
+        event (str): Short event name (e.g. "bucket", "assigned", "fallback_failed").
+        details (dict): Event-specific fields, kept as-is.
+    """
+    trace_buffer.append((current_run_id, student_name, event, details))
+
+
+def explain_student(student_name: str) -> List[Dict]:
+    """
+    Returns the decision events recorded for a student in the latest run.
+    Not safe against a concurrent run: callers hold the lock scheduling runs under.
+
+    Args:
+        student_name (str): Name of the student to explain.
+
+    Returns:
+        list[dict]: Events in the order they were recorded, oldest first.
+    """
+    return [
+        {"event": event, **(details or {})}
+        for run_id, name, event, details in trace_buffer
+        if run_id == current_run_id and name == student_name
+    ]
+
+
+def clear_trace():
+    """
+    Drops every recorded event, e.g. when the backend restarts.
+    """
+    trace_buffer.clear()
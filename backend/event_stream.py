@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator, Optional
+
+# Seconds between keep-alive comments on an idle stream (keeps proxies from closing it)
+heartbeat_interval = float(os.environ.get("SWIM_SSE_HEARTBEAT", "15"))
+
+# Client reconnect delay sent in the stream's `retry:` field, in milliseconds
+reconnect_delay_ms = 2000
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+def format_event(sequence: int, event: str, payload: dict) -> bytes:
+    """
+    Serializes one server-sent event (`id`, `event` and a single-line JSON `data` field).
+    """
+    data = json.dumps(payload, separators=(",", ":"))
+    return f"id: {sequence}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+class Broadcaster:
+    """
+    Single fan-out point for server-sent events.
+
+    The broadcaster keeps only the latest event, pre-serialized once, and one
+    future that is resolved (and replaced) on every publish. Connections hold no
+    queue of their own: an idle connection is just a coroutine awaiting the shared
+    future, so thousands of them cost one wake-up each per change. A slow client
+    that misses intermediate events simply receives the latest state, which is all
+    a state notification needs.
+
+    `publish` may be called from any thread (e.g. the sync endpoints running in the
+    thread pool); delivery happens on the event loop the first subscriber runs on.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.changed: Optional[asyncio.Future] = None
+        self.sequence = 0
+        self.message: Optional[bytes] = None
+        self.subscribers = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """
+        Attaches the broadcaster to the running event loop (done by the first subscriber).
+        """
+        if self.loop is not loop:
+            self.loop = loop
+            self.changed = loop.create_future()
+
+    def publish(self, event: str, payload: dict):
+        """
+        Replaces the latest event and wakes every connected subscriber. Thread-safe.
+        """
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            self.store(event, payload)  # Nobody is listening yet; the first subscriber gets it
+            return
+        try:
+            loop.call_soon_threadsafe(self.deliver, event, payload)
+        except RuntimeError:  # The loop shut down in the meantime
+            self.store(event, payload)
+
+    def store(self, event: str, payload: dict):
+        self.sequence += 1
+        self.message = format_event(self.sequence, event, payload)
+
+    def deliver(self, event: str, payload: dict):
+        self.store(event, payload)
+        changed, self.changed = self.changed, self.loop.create_future()
+        changed.set_result(None)
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        """
+        Yields the SSE stream of one connection: the reconnect delay, the latest event,
+        then every later event (coalesced to the newest), with keep-alive comments in between.
+        """
+        self.bind(asyncio.get_running_loop())
+        self.subscribers += 1
+        try:
+            yield f"retry: {reconnect_delay_ms}\n\n".encode("utf-8")
+            sent = 0
+            while True:
+                if self.message is not None and self.sequence != sent:
+                    sent = self.sequence
+                    yield self.message
+                    continue
+                # asyncio.wait does not cancel the shared future on timeout (unlike wait_for)
+                done, _ = await asyncio.wait({self.changed}, timeout=heartbeat_interval)
+                if not done:
+                    yield KEEPALIVE
+        finally:
+            self.subscribers -= 1
+
+
+# Process-wide broadcaster used by main.py
+broadcaster = Broadcaster()
@@ -0,0 +1,475 @@
+import os
+import sys
+import time as timer
+from datetime import time
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from availability import DAY_RANKS
+from models import Instructor, Lesson, Student
+from schedule_quality import GROUP_TYPES, FlowNetwork
+
+# Solve `/schedule` exactly (SWIM_EXACT_SOLVER=1) for rosters up to SWIM_EXACT_MAX_STUDENTS students
+exact_enabled = os.environ.get("SWIM_EXACT_SOLVER", "0") == "1"
+exact_max_students = int(os.environ.get("SWIM_EXACT_MAX_STUDENTS", "300"))
+
+# Seconds the search may take (SWIM_EXACT_TIME_LIMIT); afterwards the best schedule found so far is used
+exact_time_limit = float(os.environ.get("SWIM_EXACT_TIME_LIMIT", "2.0"))
+
+# Time limit checks happen every this many search nodes
+check_interval = 64
+
+
+class TimeLimitReached(Exception):
+    pass
+
+
+class SlotOption:
+    """
+    One way to use the instructors of a slot: group lessons (instructor, style) and
+    the instructors left free for private lessons.
+    """
+
+    def __init__(self, groups: List[Tuple[Instructor, str]], free: List[Instructor], covers: int, joins: int,
+                 free_hours: Tuple):
+        self.groups = groups
+        self.free = free
+        self.covers = covers  # Group-type students (bits of `ExactSolver.group`) these lessons can take
+        self.joins = joins  # flexible_private students (bits of `ExactSolver.demand`) who fit into them
+        self.free_hours = free_hours  # ((slot id, styles), count) of free instructors some private student could use
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def bits(mask: int):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class ExactSolver:
+    """
+    Branch-and-bound search for a schedule that places the most students and, among
+    those, uses the fewest lessons (i.e. the largest groups), under the scheduler's
+    rules: one lesson per instructor per slot; a group lesson takes any number of
+    group / flexible_group students with that (day, hour, style) bucket;
+    flexible_private students join a group lesson that fits their window or get a
+    private lesson like private students.
+
+    The search branches, slot by slot, over which styles get a group lesson and which
+    instructors stay free. Given those choices the best private lessons are a max flow
+    (students -> free instructor-hours), so private lessons are never branched on.
+
+    - Bounds: covered group students + every group student still coverable by a later
+      slot + a max flow of the open private demand over the free and undecided
+      instructor-hours (students who could still join a group count in full). A
+      count-only bound is tried first and the flow only when it does not prune.
+    - Memoized subproblems: a state (slot, coverage that later slots could change,
+      joined students, free private hours) reached again with no better partial score
+      is not searched again.
+    - The greedy schedule is the first incumbent, so the result is never worse than it.
+    """
+
+    def __init__(self, students, instructors: List[Instructor]):
+        self.students = sorted(students, key=lambda student: student.name)
+        grid: Dict[Tuple[str, int], Dict[str, Instructor]] = {}
+        for instructor in instructors:
+            for window in instructor.availability:
+                for hour in range(window["start"].hour, window["end"].hour):
+                    grid.setdefault((window["day"], hour), {}).setdefault(instructor.name, instructor)
+        self.group = [student for student in self.students if student.lesson_type in GROUP_TYPES]
+
+        # Slots with the largest group buckets are decided first: they move the bounds the most
+        bucket_sizes: Dict[Tuple[str, int], Dict[str, int]] = {}
+        for student in self.group:
+            for slot in student.availability_slots():
+                if slot in grid:
+                    sizes = bucket_sizes.setdefault(slot, {})
+                    for style in student.swim_style:
+                        sizes[style] = sizes.get(style, 0) + 1
+        self.slots = sorted(grid, key=lambda slot: (-max(bucket_sizes.get(slot, {}).values(), default=0),
+                                                    DAY_RANKS.get(slot[0], len(DAY_RANKS)), slot[0], slot[1]))
+        self.slot_instructors = [list(grid[slot].values()) for slot in self.slots]
+        slot_ids = {slot: slot_id for slot_id, slot in enumerate(self.slots)}
+        teachable = [set().union(*(instructor.swim_style for instructor in slot_instructors))
+                     for slot_instructors in self.slot_instructors]
+
+        self.demand = [student for student in self.students if student.lesson_type in ("private", "flexible_private")]
+
+        # Per slot and style: group students in the bucket / flexible_private students a lesson there fits
+        self.members: List[Dict[str, int]] = [{} for _ in self.slots]
+        self.joiners: List[Dict[str, int]] = [{} for _ in self.slots]
+        for bit, student in enumerate(self.group):
+            for slot in student.availability_slots():
+                slot_id = slot_ids.get(slot)
+                if slot_id is None:
+                    continue
+                for style in student.swim_style:
+                    if style in teachable[slot_id]:
+                        self.members[slot_id][style] = self.members[slot_id].get(style, 0) | (1 << bit)
+
+        # Per private-demand student: the (slot id, instructor styles) hours they could have a private lesson in
+        self.private_options: List[List[Tuple[int, FrozenSet[str]]]] = []
+        for bit, student in enumerate(self.demand):
+            styles = set(student.swim_style)
+            options = []
+            for slot in student.availability_slots():
+                slot_id = slot_ids.get(slot)
+                if slot_id is None:
+                    continue
+                for taught in {frozenset(instructor.swim_style) for instructor in self.slot_instructors[slot_id]}:
+                    if styles & taught:
+                        options.append((slot_id, taught))
+            self.private_options.append(options)
+            if student.lesson_type == "flexible_private":
+                for slot_id in self.group_fits(student, slot_ids):
+                    for style in styles & teachable[slot_id]:
+                        self.joiners[slot_id][style] = self.joiners[slot_id].get(style, 0) | (1 << bit)
+
+        useful_hours = {option for options in self.private_options for option in options}
+        self.options = [self.slot_options(slot_id, useful_hours) for slot_id in range(len(self.slots))]
+
+        # Suffix unions: what slots `slot_id` and later can still cover, join, or host
+        count = len(self.slots)
+        self.group_reach = [0] * (count + 1)
+        self.join_reach = [0] * (count + 1)
+        self.hours_after: List[Dict[Tuple[int, FrozenSet[str]], int]] = [{} for _ in range(count + 1)]
+        self.buckets_after: List[List[int]] = [[] for _ in range(count + 1)]
+        self.spare_after = [0] * (count + 1)  # Instructor-hours of later slots no private student can use
+        for slot_id in range(count - 1, -1, -1):
+            self.buckets_after[slot_id] = list(self.members[slot_id].values()) + self.buckets_after[slot_id + 1]
+            self.spare_after[slot_id] = self.spare_after[slot_id + 1] + sum(
+                (slot_id, frozenset(instructor.swim_style)) not in useful_hours
+                for instructor in self.slot_instructors[slot_id])
+            self.group_reach[slot_id] = self.group_reach[slot_id + 1]
+            for mask in self.members[slot_id].values():
+                self.group_reach[slot_id] |= mask
+            self.join_reach[slot_id] = self.join_reach[slot_id + 1]
+            for style, mask in self.joiners[slot_id].items():
+                if style in self.members[slot_id]:  # A group lesson only opens where group students are
+                    self.join_reach[slot_id] |= mask
+            hours = dict(self.hours_after[slot_id + 1])
+            for instructor in self.slot_instructors[slot_id]:
+                key = (slot_id, frozenset(instructor.swim_style))
+                if key in useful_hours:
+                    hours[key] = hours.get(key, 0) + 1
+            self.hours_after[slot_id] = hours
+
+        self.all_demand = (1 << len(self.demand)) - 1
+        self.best: Tuple[int, int] = (-1, 0)
+        self.best_path: Optional[List[SlotOption]] = None
+        self.path: List[SlotOption] = []
+        self.memo: Dict[tuple, Tuple[int, int]] = {}
+        self.flows: Dict[tuple, int] = {}  # private_flow results, many nodes share demand and hours
+        self.nodes = 0
+        self.deadline = 0.0
+
+    def group_fits(self, student: Student, slot_ids: Dict[Tuple[str, int], int]) -> List[int]:
+        """
+        Slots whose one-hour group lesson lies entirely inside one of the student's
+        windows (the test of `is_student_available_for_lesson`).
+        """
+        fits = []
+        for window in student.availability:
+            for hour in range(window["start"].hour, min(window["end"].hour, 23)):
+                slot_id = slot_ids.get((window["day"], hour))
+                if slot_id is not None and window["start"] <= time(hour, 0) and time(hour + 1, 0) <= window["end"]:
+                    fits.append(slot_id)
+        return fits
+
+    def slot_options(self, slot_id: int, useful_hours: set) -> List[SlotOption]:
+        """
+        Enumerates the distinct ways to split a slot's instructors between group
+        lessons (one per style, only where group students are) and free instructors,
+        most promising first.
+        """
+        instructors = self.slot_instructors[slot_id]
+        members, joiners = self.members[slot_id], self.joiners[slot_id]
+        options: Dict[tuple, SlotOption] = {}
+
+        def assign(position: int, groups: List[Tuple[Instructor, str]], free: List[Instructor]):
+            if position == len(instructors):
+                free_kinds: Dict[FrozenSet[str], int] = {}
+                for instructor in free:
+                    kind = frozenset(instructor.swim_style)
+                    free_kinds[kind] = free_kinds.get(kind, 0) + 1
+                key = (frozenset(style for _, style in groups), tuple(sorted(
+                    (tuple(sorted(kind)), count) for kind, count in free_kinds.items())))
+                if key not in options:
+                    covers = joins = 0
+                    for _, style in groups:
+                        covers |= members[style]
+                        joins |= joiners.get(style, 0)
+                    free_hours = tuple(sorted(((slot_id, kind), count) for kind, count in free_kinds.items()
+                                              if (slot_id, kind) in useful_hours))
+                    options[key] = SlotOption(list(groups), list(free), covers, joins, free_hours)
+                return
+            instructor = instructors[position]
+            used = {style for _, style in groups}
+            for style in instructor.swim_style:
+                if style in members and style not in used:
+                    assign(position + 1, groups + [(instructor, style)], free)
+            assign(position + 1, groups, free + [instructor])
+
+        assign(0, [], [])
+        return sorted(options.values(), key=lambda option: (-popcount(option.covers), len(option.groups)))
+
+    def private_flow(self, pending: int, hours: Dict[Tuple[int, FrozenSet[str]], int], joinable: int = 0) -> int:
+        """
+        Max number of `pending` students placeable in private lessons on `hours`
+        (plus, for bounds, `joinable` students who may still join a group lesson).
+        Students with the same usable hours share one node.
+        """
+        key = (pending, joinable, frozenset(hours.items()))
+        flow = self.flows.get(key)
+        if flow is None:
+            flow = self.flows[key] = self.compute_private_flow(pending, hours, joinable)
+        return flow
+
+    def compute_private_flow(self, pending: int, hours: Dict[Tuple[int, FrozenSet[str]], int], joinable: int) -> int:
+        classes: Dict[tuple, int] = {}
+        for bit in bits(pending):
+            if joinable >> bit & 1:
+                key = ("join",)
+            else:
+                key = tuple(option for option in self.private_options[bit] if option in hours)
+                if not key:
+                    continue
+            classes[key] = classes.get(key, 0) + 1
+        if not classes:
+            return 0
+
+        hour_nodes = {key: 3 + position for position, key in enumerate(hours)}
+        network = FlowNetwork(3 + len(hours) + len(classes))
+        network.add_edge(2, 1, len(self.demand))  # Node 2: joining a group lesson, no capacity limit
+        for key, capacity in hours.items():
+            network.add_edge(hour_nodes[key], 1, capacity)
+        for position, (key, count) in enumerate(classes.items()):
+            node = 3 + len(hours) + position
+            network.add_edge(0, node, count)
+            if key == ("join",):
+                network.add_edge(node, 2, count)
+            else:
+                for option in key:
+                    network.add_edge(node, hour_nodes[option], count)
+        return network.max_flow(0, 1)
+
+    def search(self, slot_id: int, covered: int, joined: int, free: tuple, lessons: int):
+        self.nodes += 1
+        if self.nodes % check_interval == 0 and timer.perf_counter() > self.deadline:
+            raise TimeLimitReached()
+
+        if slot_id == len(self.slots):
+            hours: Dict[Tuple[int, FrozenSet[str]], int] = {}
+            for key, count in free:
+                hours[key] = hours.get(key, 0) + count
+            private = self.private_flow(self.all_demand & ~joined, hours)
+            score = (popcount(covered) + popcount(joined) + private, -(lessons + private))
+            if score > self.best:
+                self.best = score
+                self.best_path = list(self.path)
+            return
+
+        # Bounds: count-only first, the max flow only if that does not prune
+        placed = popcount(covered) + popcount(joined)
+        reachable = popcount(self.group_reach[slot_id] & ~covered)
+        pending = self.all_demand & ~joined
+        joinable = pending & self.join_reach[slot_id]
+        hours = dict(self.hours_after[slot_id])
+        for key, count in free:
+            hours[key] = hours.get(key, 0) + count
+        useful = sum(hours.values())
+        sizes = sorted((popcount(mask & ~covered) for mask in self.buckets_after[slot_id]), reverse=True)
+        gains = [0]
+        for size in sizes:
+            if not size or gains[-1] >= reachable:
+                break
+            gains.append(min(reachable, gains[-1] + size))
+        bound = (placed, lessons, gains, popcount(joinable), useful, self.spare_after[slot_id])
+        if self.pruned(*bound, popcount(joinable) + min(popcount(pending & ~joinable), useful)):
+            return
+        if self.pruned(*bound, self.private_flow(pending, hours, joinable)):
+            return
+
+        state = (slot_id, covered & self.group_reach[slot_id], joined, free)
+        partial = (popcount(covered), -lessons)
+        seen = self.memo.get(state)
+        if seen is not None and partial <= seen:
+            return
+        self.memo[state] = partial
+
+        for option in self.options[slot_id]:
+            # A lesson that takes no new student is dominated by leaving its instructor free
+            if any(not (self.members[slot_id][style] & ~covered or self.joiners[slot_id].get(style, 0) & pending)
+                   for _, style in option.groups):
+                continue
+            self.path.append(option)
+            self.search(slot_id + 1, covered | option.covers, joined | (option.joins & pending),
+                        free + option.free_hours, lessons + len(option.groups))
+            self.path.pop()
+
+    def pruned(self, placed: int, lessons: int, gains: List[int], joinable: int, useful: int, spare: int,
+               private: int) -> bool:
+        """
+        True if no completion can beat the incumbent (more students, or as many in fewer lessons).
+
+        With x more group lessons, at most `gains[x]` more group students are covered
+        (the x largest uncovered buckets), and every lesson beyond the `spare` hours
+        no private student can use takes one of the `useful` private hours, so at most
+        min(private, joinable + useful - that) students get a private lesson or join
+        a group (`private` is the max flow bound, joinable students included).
+        """
+        best_placed, best_lessons = self.best[0], -self.best[1]
+        need = best_placed - placed
+        fewest = None
+        for extra_groups, group in enumerate(gains):
+            private_bound = min(private, joinable + max(0, useful - max(0, extra_groups - spare)))
+            total = group + private_bound
+            if total > need:
+                return False
+            if total == need:
+                # A tie takes every one of these placements: the non-joining ones are private lessons
+                needed = extra_groups + max(0, private_bound - joinable)
+                fewest = needed if fewest is None else min(fewest, needed)
+        return fewest is None or lessons + fewest >= best_lessons
+
+    def solve(self, incumbent: Tuple[int, int], time_limit: float) -> bool:
+        """
+        Searches for a schedule better than `incumbent` (placed, -lessons).
+
+        Returns:
+            bool: True if the search finished (the result is optimal), False if the
+            time limit cut it short (the result is the best one found).
+        """
+        self.best = incumbent
+        self.deadline = timer.perf_counter() + time_limit
+        try:
+            self.search(0, 0, 0, (), 0)
+        except TimeLimitReached:
+            return False
+        return True
+
+    def lessons(self) -> Tuple[List[Lesson], List[Lesson]]:
+        """
+        Turns the best search path into (assigned, unassigned) lessons, numbered like
+        `compute_schedule` numbers them.
+        """
+        assigned: List[Lesson] = []
+        planned = []  # (group members, flexible_private joiners, lesson)
+        free_hours: List[Tuple[int, Instructor]] = []
+        for slot_id, option in enumerate(self.best_path):
+            day, hour = self.slots[slot_id]
+            for instructor, style in option.groups:
+                lesson = Lesson(lesson_id=0, lesson_type="group", swim_style=style, students=[],
+                                instructor=instructor, day=day, start_time=time(hour, 0), end_time=time(hour + 1, 0))
+                planned.append((self.members[slot_id][style], self.joiners[slot_id].get(style, 0), lesson))
+                assigned.append(lesson)
+            free_hours.extend((slot_id, instructor) for instructor in option.free)
+
+        # Largest buckets claim their students first, then flexible_private students join the first lesson that fits
+        claimed = joined = 0
+        for covers, _, lesson in sorted(planned, key=lambda item: -popcount(item[0])):
+            lesson.students = [self.group[bit] for bit in bits(covers & ~claimed)]
+            claimed |= covers
+        for _, joins, lesson in planned:
+            lesson.students.extend(self.demand[bit] for bit in bits(joins & ~joined))
+            joined |= joins
+
+        # Private lessons: max flow of the remaining demand over the free instructor-hours, per student
+        pending = [bit for bit in bits(self.all_demand & ~joined)]
+        network = FlowNetwork(2 + len(pending) + len(free_hours))
+        hour_nodes = {}
+        for position, (slot_id, instructor) in enumerate(free_hours):
+            hour_nodes.setdefault((slot_id, frozenset(instructor.swim_style)), []).append(2 + len(pending) + position)
+            network.add_edge(2 + len(pending) + position, 1, 1)
+        student_edges = []
+        for position, bit in enumerate(pending):
+            network.add_edge(0, 2 + position, 1)
+            for option in self.private_options[bit]:
+                for node in hour_nodes.get(option, ()):
+                    student_edges.append((bit, node, len(network.edges)))
+                    network.add_edge(2 + position, node, 1)
+        network.max_flow(0, 1)
+
+        matched = set()
+        for bit, node, edge in student_edges:
+            if network.edges[edge][1] == 0:
+                student = self.demand[bit]
+                slot_id, instructor = free_hours[node - 2 - len(pending)]
+                day, hour = self.slots[slot_id]
+                style = next(style for style in student.swim_style if style in instructor.swim_style)
+                assigned.append(Lesson(lesson_id=0, lesson_type="private", swim_style=style, students=[student],
+                                       instructor=instructor, day=day, start_time=time(hour, 0),
+                                       end_time=time(hour, 45)))
+                matched.add(bit)
+
+        placed = {id(student) for lesson in assigned for student in lesson.students}
+        unassigned = [Lesson(lesson_id=0, lesson_type=student.lesson_type, swim_style=", ".join(student.swim_style),
+                             students=[student])
+                      for student in self.students if id(student) not in placed]
+        assigned.sort(key=lambda lesson: (DAY_RANKS.get(lesson.day, len(DAY_RANKS)), lesson.day, lesson.start_time,
+                                          lesson.instructor.name))
+        for lesson_id, lesson in enumerate(assigned + unassigned):
+            lesson.lesson_id = lesson_id
+        return assigned, unassigned
+
+
+def schedule_score(assigned: List[Lesson]) -> Tuple[int, int]:
+    """
+    (students placed, -lessons) of a list of assigned lessons, the order the solver maximizes.
+    """
+    return sum(len(lesson.students) for lesson in assigned), -len(assigned)
+
+
+def solve(students, instructors: List[Instructor], greedy_assigned: List[Lesson],
+          time_limit: float = None) -> Tuple[Optional[Tuple[List[Lesson], List[Lesson]]], dict]:
+    """
+    Runs the exact search, seeded with the greedy schedule, for `time_limit` seconds
+    (default SWIM_EXACT_TIME_LIMIT).
+
+    Returns:
+        tuple: ((assigned, unassigned) lessons, or None if the greedy schedule is
+        already the best found) and the solver statistics for the `solver` block.
+    """
+    started = timer.perf_counter()
+    solver = ExactSolver(students, instructors)
+    greedy = schedule_score(greedy_assigned)
+    optimal = solver.solve(greedy, exact_time_limit if time_limit is None else time_limit)
+    result = solver.lessons() if solver.best_path is not None else None
+    placed, lessons = solver.best
+    return result, {
+        "mode": "exact",
+        "optimal": optimal,
+        "improved": result is not None,
+        "greedy_placed": greedy[0],
+        "greedy_lessons": -greedy[1],
+        "placed": placed,
+        "lessons": -lessons,
+        "nodes": solver.nodes,
+        "elapsed_ms": round((timer.perf_counter() - started) * 1000, 3),
+    }
+
+
+def benchmark(count: int = 100, seed: int = 0, time_limit: float = None):
+    """
+    Prints greedy vs. exact placement for a synthetic roster.
+    """
+    import main
+    from test_data import generate_students
+
+    main.students = set(generate_students(count, seed=seed))
+    main.students_by_name = {student.name: student for student in main.students}
+    schedule = main.compute_schedule()
+    _, stats = solve(main.students, main.instructors,
+                     [lesson for lesson in main.assigned_lessons], time_limit)
+    print(f"{count} students (seed {seed}): greedy {stats['greedy_placed']} placed in {stats['greedy_lessons']} "
+          f"lessons, exact {stats['placed']} in {stats['lessons']} ({'optimal' if stats['optimal'] else 'time limit'}, "
+          f"{stats['nodes']} nodes, {stats['elapsed_ms']:.0f} ms); bound {schedule['quality']['upper_bound']}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+              int(sys.argv[2]) if len(sys.argv) > 2 else 0,
+              float(sys.argv[3]) if len(sys.argv) > 3 else exact_time_limit)
@@ -0,0 +1,72 @@
+from typing import Dict, List, Optional, Tuple
+
+from models import Instructor, Student
+from roster_store import parse_hhmm
+from schedule_lookup import ScheduleLookup
+
+
+class FeasibilityIndex:
+    """
+    Precomputed coverage of the instructor grid, used to precheck a prospective
+    student without running the scheduler.
+
+    `coverage` maps (day, hour) -> swim style -> instructors who teach that style in
+    that slot (the same hourly grid `initialize_time_slots` builds). A precheck is one
+    dict lookup per (availability hour, style), so its cost depends only on the
+    size of the student's own availability.
+    """
+
+    def __init__(self, instructors: List[Instructor]):
+        self.instructors = instructors
+        self.coverage: Dict[Tuple[str, int], Dict[str, List[str]]] = {}
+        for instructor in instructors:
+            for availability in instructor.availability:
+                for hour in range(availability["start"].hour, availability["end"].hour):
+                    styles = self.coverage.setdefault((availability["day"], hour), {})
+                    for style in instructor.swim_style:
+                        styles.setdefault(style, []).append(instructor.name)
+
+    def options(self, student: Student) -> List[dict]:
+        """
+        Lists the (day, hour, instructor, style) slots that could host a lesson for `student`.
+
+        This is the set of buckets the scheduler can place the student in; whether a
+        slot is still free depends on the other students in the next `/schedule` run.
+        """
+        options = []
+        for day, hour in student.availability_slots():
+            styles = self.coverage.get((day, hour))
+            if not styles:
+                continue
+            for style in student.swim_style:
+                for instructor in styles.get(style, ()):
+                    options.append({"day": day, "hour": hour, "start_time": f"{hour:02d}:00",
+                                    "instructor": instructor, "swim_style": style})
+        return options
+
+
+def joinable_group_lessons(student: Student, lookups: Optional[ScheduleLookup]) -> List[dict]:
+    """
+    Lists the group lessons of the latest schedule that teach one of the student's
+    styles and fit entirely inside one of their availability windows (the same test
+    the flexible_private fallback uses to merge a student into a group lesson).
+
+    Only flexible_private students are ever merged into a group lesson; for any other
+    lesson type the list is empty.
+    """
+    if lookups is None or student.lesson_type != "flexible_private":
+        return []
+
+    lessons = []
+    seen = set()
+    styles = set(student.swim_style)
+    for availability in student.availability:
+        day, start, end = availability["day"], availability["start"], availability["end"]
+        for hour in range(start.hour, end.hour + 1):
+            for lesson in lookups.slot_lessons(day, hour):
+                if lesson["lesson_type"] != "group" or lesson["swim_style"] not in styles or id(lesson) in seen:
+                    continue
+                if start <= parse_hhmm(lesson["start_time"]) and parse_hhmm(lesson["end_time"]) <= end:
+                    seen.add(id(lesson))
+                    lessons.append(lesson)
+    return lessons
@@ -0,0 +1,53 @@
+import hashlib
+import json
+from typing import Optional, Union
+
+from fastapi import Response
+
+Body = Union[bytes, memoryview]
+
+
+def json_bytes(payload) -> bytes:
+    """
+    Serializes a JSON-compatible payload the way FastAPI's JSONResponse does (compact, UTF-8).
+    """
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body: Body) -> str:
+    """
+    Returns a strong ETag derived from the response body, so it stays valid across restarts.
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires for
+    If-None-Match; "*" matches any current representation).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_json(if_none_match: Optional[str], body: Body, etag: str = None, headers: dict = None,
+                     media_type: str = "application/json") -> Response:
+    """
+    Returns `304 Not Modified` if the client already has `etag`, or the JSON body otherwise.
+
+    Args:
+        if_none_match (str | None): The request's If-None-Match header.
+        body (bytes | memoryview): The serialized JSON body; sent without copying.
+        etag (str): Precomputed ETag of `body` (computed from the body if omitted).
+        headers (dict): Extra response headers.
+        media_type (str): Content type of `body` (for negotiated non-JSON representations).
+    """
+    etag = etag or make_etag(body)
+    headers = {**(headers or {}), "ETag": etag}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
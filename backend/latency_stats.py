@@ -0,0 +1,11 @@
+from typing import List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of an already sorted list (0.0 if empty).
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import json
+import random
+import time as timer
+from typing import Dict, List
+
+import httpx
+
+from latency_stats import percentile
+from models import Student
+from test_data import generate_students
+
+# Relative weight of each endpoint in the generated traffic
+DEFAULT_MIX = {"submit_student": 4, "len_students": 3, "students": 2, "schedule": 1}
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """
+    Parses a traffic mix such as "submit_student=4,schedule=1" into a weight dictionary.
+
+    Raises:
+        ValueError: If an endpoint is unknown or a weight is not a positive integer.
+    """
+    mix = {}
+    for part in value.split(","):
+        endpoint, _, weight = part.strip().partition("=")
+        if endpoint not in DEFAULT_MIX:
+            raise ValueError(f"Unknown endpoint in mix: {endpoint}")
+        if not weight.isdigit() or int(weight) <= 0:
+            raise ValueError(f"Weight for {endpoint} must be a positive integer")
+        mix[endpoint] = int(weight)
+    return mix
+
+
+def student_payload(student: Student) -> dict:
+    """
+    Converts a Student into the JSON body the frontend sends to `/submit_student`.
+    """
+    return {
+        "name": student.name,
+        "lesson_type": student.lesson_type,
+        "swim_style": student.swim_style,
+        "availability": [
+            {"day": slot["day"], "start": slot["start"].strftime("%H:%M"), "end": slot["end"].strftime("%H:%M")}
+            for slot in student.availability
+        ],
+    }
+
+
+async def run_load(client: httpx.AsyncClient, total_requests: int, concurrency: int,
+                   mix: Dict[str, int], roster: List[Student], seed: int) -> Dict[str, List[tuple]]:
+    """
+    Sends `total_requests` requests with at most `concurrency` in flight.
+
+    The endpoint sequence is drawn up front from `mix` using `seed`, and submissions
+    walk through `roster` in order, so two runs with the same arguments send the
+    same traffic.
+
+    Returns:
+        dict: {endpoint: [(latency_seconds, ok), ...]}
+    """
+    rng = random.Random(seed)
+    endpoints = rng.choices(list(mix), weights=list(mix.values()), k=total_requests)
+    payloads = [student_payload(student) for student in roster]
+    results = {endpoint: [] for endpoint in mix}
+    next_request = 0
+    next_student = 0
+
+    async def worker():
+        nonlocal next_request, next_student
+        while next_request < total_requests:
+            endpoint = endpoints[next_request]
+            next_request += 1
+
+            started = timer.perf_counter()
+            try:
+                if endpoint == "submit_student":
+                    payload = payloads[next_student % len(payloads)]
+                    next_student += 1
+                    response = await client.post("/submit_student", json=payload)
+                else:
+                    response = await client.get(f"/{endpoint}")
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            results[endpoint].append((timer.perf_counter() - started, ok))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+def build_report(results: Dict[str, List[tuple]], elapsed: float) -> dict:
+    """
+    Summarizes raw results into throughput, p50/p99 latency (ms) and error rate,
+    per endpoint and overall.
+    """
+    def summarize(samples: List[tuple]) -> dict:
+        latencies = sorted(latency for latency, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            "requests": len(samples),
+            "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        }
+
+    all_samples = [sample for samples in results.values() for sample in samples]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": summarize(all_samples),
+        "endpoints": {endpoint: summarize(samples) for endpoint, samples in results.items()},
+    }
+
+
+def print_report(report: dict):
+    print(f"\n⏱️  Elapsed: {report['elapsed_s']} s")
+    print(f"{'endpoint':<16}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for endpoint, stats in rows:
+        print(f"{endpoint:<16}{stats['requests']:>10}{stats['throughput_rps']:>10}"
+              f"{stats['p50_ms']:>10}{stats['p99_ms']:>10}{stats['error_rate']:>9.2%}")
+
+
+async def main_async(args) -> dict:
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    roster = generate_students(args.students, seed=args.seed)
+
+    if args.url:
+        # Drive a running server, e.g. `uvicorn main:app --port 8000`
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        # Drive the FastAPI app in-process; start from the same clean state as a fresh server
+        import main
+        main.reset_data_on_startup()
+        if args.max_students:
+            main.max_students = args.max_students
+        # Unhandled app exceptions become 500s so they show up in the error rate
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport,
+                                   base_url="http://loadtest", timeout=args.timeout)
+
+    async with client:
+        started = timer.perf_counter()
+        results = await run_load(client, args.requests, args.concurrency, mix, roster, args.seed)
+        elapsed = timer.perf_counter() - started
+
+    return build_report(results, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the swimming scheduler API.")
+    parser.add_argument("--url", help="Base URL of a running server. Omit to run the app in-process.")
+    parser.add_argument("--requests", type=int, default=1000, help="Total number of requests to send.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once.")
+    parser.add_argument("--mix", help="Traffic mix, e.g. 'submit_student=4,len_students=3,students=2,schedule=1'.")
+    parser.add_argument("--students", type=int, default=200, help="Size of the synthetic roster to submit.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the roster and the request sequence.")
+    parser.add_argument("--max-students", type=int, default=None,
+                        help="In-process only: override main.max_students for the run.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,36 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time as timer
 import uvicorn
-from fastapi import FastAPI
-from typing import List
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Dict, List
 from fastapi.middleware.cors import CORSMiddleware
-from models import Instructor, Student, Lesson
+from models import Instructor, Student, Lesson, SimulationRequest, TermRequest
 from test_data import test_students
+import decision_trace
+import roster_store
+import submission_log
+import schedule_index
+import shared_schedule
+import http_cache
+import schedule_history
+import event_stream
+import response_encoding
+import schedule_lookup
+import feasibility
+import admission_queue
+import tenants
+import simulation
+import multi_start
+import schedule_quality
+import exact_solver
+import occupancy
+import term_schedule
+import traffic_recorder
 from datetime import datetime, time
 
 # Initialize FastAPI app
@@ -16,11 +43,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods (GET, POST, etc.)
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["ETag", "X-Schedule-Version"],  # Let browser clients read cache validators
 )
 
+# Opt-in recording of API traffic for `traffic_replay.py` (SWIM_RECORD_TRAFFIC=<file.ndjson>)
+traffic_log = traffic_recorder.open_recording()
+if traffic_log is not None:
+    app.add_middleware(traffic_recorder.TrafficRecorder, recording=traffic_log)
+
 # Global Constants and Variables
 
-max_students = 30  # Maximum number of students allowed in the system
+# Maximum number of students allowed in the system (SWIM_MAX_STUDENTS, default 30)
+max_students = int(os.environ.get("SWIM_MAX_STUDENTS", "30"))
 
 # Dictionary that will hold time slot structure: {day: {hour: {instructors, students}}}
 time_slots = {}
@@ -28,6 +62,67 @@ time_slots = {}
 # Temporary storage for students before scheduling
 students: set[Student] = set()
 
+# Same students keyed by name, used to resolve names returned by the roster indexes
+students_by_name: Dict[str, Student] = {}
+
+# Persistent roster (SWIM_ROSTER_BACKEND=sqlite), or None to keep students in memory only
+roster_db = roster_store.open_roster()
+
+# Append-only log of roster changes (SWIM_LOG_DIR), or None when durability is off
+durable_log = submission_log.open_log()
+
+# Precomputed slot grid + per-student buckets (see schedule_index.py), built or mapped lazily
+scheduling_index: schedule_index.ScheduleIndex = None
+
+# Multi-start runs (see multi_start.py): seed of the tie-break perturbation, 0 keeps the scheduler's own order
+schedule_seed = 0
+
+# Random rank per student name breaking `assigning_score` ties in the private phases (None: set order)
+student_ranks: Dict[str, float] = None
+
+# Multi-worker mode (SWIM_SHARED_DIR): every worker reads the published buffer,
+# the worker holding the writer lock also computes and publishes schedules
+published_reader: shared_schedule.PublishedReader = None
+writer_lock_file = None
+synced_roster_id = 0  # Newest roster id already loaded into `students` by the writer
+
+# Incremented on every roster or instructor change; cached responses are only valid for one version.
+# Starts from the clock so schedule versions handed to clients are not reused after a restart.
+state_version = timer.time_ns() // 1000
+
+# Guards the roster and the scheduling state (`students`, `time_slots`, the lessons, instructor
+# bookings): held while a schedule or roster response is built and while either of them changes
+state_lock = threading.RLock()
+
+# Held while the exact solver improves a schedule outside `state_lock`, so concurrent
+# `/schedule` requests wait for that one search instead of starting their own
+exact_lock = threading.Lock()
+
+# Serialized responses for the current state:
+# {endpoint: (state_version, etag, JSON body, payload, {(media type, coding): encoded variant})}
+response_cache: Dict[str, tuple] = {}
+
+# Multi-worker readers: encoded variants of published sections, {section: (version, variants)}
+published_variants: Dict[str, tuple] = {}
+
+# Recent schedule versions as lesson deltas, for `/schedule/changes`
+schedule_versions = schedule_history.ScheduleHistory()
+
+# Lookup indexes (per instructor / student / slot) over the current schedule
+current_lookup: schedule_lookup.ScheduleLookup = None
+
+# Instructor slot / style coverage for `/feasibility`, rebuilt when the instructor list is replaced
+feasibility_index: feasibility.FeasibilityIndex = None
+
+# Multi-worker readers: views derived from the published buffer, {name: (published version, view)}
+published_views: Dict[str, tuple] = {}
+
+# Multi-worker mode: per-worker task turning roster/published-version changes into events
+shared_state_watcher: asyncio.Task = None
+
+# True once the instructor list was replaced at runtime (and must be kept in the log snapshot)
+instructors_changed = False
+
 # Predefined list of instructors and their swim styles + availability
 instructors = [
     Instructor(
@@ -141,7 +236,8 @@ def assign_students_to_slots(lesson_type_filter):
 
     This function updates the global `time_slots` structure by assigning
     students to swim-style-specific lists under matching time slots.
-    It only processes students whose lesson type is in `lesson_type_filter`.
+    It only processes students whose lesson type is in `lesson_type_filter`; with the
+    scheduling index, those come straight from its lesson type partitions.
 
     Args:
         lesson_type_filter (List[str]): A list of allowed lesson types to filter students (e.g. ["group", "private"]).
@@ -151,36 +247,217 @@ def assign_students_to_slots(lesson_type_filter):
     """
     global students, time_slots
 
-    for student in students:
+    if scheduling_index is not None:
+        # Styles still teachable at each indexed slot, for this phase (slots shrink between phases)
+        live_masks = live_style_masks(scheduling_index)
+        candidates = scheduling_index.phase_members(lesson_type_filter)
+    else:
+        live_masks = None
+        candidates = ((student, None) for student in phase_candidates(lesson_type_filter))
+
+    for student, entries in candidates:
         if student.lesson_type not in lesson_type_filter:
             continue  # Skip students who don't match the lesson type
 
-        for availability in student.availability:
-            day = availability["day"]
-            start_hour = availability["start"].hour
-            end_hour = availability["end"].hour
+        # Buckets (day, hour, style) the student entered, only collected when tracing
+        entered_buckets = [] if decision_trace.trace_enabled else None
+
+        # Fast path: reuse the precomputed availability expansion
+        if entries is not None:
+            enter_indexed_buckets(student, entries, live_masks, entered_buckets)
+            availability_slots = ()
+        else:
+            availability_slots = student.availability_slots()
 
+        # Each (day, hour) comes once from the canonical availability, even if windows overlapped
+        for day, hour in availability_slots:
             # Ensure the day exists in the time_slots structure
             if day in time_slots:
-                for hour in range(start_hour, end_hour):
-                    time_str = f"{hour}:00"
+                time_str = f"{hour}:00"
 
-                    # Check if the time slot exists
-                    if time_str in time_slots[day]:
+                # Check if the time slot exists
+                if time_str in time_slots[day]:
+
+                    valid_slot = False  # Used to count assigning_score only once per slot
+
+                    for swim_style in student.swim_style:  # Iterate over each swim style separately
+                        # Check if any instructor at this slot supports the swim style
+                        instructors_at_slot = time_slots[day][time_str]["instructors"]
+                        if any(swim_style in instructor.swim_style for instructor in instructors_at_slot):
+                            # Assign the student
+                            time_slots[day][time_str]["students"][swim_style].append(student)
+                            valid_slot = True
+                            if entered_buckets is not None:
+                                entered_buckets.append((day, time_str, swim_style))
+                    if valid_slot:
+                        student.assigning_score += 1  # Counted once per time slot
+
+        if entered_buckets is not None:
+            if entered_buckets:
+                decision_trace.record(student.name, "buckets_entered", {
+                    "phase": lesson_type_filter,
+                    "buckets": [f"{d} {h} {style}" for d, h, style in entered_buckets],
+                    "assigning_score": student.assigning_score,
+                })
+            else:
+                decision_trace.record(student.name, "no_buckets", {
+                    "phase": lesson_type_filter,
+                    "reason": "No instructor slot matches both the student's availability and swim styles",
+                })
 
-                        valid_slot = False  # Used to count assigning_score only once per slot
+    return time_slots
 
-                        for swim_style in student.swim_style:  # Iterate over each swim style separately
-                            # Check if any instructor at this slot supports the swim style
-                            instructors_at_slot = time_slots[day][time_str]["instructors"]
-                            if any(swim_style in instructor.swim_style for instructor in instructors_at_slot):
-                                # Assign the student
-                                time_slots[day][time_str]["students"][swim_style].append(student)
-                                valid_slot = True
-                        if valid_slot:
-                            student.assigning_score += 1  # Counted once per time slot
 
-    return time_slots
+def live_style_masks(index: schedule_index.ScheduleIndex) -> List[int]:
+    """
+    Returns, per indexed slot id, the bitmask of styles that at least one instructor
+    still present at that slot can teach (0 if the slot was already removed).
+    """
+    masks = []
+    for day, time_str, _ in index.slots:
+        slot = time_slots.get(day, {}).get(time_str)
+        mask = 0
+        if slot is not None:
+            for instructor in slot["instructors"]:
+                for style in instructor.swim_style:
+                    mask |= schedule_index.STYLE_BITS.get(style, 0)
+        masks.append(mask)
+    return masks
+
+
+def enter_indexed_buckets(student: Student, entries, live_masks: List[int], entered_buckets: list = None):
+    """
+    Index-based equivalent of the availability loop in `assign_students_to_slots`.
+
+    Each entry is one canonical (day, hour) on a grid slot; the student enters
+    every requested style still teachable there, and `assigning_score` grows by one
+    per entry that had at least one such style.
+    """
+    slots = scheduling_index.slots
+    for entry in entries:
+        slot_id = entry >> 4
+        mask = entry & 0xF & live_masks[slot_id]
+        if not mask:
+            continue
+        day, time_str, _ = slots[slot_id]
+        slot_students = time_slots[day][time_str]["students"]
+        for position, swim_style in enumerate(schedule_index.STYLES):
+            if mask & (1 << position):
+                slot_students[swim_style].append(student)
+                if entered_buckets is not None:
+                    entered_buckets.append((day, time_str, swim_style))
+        student.assigning_score += 1
+
+
+def ensure_scheduling_index():
+    """
+    Makes `scheduling_index` match the current instructor grid and roster.
+
+    Called right after `reset_state()`, while `time_slots` is still the full grid.
+    In order of preference: keep the current index (also when the grid only lost
+    slots it covers, e.g. a term week with exceptions), memory-map the snapshot at
+    `SWIM_INDEX_SNAPSHOT`, or rebuild from scratch. Students submitted since the
+    snapshot was written are folded in and the snapshot is refreshed.
+
+    The index stays attached to the `students` set (its lesson type partitions hold
+    those Student objects); it is re-attached only when the set is replaced.
+    """
+    global scheduling_index
+
+    slots = schedule_index.grid_slots(time_slots)
+    fingerprint = schedule_index.grid_fingerprint(slots)
+    if scheduling_index is None or (scheduling_index.fingerprint != fingerprint and not scheduling_index.covers(slots)):
+        scheduling_index = schedule_index.load_index(schedule_index.index_snapshot_path, time_slots)
+
+    if scheduling_index is not None and scheduling_index.roster is not students:
+        scheduling_index.attach(students)
+
+    # The roster only grows between startups, so a size mismatch means the index is stale
+    if scheduling_index is None or len(scheduling_index) != len(students):
+        scheduling_index = schedule_index.build_index(time_slots, submission_order())
+        scheduling_index.attach(students)
+    elif not scheduling_index.extra_entries:
+        return
+
+    if schedule_index.index_snapshot_path:
+        scheduling_index.save(schedule_index.index_snapshot_path)
+        reloaded = schedule_index.load_index(schedule_index.index_snapshot_path, time_slots)
+        reloaded.adopt_partitions(scheduling_index)
+        scheduling_index = reloaded
+    elif scheduling_index.extra_entries:
+        scheduling_index = scheduling_index.merged()
+
+
+def submission_order():
+    """
+    Returns the roster in the order scheduling phases should visit it: submission
+    order with the SQLite roster (the order `phase_candidates` returns), otherwise
+    the iteration order of `students`.
+    """
+    if roster_db is not None and len(students_by_name) == len(students):
+        return list(students_by_name.values())
+    return students
+
+
+def perturb_tie_breaks(seed: int):
+    """
+    Reorders the scheduler's ties for the multi-start run `seed`.
+
+    The greedy phases take the first largest (group) or smallest (private) slot in
+    `time_slots` order, the first instructor at that slot who teaches the style, and
+    any of the slot's students with the lowest `assigning_score`. This shuffles the
+    days, hours and per-slot instructors of `time_slots` and ranks every student at
+    random to break `assigning_score` ties. Everything derives from `seed` alone, so
+    a seed reproduces its schedule for the same roster and instructors.
+    """
+    global time_slots, student_ranks
+
+    rng = random.Random(seed)
+    days = list(time_slots.items())
+    rng.shuffle(days)
+    shuffled = {}
+    for day, slots in days:
+        hours = list(slots.items())
+        rng.shuffle(hours)
+        for _, slot in hours:
+            rng.shuffle(slot["instructors"])
+        shuffled[day] = dict(hours)
+    time_slots = shuffled
+    student_ranks = {name: rng.random() for name in sorted(student.name for student in students)}
+
+
+def open_buckets():
+    """
+    Lists every (day, hour, swim_style) bucket in `time_slots` that at least one
+    instructor at that slot can teach.
+
+    Returns:
+        list[tuple]: (day, hour as int, swim_style) triples.
+    """
+    buckets = []
+    for day, slots in time_slots.items():
+        for time_str, details in slots.items():
+            hour = int(time_str.split(":")[0])
+            for swim_style in details["students"]:
+                if any(swim_style in instructor.swim_style for instructor in details["instructors"]):
+                    buckets.append((day, hour, swim_style))
+    return buckets
+
+
+def phase_candidates(lesson_type_filter):
+    """
+    Returns the students a scheduling phase should consider when there is no
+    scheduling index (the index partitions students by lesson type itself).
+
+    With the SQLite roster, the candidate set is pulled pre-filtered from the roster
+    indexes (lesson type + open day/hour/style buckets), so students who could never
+    enter a bucket are not visited. Otherwise (or when the in-memory set is not the
+    persisted roster, e.g. test data), the whole `students` set is returned.
+    """
+    if roster_db is not None and len(students_by_name) == len(students):
+        names = roster_db.candidate_names(lesson_type_filter, open_buckets())
+        return [students_by_name[name] for name in names if name in students_by_name]
+    return students
 
 
 def assign_group_lessons_from_slots():
@@ -223,13 +500,18 @@ def assign_group_lessons_from_slots():
         if not max_group:
             break
 
-        # Step 3: Find the first available instructor at that slot who can teach this style
+        # Step 3: Find the first instructor at that slot who can teach this style and is free all hour
+        start_hour_int = int(max_hour.split(":")[0])
+        start, end = time(start_hour_int, 0), time(start_hour_int + 1, 0)
         instructors = time_slots[max_day][max_hour]["instructors"]
         instructor_for_lesson = next(
-            (instr for instr in instructors if max_style in instr.swim_style), None)
+            (instr for instr in instructors if max_style in instr.swim_style and instr.is_free(max_day, start, end)),
+            None)
+        if instructor_for_lesson is None:
+            time_slots[max_day][max_hour]["students"][max_style] = []  # Nobody can teach this bucket any more
+            continue
 
         # Step 4: Create a new group lesson
-        start_hour_int = int(max_hour.split(":")[0])
         new_lesson = Lesson(
             lesson_id=len(assigned_lessons),
             lesson_type="group",
@@ -237,20 +519,24 @@ def assign_group_lessons_from_slots():
             students=max_group,
             instructor=instructor_for_lesson,
             day=max_day,
-            start_time=time(start_hour_int, 0),
-            end_time=time(start_hour_int + 1, 0)
+            start_time=start,
+            end_time=end
         )
+        instructor_for_lesson.book(new_lesson)
 
         # Assign this lesson to each student in the group
         for student in max_group:
             student.assigned_lesson = new_lesson
+            if decision_trace.trace_enabled:
+                decision_trace.record(student.name, "assigned", trace_lesson_details(new_lesson))
 
         # Step 5: Add the lesson to the assigned list
         assigned_lessons.append(new_lesson)
 
         # Step 6: Remove these students from the time slot to prevent reassignment
         students_to_remove = time_slots[max_day][max_hour]["students"][max_style].copy()
-        modify_assigned_slots(max_day, max_hour, max_style, instructor_for_lesson, students_to_remove)
+        modify_assigned_slots(max_day, max_hour, max_style, instructor_for_lesson, students_to_remove,
+                              consumed_by=new_lesson)
 
 
 def assign_private_lessons_from_slots():
@@ -299,22 +585,34 @@ def assign_private_lessons_from_slots():
         for group in selected_slot["students"].values():
             unique_students.update(group)
 
-        selected_student = min(unique_students, key=lambda s: s.assigning_score)
+        if student_ranks is None:
+            selected_student = min(unique_students, key=lambda s: s.assigning_score)
+        else:
+            selected_student = min(unique_students, key=lambda s: (s.assigning_score, student_ranks[s.name]))
 
-        # Step 3: Find a swim style that both the student wants and an instructor at this slot can teach
+        # Step 3: Find a swim style that both the student wants and a free instructor at this slot can teach
+        start_hour_int = int(selected_time.split(":")[0])
+        start, end = time(start_hour_int, 0), time(start_hour_int, 45)
         instructor_for_lesson = None
         selected_style = None
         for style in selected_student.swim_style:
             instructor_for_lesson = next(
-                (instr for instr in selected_slot["instructors"] if style in instr.swim_style),
+                (instr for instr in selected_slot["instructors"]
+                 if style in instr.swim_style and instr.is_free(selected_day, start, end)),
                 None)
 
             if instructor_for_lesson:
                 selected_style = style
                 break
 
+        if instructor_for_lesson is None:
+            # No free instructor for any of the student's styles: drop the student from this slot only
+            for group in selected_slot["students"].values():
+                if selected_student in group:
+                    group.remove(selected_student)
+            continue
+
         # Step 4: Create a private lesson (45 minutes) for the selected student
-        start_hour_int = int(selected_time.split(":")[0])
         new_lesson = Lesson(
             lesson_id=len(assigned_lessons),
             lesson_type="private",
@@ -322,21 +620,25 @@ def assign_private_lessons_from_slots():
             students=[selected_student],
             instructor=instructor_for_lesson,
             day=selected_day,
-            start_time=time(start_hour_int, 0),
-            end_time=time(start_hour_int, 45)
+            start_time=start,
+            end_time=end
         )
 
         # Record the lesson
+        instructor_for_lesson.book(new_lesson)
         assigned_lessons.append(new_lesson)
         selected_student.assigned_lesson = new_lesson
+        if decision_trace.trace_enabled:
+            decision_trace.record(selected_student.name, "assigned", trace_lesson_details(new_lesson))
 
         # Step 5: Remove this student from the slot to avoid duplicate assignments
         modify_assigned_slots(selected_day, selected_time, selected_style,
-                              instructor_for_lesson, [selected_student])
+                              instructor_for_lesson, [selected_student], consumed_by=new_lesson)
 
 
 def modify_assigned_slots(day: str, time_str: str, swim_style: str,
-                          instructor_used: Instructor, students_to_remove: List[Student]):
+                          instructor_used: Instructor, students_to_remove: List[Student],
+                          consumed_by: Lesson = None):
     """
     Updates the time_slots structure after assigning a lesson (group or private).
 
@@ -346,6 +648,8 @@ def modify_assigned_slots(day: str, time_str: str, swim_style: str,
     - swim_style: Swim style that was just assigned (used to clean up).
     - instructor_used: Instructor assigned to this lesson.
     - students_to_remove: List of students who have been assigned and should be removed from slots.
+    - consumed_by: The lesson that was just created, recorded in the decision trace
+      for students who lose this slot.
 
     Steps:
     1. Remove the assigned students from *all* time slots (regardless of time/style).
@@ -364,6 +668,8 @@ def modify_assigned_slots(day: str, time_str: str, swim_style: str,
 
     # Step 2: If this instructor was the only one, delete the entire slot
     if len(slot["instructors"]) == 1:
+        if decision_trace.trace_enabled:
+            trace_lost_buckets(day, time_str, list(slot["students"]), consumed_by)
         del time_slots[day][time_str]
         return
 
@@ -378,17 +684,53 @@ def modify_assigned_slots(day: str, time_str: str, swim_style: str,
     for instr in slot["instructors"]:
         remaining_styles.update(instr.swim_style)
 
+    cleared_styles = [style for style in slot["students"] if style not in remaining_styles]
+    if decision_trace.trace_enabled and cleared_styles:
+        trace_lost_buckets(day, time_str, cleared_styles, consumed_by)
+
     for style in list(slot["students"].keys()):
         if style not in remaining_styles:
             slot["students"][style] = []
 
 
+def trace_lost_buckets(day: str, time_str: str, styles: List[str], consumed_by: Lesson = None):
+    """
+    Records, for every student still waiting in the given slot styles, that the bucket
+    is gone and which lesson consumed it.
+
+    Must be called before the slot lists are cleared.
+    """
+    slot = time_slots[day][time_str]
+    lesson_id = consumed_by.lesson_id if consumed_by else None
+    for style in styles:
+        for student in slot["students"].get(style, []):
+            decision_trace.record(student.name, "bucket_lost", {
+                "bucket": f"{day} {time_str} {style}",
+                "consumed_by_lesson": lesson_id,
+                "consumed_by_instructor": consumed_by.instructor.name if consumed_by and consumed_by.instructor else None,
+            })
+
+
+def trace_lesson_details(lesson: Lesson) -> dict:
+    """
+    Returns the compact lesson description stored in "assigned" trace events.
+    """
+    return {
+        "lesson_id": lesson.lesson_id,
+        "lesson_type": lesson.lesson_type,
+        "swim_style": lesson.swim_style,
+        "instructor": lesson.instructor.name if lesson.instructor else None,
+        "day": lesson.day,
+        "start_time": lesson.start_time.strftime("%H:%M") if lesson.start_time else None,
+    }
+
+
 def remove_students_from_their_slots(students_to_remove: List[Student]):
     """
     Removes the specified students from all relevant time slots.
 
-    Iterates over each student's availability and removes them from all swim style groups
-    in the matching time slots.
+    Iterates over each student's (canonical) availability slots and removes them from all
+    swim style groups in the matching time slots.
 
     Parameters:
     - students_to_remove: List of Student objects to remove from slots.
@@ -396,24 +738,19 @@ def remove_students_from_their_slots(students_to_remove: List[Student]):
     global time_slots
 
     for student in students_to_remove:
-        for availability in student.availability:
-            day = availability["day"]
-            start_hour = availability["start"].hour
-            end_hour = availability["end"].hour
+        # Go through every hour the student is available for
+        for day, hour in student.availability_slots():
+            time_str = f"{hour}:00"
 
-            # Go through every hour in their availability window
-            for hour in range(start_hour, end_hour):
-                time_str = f"{hour}:00"
-
-                # Check that the day and time exist in the schedule
-                if day in time_slots and time_str in time_slots[day]:
-                    slot = time_slots[day][time_str]
+            # Check that the day and time exist in the schedule
+            if day in time_slots and time_str in time_slots[day]:
+                slot = time_slots[day][time_str]
 
-                    # Remove the student from all swim style lists within that slot
-                    for swim_style in slot["students"]:
-                        slot["students"][swim_style] = [
-                            s for s in slot["students"][swim_style] if s != student
-                        ]
+                # Remove the student from all swim style lists within that slot
+                for swim_style in slot["students"]:
+                    slot["students"][swim_style] = [
+                        s for s in slot["students"][swim_style] if s != student
+                    ]
 
 
 def is_student_available_for_lesson(student: Student, lesson: "Lesson") -> bool:
@@ -466,17 +803,31 @@ def assign_flexible_private_fallback():
 
     for student in students:
         if student.assigned_lesson is None:
+            style_matches = 0  # Group lessons with a matching style, used to explain failures
+
             # First attempt: merge flexible_private into group lessons
             if student.lesson_type == "flexible_private":
                 for lesson in assigned_lessons:
                     if lesson.lesson_type == "group" and lesson.swim_style in student.swim_style:
+                        style_matches += 1
                         if is_student_available_for_lesson(student, lesson):
                             lesson.students.append(student)
                             student.assigned_lesson = lesson
+                            if decision_trace.trace_enabled:
+                                decision_trace.record(student.name, "fallback_joined", trace_lesson_details(lesson))
                             break
 
             # Fallback: create an unassigned lesson entry
             if student.assigned_lesson is None:
+                if decision_trace.trace_enabled:
+                    if student.lesson_type != "flexible_private":
+                        reason = f"Only flexible_private students can fall back to a group lesson (type: {student.lesson_type})"
+                    elif style_matches == 0:
+                        reason = "No group lesson teaches any of the student's swim styles"
+                    else:
+                        reason = f"{style_matches} group lesson(s) match the swim style but none fit the availability"
+                    decision_trace.record(student.name, "fallback_failed", {"reason": reason})
+
                 new_lesson = Lesson(
                     lesson_id=len(assigned_lessons) + len(unassigned_lessons),
                     lesson_type=student.lesson_type,
@@ -487,39 +838,516 @@ def assign_flexible_private_fallback():
                 student.assigned_lesson = new_lesson
 
 
+def use_exact_schedule() -> dict:
+    """
+    Runs the exact solver (see `exact_solver`) on the current roster, seeded with the
+    greedy lessons, and replaces them if it found a better schedule within
+    SWIM_EXACT_TIME_LIMIT seconds.
+
+    Returns:
+        dict: The solver statistics, returned with the schedule as `solver`.
+    """
+    result, stats = exact_solver.solve(*exact_inputs())
+    install_exact_schedule(result)
+    return stats
+
+
+def exact_inputs() -> tuple:
+    """
+    Returns (students, instructors, greedy lessons) for `exact_solver.solve`, copied so
+    the search can run without `state_lock` (the solver only reads names, styles and
+    availability, which never change on a stored student or instructor).
+    """
+    with state_lock:
+        return list(students), list(instructors), list(assigned_lessons)
+
+
+def exact_eligible() -> bool:
+    return exact_solver.exact_enabled and len(students) <= exact_solver.exact_max_students
+
+
+def install_exact_schedule(result):
+    """
+    Replaces the greedy lessons and instructor bookings with the exact solver's
+    `result` ((assigned, unassigned) lessons), if it found a better schedule.
+    """
+    if result is None:
+        return
+    assigned_lessons[:], unassigned_lessons[:] = result
+    for instructor in instructors:
+        instructor.clear_bookings()
+    for lesson in assigned_lessons:
+        lesson.instructor.book(lesson)
+    for lesson in assigned_lessons + unassigned_lessons:
+        for student in lesson.students:
+            student.assigned_lesson = lesson
+            if decision_trace.trace_enabled:
+                decision_trace.record(student.name, "exact_solver", trace_lesson_details(lesson))
+
+
+def student_record(student: Student) -> dict:
+    """
+    Returns the JSON-friendly fields of a student stored in the submission log.
+    """
+    return {
+        "name": student.name,
+        "lesson_type": student.lesson_type,
+        "swim_style": student.swim_style,
+        "availability": roster_store.serialize_availability(student.availability),
+    }
+
+
+def student_row(student: Student) -> list:
+    """
+    Returns a student as a compact row for the log snapshot:
+    [name, lesson_type, swim_styles, [[day, "HH:MM", "HH:MM"], ...]].
+    """
+    return [
+        student.name,
+        student.lesson_type,
+        student.swim_style,
+        [[window["day"], window["start"], window["end"]]
+         for window in roster_store.serialize_availability(student.availability)],
+    ]
+
+
+def instructor_record(instructor: Instructor) -> dict:
+    """
+    Returns the JSON-friendly fields of an instructor stored in the submission log.
+    """
+    return {
+        "name": instructor.name,
+        "swim_style": instructor.swim_style,
+        "availability": roster_store.serialize_availability(instructor.availability),
+    }
+
+
+def apply_log_record(op: str, record: dict):
+    """
+    Applies one replayed submission-log record to the in-memory state.
+
+    Supported operations:
+    - "student": adds a student (as accepted by `/submit_student`)
+    - "students": adds many students stored as compact rows (snapshots and admission batches, see `student_row`)
+    - "instructors": replaces the whole instructor list
+    """
+    global instructors, instructors_changed
+
+    if op == "student":
+        student = Student(
+            name=record["name"],
+            lesson_type=record["lesson_type"],
+            swim_style=record["swim_style"],
+            availability=roster_store.deserialize_availability(record["availability"]),
+        )
+        students.add(student)
+        students_by_name[student.name] = student
+    elif op == "students":
+        parse = roster_store.parse_hhmm
+        for name, lesson_type, swim_style, windows in record["rows"]:
+            student = Student(
+                name=name,
+                lesson_type=lesson_type,
+                swim_style=swim_style,
+                availability=[{"day": day, "start": parse(start), "end": parse(end)} for day, start, end in windows],
+            )
+            students.add(student)
+            students_by_name[name] = student
+    elif op == "instructors":
+        instructors = [
+            Instructor(name=item["name"], swim_style=item["swim_style"],
+                       availability=roster_store.deserialize_availability(item["availability"]))
+            for item in record["instructors"]
+        ]
+        instructors_changed = True
+
+
+def log_snapshot() -> list:
+    """
+    Returns the current roster (and instructors, if they were changed) as submission-log
+    snapshot records.
+    """
+    # In submission order (`students_by_name` keeps it): replay must rebuild the same roster order
+    snapshot = [("students", {"rows": [student_row(student) for student in students_by_name.values()]})]
+    if instructors_changed:
+        snapshot.insert(0, ("instructors", {"instructors": [instructor_record(i) for i in instructors]}))
+    return snapshot
+
+
+def set_instructors(new_instructors: List[Instructor]):
+    """
+    Replaces the instructor list, logging the change when the submission log is enabled.
+
+    The new instructors take effect on the next `/reset` or `/schedule`.
+    """
+    global instructors, instructors_changed, scheduling_index
+
+    with state_lock:
+        if durable_log is not None:
+            durable_log.append("instructors", {"instructors": [instructor_record(i) for i in new_instructors]})
+        instructors = list(new_instructors)
+        instructors_changed = True
+        bump_state_version()
+        # The slot grid changes with the instructors; the index is rebuilt on the next schedule
+        scheduling_index = None
+
+
+def student_summary(student: Student) -> dict:
+    """
+    Returns the JSON fields of a student as listed by `/students`.
+
+    Only the submitted fields are included: the assigned lesson refers back to its
+    students (which FastAPI cannot serialize), and the scoring fields are scheduler internals.
+    """
+    return {
+        "name": student.name,
+        "lesson_type": student.lesson_type,
+        "swim_style": student.swim_style,
+        "availability": [
+            {"day": window["day"], "start": window["start"].isoformat(), "end": window["end"].isoformat()}
+            for window in student.availability
+        ],
+    }
+
+
+def sync_students_from_roster():
+    """
+    Writer side of multi-worker mode: loads students that any worker added to the
+    shared SQLite roster since the last sync.
+    """
+    global students, synced_roster_id
+
+    new_students, synced_roster_id = roster_db.load_since(synced_roster_id)
+    if new_students:
+        bump_state_version()
+
+    # Drop the test students `load_default_roster` falls back to while the roster is empty
+    if new_students and len(students) != len(students_by_name):
+        students = set(students_by_name.values())
+
+    for student in new_students:
+        students.add(student)
+        students_by_name[student.name] = student
+        if scheduling_index is not None:
+            scheduling_index.add_student(student)
+
+
+def publisher_loop():
+    """
+    Writer thread of multi-worker mode.
+
+    Whenever the shared roster changes, it reloads the new students, recomputes the
+    schedule and publishes the serialized `/schedule` and `/students` responses as a
+    new immutable buffer, versioned by the roster version it was computed from.
+    """
+    published_version = -1
+    while True:
+        try:
+            version = roster_db.version()
+            if version != published_version:
+                with state_lock:
+                    sync_students_from_roster()
+                    load_default_roster()
+                    schedule = compute_schedule(solve_exactly=False)
+                    inputs = exact_inputs() if exact_eligible() else None
+                if inputs is not None:  # This thread is the only one changing the roster here
+                    result, stats = exact_solver.solve(*inputs)
+                with state_lock:
+                    if inputs is not None:
+                        install_exact_schedule(result)
+                        schedule = schedule_payload(stats)
+                    schedule_versions.record(version, schedule)
+                    sections = {
+                        "schedule": http_cache.json_bytes(schedule),
+                        "students": http_cache.json_bytes(students_payload()),
+                        "history": http_cache.json_bytes(schedule_versions.export()),
+                    }
+                shared_schedule.publish(shared_schedule.shared_directory, version, sections)
+                published_version = version
+        except Exception as error:  # Keep publishing after a bad round; readers keep the last buffer
+            print(f"⚠️ Schedule publisher failed: {error!r}")
+        timer.sleep(shared_schedule.publish_interval)
+
+
+def latest_published(timeout: float = 5.0):
+    """
+    Returns (version, sections, etags) of the published buffer, waiting (up to `timeout`
+    seconds) until the writer has published one that includes every student currently
+    in the shared roster.
+    """
+    target_version = roster_db.version()
+    deadline = timer.monotonic() + timeout
+    version, sections, etags = published_reader.current()
+    while version < target_version and timer.monotonic() < deadline:
+        timer.sleep(0.01)
+        version, sections, etags = published_reader.current()
+    return version, sections, etags
+
+
+def message_response(message: str, status_code: int) -> Response:
+    return Response(content=json.dumps({"message": message}), status_code=status_code,
+                    media_type="application/json")
+
+
+def not_published_response() -> Response:
+    return message_response("No schedule has been published yet.", 503)
+
+
+def published_view(name: str, version: int, build):
+    """
+    Returns a view derived from the published buffer (e.g. the parsed schedule),
+    building it only once per published version in this worker.
+    """
+    cached = published_views.get(name)
+    if cached is None or cached[0] != version:
+        cached = (version, build())
+        published_views[name] = cached
+    return cached[1]
+
+
+def published_schedule(version: int, sections: dict) -> dict:
+    return published_view("schedule", version, lambda: json.loads(bytes(sections["schedule"])))
+
+
+def published_response(request: Request, section: str, timeout: float = 5.0) -> Response:
+    """
+    Serves a section of the published buffer without copying it.
+
+    Conditional requests are answered from the ETag stored in the buffer header.
+    Other negotiated representations are encoded once per published version.
+    """
+    version, sections, etags = latest_published(timeout)
+    if section not in sections:
+        return not_published_response()
+
+    cached = published_variants.get(section)
+    if cached is None or cached[0] != version:
+        cached = (version, {})
+        published_variants[section] = cached
+    body = sections[section]
+    return response_encoding.negotiated_response(request, body, etags[section], lambda: json.loads(bytes(body)),
+                                                 cached[1], headers={"X-Schedule-Version": str(version)})
+
+
+def bump_state_version():
+    """
+    Marks the roster/instructors as changed, invalidating cached responses and their ETags.
+    """
+    global state_version
+    state_version += 1
+    if published_reader is None:
+        event_stream.broadcaster.publish("state", state_event())
+
+
+def state_event() -> dict:
+    """
+    Payload of the `state` event pushed on `/events`: the roster size, the schedule
+    version `/schedule` would report now (compare with `X-Schedule-Version`) and the
+    roster limit (SWIM_MAX_STUDENTS).
+    """
+    return {"students": len(students), "schedule_version": state_version, "max_students": max_students}
+
+
+async def watch_shared_state():
+    """
+    Multi-worker variant of the `state` event: each worker polls the shared roster
+    version and the published buffer, and notifies its own subscribers on a change.
+    """
+    last_versions = None
+    while True:
+        try:
+            versions = await asyncio.to_thread(lambda: (roster_db.version(), published_reader.current()[0]))
+            if versions != last_versions:
+                count = await asyncio.to_thread(roster_db.count)
+                event_stream.broadcaster.publish("state", {"students": count, "schedule_version": versions[1],
+                                                           "max_students": max_students})
+                last_versions = versions
+        except Exception as error:  # Keep watching; subscribers keep the last state
+            print(f"⚠️ Event watcher failed: {error!r}")
+        await asyncio.sleep(shared_schedule.publish_interval)
+
+
+def cached_body(endpoint: str, build, on_build=None) -> tuple:
+    """
+    Returns (state_version, etag, body, payload, variants) of `endpoint` from
+    `response_cache`, calling `build()` (e.g. the full scheduling run) and serializing
+    only once per state version. Builds run under `state_lock`, one at a time, so
+    concurrent requests after a change never schedule on the same globals.
+
+    Args:
+        on_build (callable): Called as `on_build(version, payload)` after a rebuild.
+    """
+    cached = response_cache.get(endpoint)
+    if cached is None or cached[0] != state_version:
+        with state_lock:
+            # Requests that waited for another one's rebuild find it done
+            cached = response_cache.get(endpoint)
+            if cached is None or cached[0] != state_version:
+                version = state_version  # Captured first: a change during `build()` must not be cached as current
+                payload = build()
+                body = http_cache.json_bytes(payload)
+                cached = (version, http_cache.make_etag(body), body, payload, {})
+                response_cache[endpoint] = cached
+                if on_build is not None:
+                    on_build(version, payload)
+    return cached
+
+
+def cached_response(request: Request, endpoint: str, build) -> Response:
+    """
+    Serves `endpoint` from `response_cache` while the state version is unchanged.
+
+    A matching If-None-Match is answered with 304 from the cached ETag. The
+    representation (JSON, columnar, MessagePack; gzip/brotli) follows the request's
+    Accept and Accept-Encoding headers, see `response_encoding`.
+    """
+    return versioned_response(request, cached_body(endpoint, build))
+
+
+def versioned_response(request: Request, cached: tuple, headers: dict = None) -> Response:
+    """
+    Answers a request from a `response_cache` entry in the negotiated representation.
+    """
+    _, etag, body, payload, variants = cached
+    return response_encoding.negotiated_response(request, body, etag, lambda: payload, variants, headers=headers)
+
+
+def current_schedule() -> tuple:
+    """
+    Returns the `response_cache` entry of the schedule for the current state, recording
+    every newly computed schedule in `schedule_versions`.
+    """
+    load_default_roster()
+    cached = cached_body("schedule", lambda: compute_schedule(solve_exactly=False), on_build=record_schedule)
+    if "solver" not in cached[3] and exact_eligible():
+        cached = improve_schedule(cached)
+    return cached
+
+
+def improve_schedule(cached: tuple) -> tuple:
+    """
+    Runs the exact solver on the greedy schedule of the `response_cache` entry `cached`
+    and publishes its result as a new state version.
+
+    The search (up to SWIM_EXACT_TIME_LIMIT seconds) runs on a copy of the roster
+    without `state_lock`, so admissions and cached reads go on meanwhile; the lock is
+    only taken to copy the inputs and to publish. A result whose roster changed during
+    the search is dropped (the next request schedules the new roster).
+
+    Returns:
+        tuple: The `response_cache` entry of the improved schedule, or `cached` if the
+        roster is too large for the solver or changed during the search.
+    """
+    with exact_lock:
+        with state_lock:
+            current = response_cache.get("schedule")
+            if current is not cached:  # Improved (or rebuilt) while this request waited
+                return current if current[0] == state_version else cached
+            if not exact_eligible():
+                return cached
+            inputs = exact_inputs()
+        result, stats = exact_solver.solve(*inputs)
+        with state_lock:
+            if response_cache.get("schedule") is not cached or cached[0] != state_version:
+                return cached
+            install_exact_schedule(result)
+            payload = schedule_payload(stats)
+            bump_state_version()
+            body = http_cache.json_bytes(payload)
+            improved = (state_version, http_cache.make_etag(body), body, payload, {})
+            response_cache["schedule"] = improved
+            record_schedule(state_version, payload)
+            return improved
+
+
+def load_default_roster():
+    """
+    Loads the test students while the roster is empty (for easier testing).
+
+    Called before a schedule is built, so the version bump happens before the
+    build captures its version and the new schedule is cached as current.
+    """
+    global students
+
+    if not students:
+        with state_lock:
+            if not students:
+                students = set(test_students)
+                bump_state_version()
+
+
+def record_schedule(version: int, schedule: dict):
+    """
+    Called for every newly computed schedule: records it for `/schedule/changes` and
+    rebuilds the lookup indexes.
+    """
+    global current_lookup
+    schedule_versions.record(version, schedule)
+    current_lookup = schedule_lookup.ScheduleLookup(schedule)
+
+
+def schedule_lookups():
+    """
+    Returns the lookup indexes of the current schedule (computing it if the state
+    changed), or None if no schedule has been published yet in multi-worker mode.
+    """
+    if published_reader is not None:
+        version, sections, _ = latest_published()
+        if "schedule" not in sections:
+            return None
+        return published_view("lookup", version,
+                              lambda: schedule_lookup.ScheduleLookup(published_schedule(version, sections)))
+    current_schedule()
+    return current_lookup
+
+
+def students_payload() -> dict:
+    return {"students": [student_summary(student) for student in students]}
+
+
 @app.get("/len_students")
-def get_len_students():
+def get_len_students(request: Request):
     """
     Returns the current number of submitted students.
     Useful for frontend logic (e.g., enabling/disabling views).
+    Supports If-None-Match, so polling clients get a 304 while the count is unchanged.
+    """
+    count = roster_db.count() if published_reader is not None else len(students)
+    return http_cache.conditional_json(request.headers.get("if-none-match"), http_cache.json_bytes(count))
+
+
+@app.get("/events")
+async def stream_events():
+    """
+    Server-sent events channel replacing client polling of `/len_students` and `/schedule`.
+
+    Pushes a `state` event ({"students": n, "schedule_version": v, "max_students": m}) on connect and
+    whenever the roster or the schedule changes; idle connections get a keep-alive
+    comment every `SWIM_SSE_HEARTBEAT` seconds. All connections share one broadcaster.
     """
-    return len(students)
+    global shared_state_watcher
+
+    if published_reader is not None and shared_state_watcher is None:
+        shared_state_watcher = asyncio.create_task(watch_shared_state())
+    return StreamingResponse(event_stream.broadcaster.subscribe(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @app.post("/submit_student")
-def submit_student(student: Student):
+async def submit_student(student: Student):
     """
     Receives a new student from the frontend and adds them to the system.
 
     Steps:
-    - Prevents duplicate submissions
-    - Ensures the max number of students isn't exceeded
     - Converts string-based availability times to `datetime.time` objects
-    - Adds the student to the `students` set
+    - Queues the student for admission; concurrent submissions are committed together
+      in one batch (see `commit_submissions`)
+    - When too many submissions are already waiting, answers `429 Too Many Requests`
+      with a `Retry-After` header instead of queueing (current depth: `/admission`)
 
     Returns:
     - A message indicating success, duplication, or overflow
     """
-    global students
-
-    # Check if student already exists
-    if student in students:
-        return {"message": f"Student {student.name} is already in the list."}
-
-    # Prevent exceeding the maximum allowed students
-    if len(students) >= max_students:
-        return {"message": "Maximum student limit reached. No more students can be added."}
-
     # Convert time strings (from frontend) to datetime.time objects
     for slot in student.availability:
         if isinstance(slot["start"], str):
@@ -527,39 +1355,504 @@ def submit_student(student: Student):
         if isinstance(slot["end"], str):
             slot["end"] = datetime.strptime(slot["end"], "%H:%M").time()
 
-    students.add(student)
+    try:
+        return await admission.submit(student)
+    except admission_queue.QueueFull as error:
+        return Response(content=json.dumps({"message": "Too many submissions right now, please retry."}),
+                        status_code=429, media_type="application/json",
+                        headers={"Retry-After": str(error.retry_after)})
+
+
+def commit_submissions(batch: List[Student]) -> List[dict]:
+    """
+    Admits a batch of submissions (runs on the admission committer thread).
+
+    Steps:
+    - Prevents duplicate submissions (against the roster and within the batch)
+    - Ensures the max number of students isn't exceeded
+    - Makes the accepted students durable with a single log record (one fsync)
+    - Adds them to the `students` set, the SQLite roster (one transaction) and the index
+    - Bumps the state version once for the whole batch
+    - Holds `state_lock` throughout, so no schedule is built on a half-committed batch
+
+    Returns:
+        list[dict]: The response message for each submission, in batch order.
+    """
+    if published_reader is not None:
+        return commit_shared_submissions(batch)
+
+    # Scheduling and serialization iterate the roster; they see the batch whole or not at all
+    with state_lock:
+        accepted: List[Student] = []
+        accepted_names = set()
+        results = []
+        for student in batch:
+            if student in students or student.name in accepted_names:
+                results.append({"message": f"Student {student.name} is already in the list."})
+            elif len(students) + len(accepted) >= max_students:
+                results.append({"message": "Maximum student limit reached. No more students can be added."})
+            else:
+                accepted.append(student)
+                accepted_names.add(student.name)
+                spots = max_students - len(students) - len(accepted)
+                results.append({"message": f"Student {student.name} added. {spots} more student spots available."})
+
+        if not accepted:
+            return results
+
+        # Make the submissions durable before acknowledging them
+        if durable_log is not None:
+            durable_log.append("students", {"rows": [student_row(student) for student in accepted]})
+
+        for student in accepted:
+            students.add(student)
+            students_by_name[student.name] = student
+            if scheduling_index is not None:
+                scheduling_index.add_student(student)
+        if roster_db is not None:
+            roster_db.add_many(accepted)
+        bump_state_version()
+        return results
+
+
+def commit_shared_submissions(batch: List[Student]) -> List[dict]:
+    """
+    Multi-worker variant of `commit_submissions`: the shared SQLite roster is the
+    source of truth, so duplicates and the student cap are checked against it. The
+    writer worker picks the students up and publishes a new schedule.
+    """
+    results = {}
+    remaining = list(batch)
+    count = roster_db.count()
+    room = max_students - count
+    # Duplicates do not use up room, so insert in chunks until the room or the batch runs out
+    while remaining and room > 0:
+        chunk, remaining = remaining[:room], remaining[room:]
+        for student, inserted in zip(chunk, roster_db.insert_many(chunk)):
+            results[id(student)] = inserted
+            room -= inserted
+
+    messages = []
+    for student in batch:
+        inserted = results.get(id(student))
+        if inserted is None:
+            messages.append({"message": "Maximum student limit reached. No more students can be added."})
+        elif not inserted:
+            messages.append({"message": f"Student {student.name} is already in the list."})
+        else:
+            count += 1
+            messages.append({"message": f"Student {student.name} added. "
+                                        f"{max_students - count} more student spots available."})
+    return messages
+
+
+# Batches concurrent `/submit_student` calls (SWIM_ADMISSION_QUEUE / SWIM_ADMISSION_BATCH)
+admission = admission_queue.AdmissionQueue(commit_submissions)
+
+
+@app.get("/admission")
+def get_admission_stats():
+    """
+    Returns the admission queue depth and batching statistics of this worker.
+    """
+    return admission.stats()
+
 
-    return {"message": f"Student {student.name} added. {max_students - len(students)} more student spots available."}
+@app.post("/feasibility")
+def check_feasibility(student: Student):
+    """
+    Prechecks a prospective student (same payload as `/submit_student`) without
+    submitting it or running the scheduler.
+
+    Returns:
+    - `options`: every (day, hour, instructor, swim style) slot that can host the student
+    - `joinable_lessons`: for a flexible_private student, the group lessons of the latest
+      schedule that fit the student's styles and availability (empty for other types)
+    - `feasible`: False if neither exists, i.e. the chosen windows can never be served
+
+    Answered from precomputed indexes, so the cost only depends on the student's own
+    availability. `schedule_version` tells which schedule the joinable lessons come from.
+    """
+    global feasibility_index
+
+    for slot in student.availability:
+        slot["start"] = parse_time_field(slot["start"])
+        slot["end"] = parse_time_field(slot["end"])
+
+    if feasibility_index is None or feasibility_index.instructors is not instructors:
+        feasibility_index = feasibility.FeasibilityIndex(instructors)
+
+    # The latest schedule as is: a precheck never waits for (or triggers) a scheduling run
+    if published_reader is not None:
+        version, sections, _ = published_reader.current()
+        lookups = None if "schedule" not in sections else published_view(
+            "lookup", version, lambda: schedule_lookup.ScheduleLookup(published_schedule(version, sections)))
+    else:
+        version, lookups = schedule_versions.version, current_lookup
+
+    options = feasibility_index.options(student)
+    joinable = feasibility.joinable_group_lessons(student, lookups)
+    return {
+        "student": student.name,
+        "feasible": bool(options or joinable),
+        "options": options,
+        "joinable_lessons": joinable,
+        "schedule_version": version if lookups is not None else None,
+    }
 
 
 @app.get("/students")
-def get_students():
+def get_students(request: Request):
     """
     Returns a list of all currently submitted students.
 
     Used for debugging or showing a summary in the frontend.
+    The response carries a strong ETag and is only reserialized after the roster changes.
+    """
+    if published_reader is not None:
+        return published_response(request, "students")
+    return cached_response(request, "students", students_payload)
+
+
+@app.put("/instructors")
+def replace_instructors(new_instructors: List[Instructor]):
     """
-    return {"students": students}
+    Replaces the instructor list (logged with the submission log, so it survives a restart).
+    The next `/schedule` uses the new instructors.
+
+    Not available in multi-worker mode, where every worker keeps its own instructor list.
+    """
+    if published_reader is not None:
+        return message_response("Instructors cannot be changed in multi-worker mode.", 409)
+    try:
+        for instructor in new_instructors:
+            for slot in instructor.availability:
+                slot["start"] = parse_time_field(slot["start"])
+                slot["end"] = parse_time_field(slot["end"])
+    except ValueError as error:
+        return message_response(f"Invalid instructor availability: {error}", 400)
+    set_instructors(new_instructors)
+    return {"message": f"{len(new_instructors)} instructors set."}
 
 
 @app.get("/schedule")
-def get_schedule():
+def get_schedule(request: Request):
+    """
+    Returns the schedule: computed on demand, or in multi-worker mode, served from
+    the buffer published by the writer worker.
+
+    The schedule is only recomputed after the roster or the instructors change.
+    Responses carry a strong ETag, and `If-None-Match` with the current ETag is
+    answered with `304 Not Modified`. `X-Schedule-Version` is the version to pass to
+    `/schedule/changes` on the next refresh. Large clients can negotiate a columnar or
+    MessagePack body and gzip/brotli compression (see `response_encoding`).
+    """
+    if published_reader is not None:
+        return published_response(request, "schedule")
+    cached = current_schedule()
+    return versioned_response(request, cached, headers={"X-Schedule-Version": str(cached[0])})
+
+
+@app.get("/schedule/changes")
+def get_schedule_changes(since: int):
+    """
+    Returns only the lessons that changed since schedule version `since`
+    (the `X-Schedule-Version` of the client's last `/schedule` or `/schedule/changes`).
+
+    Lessons are identified by `lesson_key` (day|start|instructor, or unassigned|student),
+    not by the positional `lesson_id`. The response lists `added` and `modified` lessons
+    and the keys of `removed` ones, plus the new `version`. If `since` is older than the
+    kept history (SWIM_SCHEDULE_HISTORY versions), `full_refresh` is true and `added`
+    holds the whole schedule.
+    """
+    if published_reader is not None:
+        version, sections, _ = latest_published()
+        if "history" not in sections:
+            return not_published_response()
+        history = published_view("history", version, lambda: schedule_history.ScheduleHistory.from_published(
+            json.loads(bytes(sections["history"])), published_schedule(version, sections)))
+    else:
+        current_schedule()  # Computes and records the schedule if the state changed
+        history = schedule_versions
+    return history.changes_since(since)
+
+
+@app.get("/instructors/{instructor_name}/schedule")
+def get_instructor_schedule(instructor_name: str):
+    """
+    Returns only the lessons of one instructor, in schedule order.
+
+    Answered from the per-instructor index built with the schedule, so the cost
+    depends on the instructor's lessons, not on the size of the whole schedule.
+    """
+    lookups = schedule_lookups()
+    if lookups is None:
+        return not_published_response()
+    lessons = lookups.instructor_lessons(instructor_name)
+    if not lessons and all(instructor.name != instructor_name for instructor in instructors):
+        return message_response(f"Instructor {instructor_name} not found.", 404)
+    return {"instructor": instructor_name, "lessons": lessons}
+
+
+@app.get("/students/{student_name}/lesson")
+def get_student_lesson(student_name: str):
+    """
+    Returns the lesson a single student got, with `status` "assigned" or "unassigned".
+    """
+    lookups = schedule_lookups()
+    if lookups is None:
+        return not_published_response()
+    found = lookups.student_lesson(student_name)
+    if found is None:
+        return message_response(f"Student {student_name} is not in the schedule.", 404)
+    status, lesson = found
+    return {"student": student_name, "status": status, "lesson": lesson}
+
+
+@app.get("/slots/{day}/{hour}")
+def get_slot_lessons(day: str, hour: int):
+    """
+    Returns the lessons starting on `day` (e.g. "Tuesday") at `hour` (0-23).
+    """
+    lookups = schedule_lookups()
+    if lookups is None:
+        return not_published_response()
+    day = day.capitalize()
+    return {"day": day, "hour": hour, "lessons": lookups.slot_lessons(day, hour)}
+
+
+# Tenant pools (`/tenants/{tenant_id}/...`), sharded over worker processes (SWIM_TENANT_WORKERS)
+tenant_pool = tenants.TenantPool()
+
+
+async def tenant_response(request: Request, tenant_id: str, operation: str, argument=None) -> Response:
+    """
+    Runs a tenant operation on the worker that owns `tenant_id` and answers with its result.
+    Cacheable results carry an ETag, so If-None-Match works as on the single-tenant endpoints.
+    """
+    try:
+        status_code, body, etag, headers = await tenant_pool.call(tenant_id, operation, argument)
+    except RuntimeError as error:
+        return message_response(str(error), 503)
+    if etag is not None:
+        return http_cache.conditional_json(request.headers.get("if-none-match"), body, etag, headers)
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+@app.get("/tenants")
+def get_tenant_workers():
+    """
+    Returns the tenant workers with the number of tenants each one owns.
+    """
+    return tenant_pool.stats()
+
+
+@app.post("/tenants/{tenant_id}/submit_student")
+async def submit_tenant_student(tenant_id: str, student: Student, request: Request):
+    """
+    `/submit_student` for one tenant (club or pool). Each tenant has its own roster,
+    limited to `SWIM_MAX_STUDENTS` students.
+    """
+    return await tenant_response(request, tenant_id, "submit_student", student)
+
+
+@app.get("/tenants/{tenant_id}/len_students")
+async def get_tenant_len_students(tenant_id: str, request: Request):
+    return await tenant_response(request, tenant_id, "len_students")
+
+
+@app.get("/tenants/{tenant_id}/students")
+async def get_tenant_students(tenant_id: str, request: Request):
+    return await tenant_response(request, tenant_id, "students")
+
+
+@app.get("/tenants/{tenant_id}/schedule")
+async def get_tenant_schedule(tenant_id: str, request: Request):
+    """
+    `/schedule` for one tenant, computed by the tenant's worker from the tenant's own
+    students and instructors (and cached there until either changes).
+    """
+    return await tenant_response(request, tenant_id, "schedule")
+
+
+@app.put("/tenants/{tenant_id}/instructors")
+async def set_tenant_instructors(tenant_id: str, new_instructors: List[Instructor], request: Request):
+    """
+    Replaces the instructors of one tenant. New tenants start with the default instructors.
+    """
+    try:
+        for instructor in new_instructors:
+            for slot in instructor.availability:
+                slot["start"] = parse_time_field(slot["start"])
+                slot["end"] = parse_time_field(slot["end"])
+    except ValueError as error:
+        return message_response(f"Invalid instructor availability: {error}", 400)
+    return await tenant_response(request, tenant_id, "set_instructors", new_instructors)
+
+
+@app.delete("/tenants/{tenant_id}")
+async def delete_tenant(tenant_id: str, request: Request):
+    """
+    Drops a tenant with its roster, instructors and schedule.
+    """
+    return await tenant_response(request, tenant_id, "drop")
+
+
+# What-if scenarios of `/simulate`, run on a process pool (SWIM_SIMULATION_PROCESSES)
+simulator = simulation.Simulator()
+
+# (roster version, student count, serialized roster) of the last `/simulate` snapshot
+simulation_snapshot: tuple = None
+
+
+def roster_snapshot() -> tuple:
+    """
+    Returns (version, count, blob) of the current roster, serialized for `/simulate`.
+
+    The snapshot is shared by all scenarios and reused until the roster changes.
+    In multi-worker mode it is read from the shared roster. An empty roster falls back to
+    the test students, as `load_default_roster` does.
+    """
+    global simulation_snapshot
+
+    version = roster_db.version() if published_reader is not None else state_version
+    if simulation_snapshot is None or simulation_snapshot[0] != version:
+        if published_reader is not None:
+            roster = roster_db.load_all()
+        else:
+            with state_lock:
+                roster = students.copy()
+        roster = roster or test_students
+        simulation_snapshot = (version, len(roster), simulation.roster_blob([student_row(student) for student in roster]))
+    return simulation_snapshot
+
+
+@app.post("/simulate")
+async def simulate(request: SimulationRequest):
+    """
+    Compares what-if instructor scenarios against the current instructors.
+
+    Each variant edits a copy of the instructors (add availability, hire, remove, or
+    replace them all). The baseline and every variant are scheduled in parallel on
+    the simulation process pool against one snapshot of the current roster; live
+    students, lessons and cached schedules are not touched.
+
+    Returns:
+    - `scenarios`: baseline first, then each variant with assigned / unassigned
+      student and lesson counts, lessons per instructor and the change vs. the baseline
+    """
+    if not request.variants:
+        return message_response("Give at least one variant to simulate.", 400)
+    if len(request.variants) > simulation.max_variants:
+        return message_response(f"At most {simulation.max_variants} variants per request.", 400)
+
+    base = simulation.instructor_records(instructors)
+    try:
+        scenarios = [("baseline", base)] + [(variant.name, simulation.apply_variant(base, variant))
+                                           for variant in request.variants]
+    except ValueError as error:
+        return message_response(str(error), 400)
+
+    version, count, blob = await asyncio.to_thread(roster_snapshot)
+    results = await simulator.run(simulation.run_scenario, [(name, blob, records) for name, records in scenarios])
+    return {"roster_version": version, "students": count, "scenarios": simulation.compare(results)}
+
+
+@app.get("/schedule/best")
+async def get_best_schedule(runs: int = multi_start.default_runs, seed: int = 0):
+    """
+    Schedules the current roster `runs` times, with seeds `seed`, `seed + 1`, ...,
+    in parallel on the simulation process pool, and returns the best schedule.
+
+    Seed 0 keeps the scheduler's own tie-breaks; any other seed shuffles slot,
+    instructor and student ties (see `perturb_tie_breaks`). Runs are ranked by
+    students placed, then instructor utilization, then mean group size. The live
+    schedule is not changed.
+
+    Returns:
+    - `best_seed`: `?seed=<best_seed>&runs=1` reproduces the schedule for the same
+      roster and instructors
+    - `runs`: placed / utilization / mean_group_size of every seed
+    - `assigned_lessons` / `unassigned_lessons` of the best run
+    """
+    if not 1 <= runs <= multi_start.max_runs:
+        return message_response(f"runs must be between 1 and {multi_start.max_runs}.", 400)
+    if seed < 0:
+        return message_response("seed must not be negative.", 400)
+
+    records = simulation.instructor_records(instructors)
+    version, count, blob = await asyncio.to_thread(roster_snapshot)
+    results = await simulator.run(multi_start.run_seed, [(run_seed, blob, records)
+                                                         for run_seed in range(seed, seed + runs)])
+    return {"roster_version": version, "students": count, **multi_start.best_of(results)}
+
+
+# Week schedules of `/schedule/term`, reused across weeks and requests until the roster changes
+term_planner = term_schedule.TermPlanner()
+
+
+@app.post("/schedule/term")
+async def schedule_term(request: TermRequest):
+    """
+    Plans a term of `weeks` weeks. Each week has the regular instructors minus that
+    week's exceptions (a sick day, a holiday closing the pool; see `TermException`).
+
+    Weeks with the same availability share one scheduling run, and week schedules
+    are kept until the roster changes, so a later request only recomputes the weeks
+    whose exceptions changed. The runs use the simulation process pool and one
+    snapshot of the roster, as `/simulate` does; the live schedule is not changed.
+
+    Returns:
+    - `weeks`: every week's schedule, with lesson ids unique across the term and a
+      `week` on every lesson; `reused` is false for the weeks scheduled by this request
+    - `computed_weeks` / `reused_weeks`: scheduling runs done / saved
+    """
+    if not 1 <= request.weeks <= term_schedule.max_weeks:
+        return message_response(f"weeks must be between 1 and {term_schedule.max_weeks}.", 400)
+
+    snapshot = await asyncio.to_thread(roster_snapshot)
+    try:
+        return await term_planner.plan(simulator, instructors, snapshot, request.weeks, request.exceptions)
+    except ValueError as error:
+        return message_response(str(error), 400)
+
+
+@app.on_event("shutdown")
+def stop_worker_pools():
+    tenant_pool.close()
+    simulator.close()
+    if traffic_log is not None:
+        traffic_log.close()
+
+
+def compute_schedule(solve_exactly: bool = True):
     """
     Triggers the full scheduling algorithm and returns all assigned and unassigned lessons.
 
     Steps:
-    - Resets prior schedules and slot allocations
-    - Loads test students if empty (for dev purposes)
+    - Resets prior schedules and slot allocations (an empty roster gets the test
+      students beforehand, see `load_default_roster`)
     - Assigns students by lesson type (group → private → flexible_private)
-    - Returns both assigned and unassigned lessons in a structured format
+    - With SWIM_EXACT_SOLVER=1 and at most SWIM_EXACT_MAX_STUDENTS students, replaces
+      the greedy lessons with the exact solver's if they are better (reported as `solver`).
+      The server passes `solve_exactly=False` and runs the solver afterwards, outside
+      `state_lock` (see `improve_schedule`)
+    - Returns both assigned and unassigned lessons in a structured format, plus a
+      `quality` block (upper bound on placeable students, utilization; see
+      `schedule_quality`) unless SWIM_SCHEDULE_QUALITY=0
     """
-    global students, assigned_lessons, unassigned_lessons, time_slots
+    global assigned_lessons, unassigned_lessons, time_slots, student_ranks
 
     reset_state()
+    ensure_scheduling_index()
 
-    # Load test students automatically if empty (for easier testing)
-    if not students:
-        students = set(test_students)
+    # Multi-start runs only: shuffle tie-breaks after indexing (the index fingerprints the grid order)
+    student_ranks = None
+    if schedule_seed:
+        perturb_tie_breaks(schedule_seed)
+
+    if decision_trace.trace_enabled:
+        decision_trace.start_run()
 
     # Assign students in scheduling phases
     assign_students_to_slots(["group", "flexible_group"])
@@ -570,8 +1863,23 @@ def get_schedule():
     assign_private_lessons_from_slots()
     assign_flexible_private_fallback()
 
+    solver_stats = None
+    if solve_exactly and exact_eligible():
+        solver_stats = use_exact_schedule()
+    return schedule_payload(solver_stats)
+
+
+def schedule_payload(solver_stats: dict = None) -> dict:
+    """
+    Formats the current lessons as the `/schedule` response.
+    """
+    # Prove from the lessons alone (not the bitmaps) that no instructor is double-booked
+    conflicts = occupancy.find_conflicts(assigned_lessons)
+    for conflict in conflicts:
+        print(f"⚠️ Instructor conflict: {conflict}")
+
     # Format and return results
-    return {
+    schedule = {
         "assigned_lessons": [
             {
                 "lesson_id": lesson.lesson_id,
@@ -595,6 +1903,32 @@ def get_schedule():
             for lesson in unassigned_lessons
         ],
     }
+    if solver_stats is not None:
+        schedule["solver"] = solver_stats
+    if schedule_quality.quality_enabled:
+        schedule["quality"] = schedule_quality.report(schedule, students, instructors, conflicts=len(conflicts))
+    return schedule
+
+
+@app.get("/schedule/explain/{student_name}")
+def explain_student_schedule(student_name: str):
+    """
+    Explains how the last `/schedule` run treated a single student.
+
+    Returns the recorded decision trace: the slot/style buckets the student entered,
+    the lessons that consumed those buckets, the final assignment, and why the
+    flexible fallback failed if the student ended up unassigned.
+    """
+    if not decision_trace.trace_enabled:
+        return {"student": student_name, "events": [], "message": "Decision tracing is disabled (SWIM_TRACE=0)."}
+
+    # Scheduling runs record events (and start new runs) under `state_lock`
+    with state_lock:
+        events = decision_trace.explain_student(student_name)
+    if not events:
+        return {"student": student_name, "events": [],
+                "message": f"No decisions recorded for {student_name} in the last schedule run."}
+    return {"student": student_name, "events": events}
 
 
 @app.get("/reset")
@@ -607,14 +1941,17 @@ def reset_state():
     """
     global students, assigned_lessons, unassigned_lessons, time_slots
 
-    # Clear assigned_lesson for all students before starting scheduling
-    for student in students:
-        student.assigned_lesson = None
-
-    assigned_lessons.clear()
-    unassigned_lessons.clear()
-    time_slots.clear()
-    initialize_time_slots()
+    with state_lock:
+        # Clear assigned_lesson for all students before starting scheduling
+        for student in students:
+            student.assigned_lesson = None
+        for instructor in instructors:
+            instructor.clear_bookings()
+
+        assigned_lessons.clear()
+        unassigned_lessons.clear()
+        time_slots.clear()
+        initialize_time_slots()
     return {"message": "State has been reset."}
 
 
@@ -624,15 +1961,83 @@ def reset_data_on_startup():
     FastAPI hook: clears and resets all data when the server starts.
 
     Ensures the backend starts with a clean state every time (for local dev).
+    With the SQLite roster backend, the persisted students are loaded back afterwards.
+    With the submission log, the roster and instructors are recovered from the last
+    snapshot plus the log, which is then compacted into a new snapshot.
+    With `SWIM_INDEX_SNAPSHOT`, a matching scheduling index snapshot is memory-mapped.
     """
-    global students, assigned_lessons, unassigned_lessons
+    global students, assigned_lessons, unassigned_lessons, scheduling_index
     students.clear()
+    students_by_name.clear()
+    scheduling_index = None
+    bump_state_version()
     assigned_lessons.clear()
     unassigned_lessons.clear()
     time_slots.clear()
+    decision_trace.clear_trace()
     print("🔄 Backend restarted: Cleared all students and lessons")
+
+    # Recover from the submission log before building the slot grid (instructors may change)
+    if durable_log is not None:
+        for op, record in durable_log.replay():
+            apply_log_record(op, record)
+
+        # Fold the replayed log into a new snapshot so the next recovery only reads one file
+        if durable_log.replayed_log_records:
+            durable_log.compact(log_snapshot())
+        print(f"📜 Recovered {len(students)} students from {durable_log.directory}")
+
     initialize_time_slots()
 
+    if shared_schedule.shared_directory:
+        start_shared_mode()
+        return
+
+    # Reload the persisted roster, if any
+    if roster_db is not None:
+        for student in roster_db.load_all():
+            students.add(student)
+            students_by_name[student.name] = student
+        print(f"💾 Loaded {len(students)} students from {roster_db.path}")
+
+    # Map the warm-start index snapshot so the first /schedule skips the availability expansion
+    warm_index = schedule_index.load_index(schedule_index.index_snapshot_path, time_slots)
+    if warm_index is not None and len(warm_index) == len(students) and \
+            all(name in students_by_name for name in warm_index.names):
+        scheduling_index = warm_index
+        print(f"⚡ Mapped scheduling index for {len(warm_index)} students from {schedule_index.index_snapshot_path}")
+
+    # Recovered students are not announced by `bump_state_version`
+    event_stream.broadcaster.publish("state", state_event())
+
+
+def start_shared_mode():
+    """
+    Joins the multi-worker setup in `SWIM_SHARED_DIR`.
+
+    Every worker serves reads from the published buffer. The first worker to take
+    the writer lock also starts the publisher thread, which owns the scheduling state.
+
+    Raises:
+        RuntimeError: If the SQLite roster backend is not enabled (workers share the roster through it).
+    """
+    global published_reader, writer_lock_file
+
+    if roster_db is None:
+        raise RuntimeError("Multi-worker mode (SWIM_SHARED_DIR) requires SWIM_ROSTER_BACKEND=sqlite")
+
+    os.makedirs(shared_schedule.shared_directory, exist_ok=True)
+    published_reader = shared_schedule.PublishedReader(shared_schedule.shared_directory)
+    writer_lock_file = shared_schedule.acquire_writer_lock(shared_schedule.shared_directory)
+    if writer_lock_file is not None:
+        threading.Thread(target=publisher_loop, name="schedule-publisher", daemon=True).start()
+        print(f"✍️ Worker {os.getpid()} is the schedule writer")
+
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # SWIM_WORKERS > 1 runs several worker processes; combine with SWIM_SHARED_DIR so they share state
+    workers = int(os.environ.get("SWIM_WORKERS", "1"))
+    if workers > 1:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
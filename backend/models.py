@@ -1,7 +1,10 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Union
+from pydantic import BaseModel, PrivateAttr, field_validator, model_validator
+from typing import Iterator, List, Optional, Dict, Tuple, Union
 from datetime import time
 
+from availability import DAY_ORDER, canonical_windows, hour_masks, mask_hours, to_time
+from occupancy import BookingConflict, format_span, quarter_span
+
 
 class Student(BaseModel):
     """
@@ -12,6 +15,7 @@ class Student(BaseModel):
         lesson_type: One of "group", "private", "flexible_group", or "flexible_private".
         swim_style: List of swim styles the student wants (e.g., ["freestyle"]).
         availability: List of time slots, each with keys "day", "start", and "end".
+            Normalized on creation: times parsed, windows merged and sorted per day.
         assigning_score: Score based on how many slots the student matched (used for scheduling).
         assigned_lesson: The lesson the student is ultimately assigned to.
     """
@@ -22,6 +26,26 @@ class Student(BaseModel):
     assigning_score: int = 0
     assigned_lesson: Optional["Lesson"] = None  # Will be assigned later
 
+    # Canonical availability as one hour bitmask per day (bit h = the h:00 slot)
+    _hour_masks: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    @field_validator("availability")
+    @classmethod
+    def normalize_availability(cls, windows):
+        # Overlapping windows would otherwise be expanded (and scored) once per window
+        return canonical_windows(windows)
+
+    def model_post_init(self, __context):
+        self._hour_masks = hour_masks(self.availability)
+
+    def availability_slots(self) -> Iterator[Tuple[str, int]]:
+        """
+        Yields each (day, hour) slot the student is available for, once, in canonical order.
+        """
+        for day, mask in self._hour_masks.items():
+            for hour in mask_hours(mask):
+                yield day, hour
+
     def __hash__(self):
         # Allows Student instances to be used in sets by using name as unique ID
         return hash(self.name)
@@ -40,7 +64,7 @@ class Instructor(BaseModel):
     Attributes:
         name: Name of the instructor.
         swim_style: List of swim styles the instructor can teach.
-        lessons: List of lessons the instructor has been assigned to.
+        lessons: List of lessons the instructor has been assigned to (in the current schedule run).
         availability: List of available time slots, each with "day", "start", and "end".
     """
     name: str
@@ -48,6 +72,33 @@ class Instructor(BaseModel):
     lessons: List["Lesson"] = []
     availability: List[Dict[str, Union[str, time]]]
 
+    # Booked quarter-hours per day (see occupancy.py), kept in step with `lessons`
+    _occupancy: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    def is_free(self, day: str, start: time, end: time) -> bool:
+        """
+        True if none of the instructor's lessons overlaps `start`-`end` on `day` (one AND).
+        """
+        return not self._occupancy.get(day, 0) & quarter_span(start, end)
+
+    def book(self, lesson: "Lesson"):
+        """
+        Adds `lesson` to the instructor's lessons and occupancy.
+
+        Raises:
+            BookingConflict: If it overlaps a lesson the instructor already teaches.
+        """
+        span = quarter_span(lesson.start_time, lesson.end_time)
+        taken = self._occupancy.get(lesson.day, 0)
+        if taken & span:
+            raise BookingConflict(f"{self.name} already teaches on {lesson.day} at {format_span(taken & span)}")
+        self._occupancy[lesson.day] = taken | span
+        self.lessons.append(lesson)
+
+    def clear_bookings(self):
+        self.lessons = []
+        self._occupancy = {}
+
 
 class Lesson(BaseModel):
     """
@@ -77,3 +128,92 @@ class Lesson(BaseModel):
         Adds a student to the lesson's student list.
         """
         self.students.append(student)
+
+
+class AvailabilityWindow(BaseModel):
+    """
+    An extra availability window for an existing instructor in a `/simulate` variant.
+
+    Attributes:
+        instructor: Name of the instructor.
+        day: Day of the window, e.g. "Monday".
+        start: "H:MM" or "HH:MM" the window starts; stored as "HH:MM".
+        end: "H:MM" or "HH:MM" the window ends, after `start`; stored as "HH:MM".
+    """
+    instructor: str
+    day: str
+    start: str
+    end: str
+
+    @field_validator("day")
+    @classmethod
+    def known_day(cls, day):
+        if day not in DAY_ORDER:
+            raise ValueError(f"day must be one of {', '.join(DAY_ORDER)}")
+        return day
+
+    @field_validator("start", "end")
+    @classmethod
+    def clock_time(cls, value):
+        try:
+            return to_time(value).strftime("%H:%M")
+        except ValueError:
+            raise ValueError("times must be \"HH:MM\"")
+
+    @model_validator(mode="after")
+    def ends_after_start(self):
+        if self.end <= self.start:
+            raise ValueError(f"window on {self.day} ends before it starts")
+        return self
+
+
+class SimulationVariant(BaseModel):
+    """
+    One what-if instructor scenario for `/simulate`, applied to a copy of the current instructors.
+
+    Attributes:
+        name: Label of the scenario in the comparison table.
+        instructors: Replaces the whole instructor list when given.
+        remove_instructors: Names of instructors to leave out.
+        add_availability: Extra windows for existing instructors (e.g. Yoni also works
+            Monday 8:00-15:00), validated before any scenario runs.
+        add_instructors: Instructors to hire.
+    """
+    name: str
+    instructors: Optional[List[Instructor]] = None
+    remove_instructors: List[str] = []
+    add_availability: List[AvailabilityWindow] = []
+    add_instructors: List[Instructor] = []
+
+
+class SimulationRequest(BaseModel):
+    """
+    Body of `/simulate`: the scenarios to compare against the current instructors.
+    """
+    variants: List[SimulationVariant]
+
+
+class TermException(BaseModel):
+    """
+    An instructor exception in one week of a `/schedule/term` term.
+
+    Attributes:
+        week: Week of the term it applies to, from 1.
+        instructor: Instructor who is away (sick day, leave); None closes the pool for everyone (holiday).
+        day: Day affected (e.g. "Thursday").
+        start: "HH:MM" the absence starts; omitted with `end` for the whole day.
+        end: "HH:MM" the absence ends.
+    """
+    week: int
+    instructor: Optional[str] = None
+    day: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+
+class TermRequest(BaseModel):
+    """
+    Body of `/schedule/term`: the number of weeks and the exceptions of each week.
+    """
+    weeks: int
+    exceptions: List[TermException] = []
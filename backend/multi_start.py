@@ -0,0 +1,78 @@
+import os
+import time as timer
+from typing import List, Tuple
+
+import batch_schedule
+import simulation
+import tenants
+
+# Seeded runs of a `/schedule/best` request that does not give `runs` (SWIM_MULTI_START_RUNS)
+default_runs = int(os.environ.get("SWIM_MULTI_START_RUNS", "8"))
+
+# Most runs one `/schedule/best` request may ask for (SWIM_MULTI_START_MAX_RUNS)
+max_runs = int(os.environ.get("SWIM_MULTI_START_MAX_RUNS", "64"))
+
+
+def run_seed(job: Tuple[int, bytes, List[dict]]) -> dict:
+    """
+    Worker side: schedules the roster snapshot with the tie-breaks of `seed`
+    (see `main.perturb_tie_breaks`; seed 0 keeps the scheduler's own order).
+
+    Returns:
+        dict: The seed, its `score` fields, the run time and the schedule.
+    """
+    import main
+
+    seed, blob, records = job
+    started = timer.perf_counter()
+    instructors = batch_schedule.build_instructors(records)
+    state = simulation.roster_state(main, blob, instructors)
+
+    def seeded_schedule():
+        main.schedule_seed = seed
+        try:
+            return tenants.tenant_schedule(main)
+        finally:
+            main.schedule_seed = 0
+
+    schedule = tenants.with_tenant_state(main, state, seeded_schedule)
+    return {"seed": seed, **score(schedule, instructors),
+            "elapsed_ms": round((timer.perf_counter() - started) * 1000, 3), "schedule": schedule}
+
+
+def score(schedule: dict, instructors: list) -> dict:
+    """
+    Measures a schedule: students placed, instructor utilization (booked instructor
+    hours out of the hours instructors are available) and mean group lesson size.
+    """
+    assigned = schedule["assigned_lessons"]
+    available_hours = sum(max(0, window["end"].hour - window["start"].hour)
+                          for instructor in instructors for window in instructor.availability)
+    booked_hours = {(lesson["instructor"], lesson["day"], lesson["start_time"]) for lesson in assigned}
+    group_sizes = [len(lesson["students"]) for lesson in assigned if lesson["lesson_type"] == "group"]
+    return {
+        "placed": sum(len(lesson["students"]) for lesson in assigned),
+        "utilization": round(len(booked_hours) / available_hours, 4) if available_hours else 0.0,
+        "mean_group_size": round(sum(group_sizes) / len(group_sizes), 3) if group_sizes else 0.0,
+    }
+
+
+def rank(result: dict) -> tuple:
+    """
+    Orders runs: most students placed, then highest utilization, then largest groups;
+    equal runs go to the lowest seed.
+    """
+    return result["placed"], result["utilization"], result["mean_group_size"], -result["seed"]
+
+
+def best_of(results: List[dict]) -> dict:
+    """
+    Picks the best run (see `rank`) and lists the scores of all runs, by seed.
+    """
+    best = max(results, key=rank)
+    return {
+        "best_seed": best["seed"],
+        "runs": [{key: value for key, value in result.items() if key != "schedule"}
+                 for result in sorted(results, key=lambda result: result["seed"])],
+        **best["schedule"],
+    }
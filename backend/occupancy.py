@@ -0,0 +1,69 @@
+from datetime import time
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# Resolution of instructor occupancy bitmaps: bit q of a day's mask covers minutes [15q, 15q + 15)
+QUARTER_MINUTES = 15
+
+
+class BookingConflict(ValueError):
+    """
+    Raised when a lesson is booked for an instructor who already teaches at that time.
+    """
+
+
+@lru_cache(maxsize=4096)
+def quarter_span(start: time, end: time) -> int:
+    """
+    Returns the bitmask of the quarter-hours a lesson from `start` to `end` occupies
+    (a partly covered quarter counts as occupied): 8:00-8:45 sets bits 32-34.
+    """
+    first = (start.hour * 60 + start.minute) // QUARTER_MINUTES
+    last = -(-(end.hour * 60 + end.minute) // QUARTER_MINUTES)
+    return (1 << last) - (1 << first) if last > first else 0
+
+
+def format_span(mask: int) -> str:
+    """
+    Describes the quarter-hours of a day mask as "HH:MM-HH:MM" runs, e.g. "08:00-08:45".
+    """
+    runs = []
+    quarter = 0
+    while mask >> quarter:
+        if mask >> quarter & 1:
+            start = quarter
+            while mask >> quarter & 1:
+                quarter += 1
+            runs.append(f"{start * QUARTER_MINUTES // 60:02d}:{start * QUARTER_MINUTES % 60:02d}-"
+                        f"{quarter * QUARTER_MINUTES // 60:02d}:{quarter * QUARTER_MINUTES % 60:02d}")
+        else:
+            quarter += 1
+    return ", ".join(runs)
+
+
+def find_conflicts(lessons) -> List[str]:
+    """
+    Post-run validator: rebuilds every instructor's occupancy from `lessons` alone and
+    describes each pair of overlapping lessons. An empty list proves that no instructor
+    teaches two lessons at the same time.
+
+    It does not trust the bitmaps kept while scheduling, so it also catches a code path
+    that created a lesson without booking it.
+    """
+    occupied: Dict[Tuple[str, str], int] = {}
+    booked: Dict[Tuple[str, str], list] = {}
+    conflicts = []
+    for lesson in lessons:
+        if lesson.instructor is None or lesson.start_time is None or lesson.end_time is None:
+            continue
+        key = (lesson.instructor.name, lesson.day)
+        span = quarter_span(lesson.start_time, lesson.end_time)
+        if occupied.get(key, 0) & span:
+            for other in booked[key]:
+                overlap = quarter_span(other.start_time, other.end_time) & span
+                if overlap:
+                    conflicts.append(f"{lesson.instructor.name} on {lesson.day}: lessons {other.lesson_id} and "
+                                     f"{lesson.lesson_id} overlap at {format_span(overlap)}")
+        occupied[key] = occupied.get(key, 0) | span
+        booked.setdefault(key, []).append(lesson)
+    return conflicts
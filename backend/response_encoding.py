@@ -0,0 +1,292 @@
+import gzip
+import os
+import sys
+import time as timer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+import http_cache
+
+# Optional encoders: without them the corresponding media type / content coding is not offered
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed (SWIM_COMPRESS_MIN_BYTES, default 1024)
+compress_min_bytes = int(os.environ.get("SWIM_COMPRESS_MIN_BYTES", "1024"))
+
+# Mid-range levels: the compressed body is cached per state version, but the first request pays for it
+gzip_level = 6
+brotli_quality = 5
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.swim.columnar+json"
+MSGPACK = "application/msgpack"
+COLUMNAR_MSGPACK = "application/vnd.swim.columnar+msgpack"
+
+
+def supported_media_types() -> List[str]:
+    """
+    Lists the response media types this server can produce, preferred first.
+    """
+    media_types = [JSON, COLUMNAR_JSON]
+    if msgpack is not None:
+        media_types += [MSGPACK, COLUMNAR_MSGPACK]
+    return media_types
+
+
+def supported_codings() -> List[str]:
+    """
+    Lists the content codings this server can produce, preferred first.
+    """
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def parse_quality_list(header: Optional[str]) -> List[Tuple[str, float]]:
+    """
+    Parses an Accept / Accept-Encoding header into (value, q) pairs, highest q first
+    (stable, so equal q keeps the client's order).
+    """
+    items = []
+    for part in (header or "").split(","):
+        value, *params = [piece.strip() for piece in part.split(";")]
+        if not value:
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        items.append((value.lower(), quality))
+    return sorted(items, key=lambda item: -item[1])
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Picks the response media type from the Accept header. Wildcards, a missing
+    header and anything unsupported fall back to plain JSON.
+    """
+    supported = supported_media_types()
+    for value, quality in parse_quality_list(accept):
+        if quality <= 0:
+            continue
+        if value == "application/x-msgpack":
+            value = MSGPACK
+        if value in supported:
+            return value
+        if value in ("*/*", "application/*"):
+            return JSON
+    return JSON
+
+
+def negotiate_coding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Picks the content coding from Accept-Encoding (brotli preferred over gzip at equal q),
+    or None for an uncompressed response.
+    """
+    accepted = {value: quality for value, quality in parse_quality_list(accept_encoding)}
+    best = None
+    for coding in supported_codings():
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (coding, quality)
+    return best[0] if best else None
+
+
+def columnar(payload: Dict[str, list]) -> dict:
+    """
+    Converts a payload of record lists (e.g. `/schedule`'s assigned/unassigned lessons
+    or `/students`) into a columnar layout with a shared string table.
+
+    Every string (day, style, lesson type, instructor, student name, "HH:MM" time) is
+    stored once in `strings` and referenced by index. Each record list becomes a table
+    of columns; a nested object (e.g. an availability window) becomes a list of its
+    values, in the field order given by the table's `fields`. Integers in the columns
+    listed in `interned` are string references; other columns (e.g. `lesson_id`) keep
+    their values. Entries that are not record lists (e.g. the schedule's `quality`
+    block) are kept as they are under `values`.
+
+    Layout:
+        {"layout": "columnar", "strings": [...],
+         "tables": {name: {"rows": n, "columns": {column: [values]},
+                           "fields": {column: [field names]}, "interned": [columns]}},
+         "values": {name: value}}  (only if there are such entries)
+    """
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def encode(value, table: dict, column: str):
+        if isinstance(value, str):
+            table["interned"].add(column)
+            index = string_ids.get(value)
+            if index is None:
+                index = string_ids[value] = len(strings)
+                strings.append(value)
+            return index
+        if isinstance(value, list):
+            return [encode(item, table, column) for item in value]
+        if isinstance(value, dict):
+            names = table["fields"].setdefault(column, list(value))
+            return [encode(value.get(name), table, column) for name in names]
+        return value
+
+    tables = {}
+    values = {}
+    for name, rows in payload.items():
+        if not isinstance(rows, list):
+            values[name] = rows
+            continue
+        table = {"rows": len(rows), "columns": {}, "fields": {}, "interned": set()}
+        for column in (list(rows[0]) if rows else []):
+            table["columns"][column] = [encode(row.get(column), table, column) for row in rows]
+        table["interned"] = sorted(table["interned"])
+        tables[name] = table
+    encoded = {"layout": "columnar", "strings": strings, "tables": tables}
+    if values:
+        encoded["values"] = values
+    return encoded
+
+
+def decode_columnar(encoded: dict) -> Dict[str, list]:
+    """
+    Inverse of `columnar` (for clients and tools, e.g. to verify a response).
+    """
+    strings = encoded["strings"]
+
+    def decode(value, interned: bool, fields: Optional[List[str]]):
+        if fields is not None and isinstance(value, list) and len(value) == len(fields) and \
+                not any(isinstance(item, list) for item in value):
+            return {name: decode(item, interned, None) for name, item in zip(fields, value)}
+        if isinstance(value, list):
+            return [decode(item, interned, fields) for item in value]
+        if interned and isinstance(value, int) and not isinstance(value, bool):
+            return strings[value]
+        return value
+
+    payload = {}
+    for name, table in encoded["tables"].items():
+        interned = set(table["interned"])
+        columns = {
+            column: [decode(value, column in interned, table["fields"].get(column)) for value in values]
+            for column, values in table["columns"].items()
+        }
+        payload[name] = [{column: values[row] for column, values in columns.items()}
+                         for row in range(table["rows"])]
+    payload.update(encoded.get("values", {}))
+    return payload
+
+
+def encode_body(payload: dict, media_type: str) -> bytes:
+    """
+    Serializes a payload in one of `supported_media_types()`.
+    """
+    if media_type in (COLUMNAR_JSON, COLUMNAR_MSGPACK):
+        payload = columnar(payload)
+    if media_type in (MSGPACK, COLUMNAR_MSGPACK):
+        return msgpack.packb(payload, use_bin_type=True)
+    return http_cache.json_bytes(payload)
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)  # mtime=0 keeps the ETag stable
+
+
+def negotiated_response(request: Request, json_body: http_cache.Body, json_etag: str,
+                        load_payload: Callable[[], dict], variants: dict, headers: dict = None) -> Response:
+    """
+    Serves a cached JSON response in the representation the client negotiated.
+
+    Each (media type, content coding) variant is encoded and compressed once and
+    stored in `variants`, which the caller must replace whenever the underlying data
+    changes. Every variant has its own ETag, so conditional requests keep working.
+
+    Args:
+        request (Request): The incoming request (Accept, Accept-Encoding, If-None-Match).
+        json_body / json_etag: The cached plain JSON body and its ETag.
+        load_payload (callable): Returns the payload as Python data (for non-JSON media types).
+        variants (dict): Cache {(media type, coding): (coding or None, etag, body)}.
+        headers (dict): Extra response headers.
+    """
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    coding = negotiate_coding(request.headers.get("accept-encoding"))
+    headers = {**(headers or {}), "Vary": "Accept, Accept-Encoding"}
+
+    if media_type == JSON and (coding is None or len(json_body) < compress_min_bytes):
+        return http_cache.conditional_json(request.headers.get("if-none-match"), json_body,
+                                           etag=json_etag, headers=headers)
+
+    key = (media_type, coding)
+    variant = variants.get(key)
+    if variant is None:
+        body = json_body if media_type == JSON else encode_body(load_payload(), media_type)
+        applied = coding if coding is not None and len(body) >= compress_min_bytes else None
+        if applied is not None:
+            body = compress(bytes(body), applied)
+        variant = (applied, http_cache.make_etag(body), body)
+        variants[key] = variant
+
+    applied, etag, body = variant
+    if applied is not None:
+        headers["Content-Encoding"] = applied
+    return http_cache.conditional_json(request.headers.get("if-none-match"), body, etag=etag,
+                                       headers=headers, media_type=media_type)
+
+
+def benchmark(lesson_count: int = 10000, seed: int = 0):
+    """
+    Prints wire size and encode time of every representation of a synthetic
+    schedule with `lesson_count` lessons (half assigned, half unassigned).
+    """
+    import random
+    from test_data import DAYS, LESSON_TYPES, SWIM_STYLES
+
+    rng = random.Random(seed)
+    instructor_names = ["Yoni", "Yotam", "Johnny"]
+    assigned = []
+    for lesson_id in range(lesson_count // 2):
+        hour = rng.randint(8, 19)
+        assigned.append({
+            "lesson_id": lesson_id,
+            "lesson_type": rng.choice(LESSON_TYPES),
+            "swim_style": rng.choice(SWIM_STYLES),
+            "instructor": rng.choice(instructor_names),
+            "students": [f"Student {rng.randrange(lesson_count * 2)}" for _ in range(rng.randint(1, 4))],
+            "day": rng.choice(DAYS),
+            "start_time": f"{hour:02d}:00",
+            "end_time": f"{hour:02d}:45",
+        })
+    unassigned = [{
+        "lesson_id": lesson_id,
+        "lesson_type": rng.choice(LESSON_TYPES),
+        "swim_style": rng.choice(SWIM_STYLES),
+        "students": [f"Student {rng.randrange(lesson_count * 2)}"],
+    } for lesson_id in range(lesson_count // 2, lesson_count)]
+    schedule = {"assigned_lessons": assigned, "unassigned_lessons": unassigned}
+
+    print(f"{'representation':<46} {'bytes':>10} {'vs json':>8} {'encode ms':>10}")
+    baseline = None
+    for media_type in supported_media_types():
+        for coding in [None] + supported_codings():
+            started = timer.perf_counter()
+            body = encode_body(schedule, media_type)
+            if coding is not None:
+                body = compress(body, coding)
+            elapsed = (timer.perf_counter() - started) * 1000
+            baseline = baseline or len(body)
+            label = media_type + (f" + {coding}" if coding else "")
+            print(f"{label:<46} {len(body):>10,} {len(body) / baseline:>8.1%} {elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
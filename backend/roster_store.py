@@ -0,0 +1,263 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import time
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set, Tuple
+
+from models import Student
+
+# "memory" keeps the original process-local roster, "sqlite" persists it to `SWIM_ROSTER_DB`
+roster_backend = os.environ.get("SWIM_ROSTER_BACKEND", "memory")
+roster_db_path = os.environ.get("SWIM_ROSTER_DB", "roster.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    lesson_type TEXT NOT NULL,
+    swim_style TEXT NOT NULL,
+    availability TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_students_lesson_type ON students (lesson_type);
+
+CREATE TABLE IF NOT EXISTS student_styles (
+    student_id INTEGER NOT NULL REFERENCES students (id) ON DELETE CASCADE,
+    style TEXT NOT NULL,
+    PRIMARY KEY (student_id, style)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_student_styles_style ON student_styles (style, student_id);
+
+CREATE TABLE IF NOT EXISTS student_hours (
+    student_id INTEGER NOT NULL REFERENCES students (id) ON DELETE CASCADE,
+    day TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    PRIMARY KEY (student_id, day, hour)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_student_hours_day_hour ON student_hours (day, hour, student_id);
+"""
+
+
+def availability_hours(student: Student) -> Set[Tuple[str, int]]:
+    """
+    Expands a student's availability windows into the (day, hour) slots the scheduler uses.
+
+    Same slots as the expansion in `assign_students_to_slots`: a window 10:00-12:00 covers
+    the 10:00 and 11:00 slots.
+    """
+    return set(student.availability_slots())
+
+
+class SQLiteRoster:
+    """
+    Persistent student roster stored in a local SQLite database (WAL mode).
+
+    Besides the student rows, the availability hours and swim styles of each
+    student are stored in indexed side tables, so scheduling phases can ask for
+    "students of these lesson types who can be placed in at least one open
+    (day, hour, style) bucket" without scanning the roster in Python.
+
+    A single connection is shared across FastAPI worker threads and guarded by a lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS open_buckets "
+                                "(day TEXT NOT NULL, hour INTEGER NOT NULL, style TEXT NOT NULL, "
+                                "PRIMARY KEY (day, hour, style)) WITHOUT ROWID")
+
+    def add(self, student: Student) -> bool:
+        """
+        Inserts a student. Returns False if a student with the same name already exists.
+        """
+        return self.add_many([student]) == 1
+
+    def add_many(self, new_students: Iterable[Student]) -> int:
+        """
+        Inserts many students in a single transaction, skipping existing names.
+
+        Returns:
+            int: Number of students actually inserted.
+        """
+        return sum(self.insert_many(new_students))
+
+    def insert_many(self, new_students: Iterable[Student]) -> List[bool]:
+        """
+        Inserts many students in a single transaction, skipping existing names.
+
+        Returns:
+            list[bool]: For each student, whether it was inserted (False for a duplicate name).
+        """
+        inserted = []
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN")
+            try:
+                for student in new_students:
+                    cursor.execute(
+                        "INSERT OR IGNORE INTO students (name, lesson_type, swim_style, availability) "
+                        "VALUES (?, ?, ?, ?)",
+                        (student.name, student.lesson_type, json.dumps(student.swim_style),
+                         json.dumps(serialize_availability(student.availability))))
+                    if cursor.rowcount == 0:
+                        inserted.append(False)  # Duplicate name
+                        continue
+                    student_id = cursor.lastrowid
+                    cursor.executemany("INSERT OR IGNORE INTO student_styles (student_id, style) VALUES (?, ?)",
+                                       [(student_id, style) for style in student.swim_style])
+                    cursor.executemany("INSERT INTO student_hours (student_id, day, hour) VALUES (?, ?, ?)",
+                                       [(student_id, day, hour) for day, hour in availability_hours(student)])
+                    inserted.append(True)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        return inserted
+
+    def contains(self, name: str) -> bool:
+        with self.lock:
+            row = self.connection.execute("SELECT 1 FROM students WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def count(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def version(self) -> int:
+        """
+        Returns the id of the newest student (0 if empty). The roster only grows, so
+        this changes exactly when a student is added, also from other processes.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM students").fetchone()[0]
+
+    def load_all(self) -> List[Student]:
+        """
+        Loads every stored student in submission order, with availability times parsed.
+        """
+        return self.load_since(0)[0]
+
+    def load_since(self, after_id: int) -> Tuple[List[Student], int]:
+        """
+        Loads the students added after `after_id`, in submission order.
+
+        Returns:
+            tuple: (students, id of the newest loaded student or `after_id` if none).
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, name, lesson_type, swim_style, availability FROM students WHERE id > ? ORDER BY id",
+                (after_id,)).fetchall()
+        loaded = [
+            Student(
+                name=name,
+                lesson_type=lesson_type,
+                swim_style=json.loads(swim_style),
+                availability=deserialize_availability(json.loads(availability)),
+            )
+            for _, name, lesson_type, swim_style, availability in rows
+        ]
+        return loaded, rows[-1][0] if rows else after_id
+
+    def candidate_names(self, lesson_types: List[str], buckets: Iterable[Tuple[str, int, str]]) -> List[str]:
+        """
+        Returns the names of students of the given lesson types who are available in at
+        least one of the given (day, hour, style) buckets and want that style.
+
+        The answer comes from the lesson_type, (day, hour) and style indexes; students
+        that would not enter any bucket are never loaded.
+
+        Args:
+            lesson_types (list[str]): Lesson types of the scheduling phase.
+            buckets (iterable): Open (day, hour, style) buckets, i.e. styles some
+                instructor at that slot can teach.
+
+        Returns:
+            list[str]: Student names in submission order.
+        """
+        placeholders = ", ".join("?" for _ in lesson_types)
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute("DELETE FROM open_buckets")
+            cursor.executemany("INSERT OR IGNORE INTO open_buckets (day, hour, style) VALUES (?, ?, ?)", buckets)
+            rows = cursor.execute(
+                f"""
+                SELECT s.name FROM students s
+                WHERE s.lesson_type IN ({placeholders})
+                  AND EXISTS (
+                      SELECT 1 FROM student_hours h
+                      JOIN open_buckets b ON b.day = h.day AND b.hour = h.hour
+                      JOIN student_styles st ON st.student_id = h.student_id AND st.style = b.style
+                      WHERE h.student_id = s.id)
+                ORDER BY s.id
+                """, list(lesson_types)).fetchall()
+        return [name for (name,) in rows]
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM students")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def serialize_availability(availability: List[dict]) -> List[dict]:
+    """
+    Converts availability windows (of a student or an instructor) to JSON-friendly
+    dictionaries with "HH:MM" strings.
+    """
+    return [
+        {
+            "day": slot["day"],
+            "start": slot["start"].strftime("%H:%M") if not isinstance(slot["start"], str) else slot["start"],
+            "end": slot["end"].strftime("%H:%M") if not isinstance(slot["end"], str) else slot["end"],
+        }
+        for slot in availability
+    ]
+
+
+@lru_cache(maxsize=None)
+def parse_hhmm(value: str) -> time:
+    """
+    Parses a zero-padded "HH:MM" string. Cached, since a roster only uses a few dozen distinct times.
+    """
+    return time.fromisoformat(value)
+
+
+def deserialize_availability(windows: List[dict]) -> List[dict]:
+    """
+    Inverse of `serialize_availability`: parses the "HH:MM" strings back to `datetime.time`.
+    """
+    return [
+        {
+            "day": window["day"],
+            "start": parse_hhmm(window["start"]),
+            "end": parse_hhmm(window["end"]),
+        }
+        for window in windows
+    ]
+
+
+def open_roster() -> Optional[SQLiteRoster]:
+    """
+    Opens the configured roster backend.
+
+    Returns:
+        SQLiteRoster | None: The SQLite roster, or None for the in-memory backend.
+
+    Raises:
+        ValueError: If `SWIM_ROSTER_BACKEND` is not "memory" or "sqlite".
+    """
+    if roster_backend == "memory":
+        return None
+    if roster_backend == "sqlite":
+        return SQLiteRoster(roster_db_path)
+    raise ValueError(f"Unsupported roster backend: {roster_backend}")
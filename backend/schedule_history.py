@@ -0,0 +1,154 @@
+import os
+from collections import deque
+from typing import Dict, List, Optional
+
+# Number of schedule versions (deltas) kept for `/schedule/changes`
+history_limit = int(os.environ.get("SWIM_SCHEDULE_HISTORY", "32"))
+
+
+def lesson_key(lesson: dict) -> str:
+    """
+    Returns the canonical key of a lesson from a `/schedule` response.
+
+    `lesson_id` is positional and shifts whenever an earlier lesson appears or
+    disappears, so it cannot identify a lesson across versions. An instructor
+    teaches at most one lesson per slot, so (day, start, instructor) identifies an
+    assigned lesson; an unassigned entry always holds exactly one student.
+    """
+    if lesson.get("day") is None:
+        return f"unassigned|{lesson['students'][0]}"
+    return f"{lesson['day']}|{lesson['start_time']}|{lesson['instructor']}"
+
+
+def lesson_map(schedule: dict) -> Dict[str, dict]:
+    """
+    Indexes all lessons of a `/schedule` response by `lesson_key`, tagging each with
+    its key and whether it is assigned.
+    """
+    lessons = {}
+    for status in ("assigned_lessons", "unassigned_lessons"):
+        for lesson in schedule[status]:
+            key = lesson_key(lesson)
+            lessons[key] = {**lesson, "lesson_key": key, "assigned": status == "assigned_lessons"}
+    return lessons
+
+
+def same_lesson(old: dict, new: dict) -> bool:
+    """
+    Compares two lessons ignoring the positional `lesson_id`.
+    """
+    return {k: v for k, v in old.items() if k != "lesson_id"} == {k: v for k, v in new.items() if k != "lesson_id"}
+
+
+def diff_lessons(old: Dict[str, dict], new: Dict[str, dict]) -> dict:
+    """
+    Diffs two lesson maps in linear time.
+
+    Returns:
+        dict: {"added": [keys], "removed": [keys], "modified": [keys]}
+    """
+    return {
+        "added": [key for key in new if key not in old],
+        "removed": [key for key in old if key not in new],
+        "modified": [key for key, lesson in new.items() if key in old and not same_lesson(old[key], lesson)],
+    }
+
+
+class ScheduleHistory:
+    """
+    Bounded history of schedule versions, stored as deltas of lesson keys.
+
+    Only the current lesson map is kept in full; each older version is a
+    (previous_version, version, delta) entry. `changes_since` folds the deltas after
+    the requested version, so its cost and its payload scale with the number of
+    changed lessons rather than the size of the schedule.
+    """
+
+    def __init__(self, limit: int = history_limit):
+        self.deltas: deque = deque(maxlen=limit)
+        self.version: Optional[int] = None
+        self.lessons: Dict[str, dict] = {}
+
+    def record(self, version: int, schedule: dict):
+        """
+        Records a newly computed schedule as `version` (ignored if already current).
+        """
+        if version == self.version:
+            return
+        lessons = lesson_map(schedule)
+        if self.version is not None:
+            self.deltas.append((self.version, version, diff_lessons(self.lessons, lessons)))
+        self.version = version
+        self.lessons = lessons
+
+    def known_versions(self) -> List[int]:
+        versions = [previous for previous, _, _ in self.deltas]
+        if self.version is not None:
+            versions.append(self.version)
+        return versions
+
+    def changes_since(self, since: int) -> dict:
+        """
+        Returns the lessons added, removed or modified between version `since` and the
+        current version.
+
+        If `since` is unknown (too old, or never published), the response has
+        `"full_refresh": true` and lists every current lesson as added; the client
+        should then replace its copy instead of patching it.
+        """
+        if self.version is None or since not in self.known_versions():
+            return {
+                "version": self.version,
+                "since": since,
+                "full_refresh": True,
+                "added": list(self.lessons.values()),
+                "removed": [],
+                "modified": [],
+            }
+
+        # For each touched key, remember whether it existed at `since` (the first delta decides)
+        existed_before: Dict[str, bool] = {}
+        for previous, _, delta in self.deltas:
+            if previous < since:
+                continue
+            for key in delta["added"]:
+                existed_before.setdefault(key, False)
+            for key in delta["removed"] + delta["modified"]:
+                existed_before.setdefault(key, True)
+
+        added, removed, modified = [], [], []
+        for key, existed in existed_before.items():
+            exists_now = key in self.lessons
+            if existed and exists_now:
+                modified.append(self.lessons[key])
+            elif existed:
+                removed.append(key)
+            elif exists_now:
+                added.append(self.lessons[key])
+
+        return {
+            "version": self.version,
+            "since": since,
+            "full_refresh": False,
+            "added": added,
+            "removed": removed,
+            "modified": modified,
+        }
+
+    def export(self) -> dict:
+        """
+        Returns the deltas as JSON-compatible data (published for other workers).
+        """
+        return {"version": self.version, "deltas": [list(entry) for entry in self.deltas]}
+
+    @classmethod
+    def from_published(cls, exported: dict, schedule: dict) -> "ScheduleHistory":
+        """
+        Rebuilds a history from `export()` output and the matching current schedule.
+        """
+        history = cls(limit=max(len(exported["deltas"]), 1))
+        history.deltas.extend(tuple(entry) for entry in exported["deltas"])
+        history.version = exported["version"]
+        history.lessons = lesson_map(schedule)
+        return history
+
@@ -0,0 +1,275 @@
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models import Student
+
+# Swim styles in the same order as the per-slot "students" lists of `time_slots`
+STYLES = ["freestyle", "breaststroke", "butterfly", "backstroke"]
+STYLE_BITS = {style: 1 << position for position, style in enumerate(STYLES)}
+
+# Where the binary snapshot is written/mapped. Unset (the default) keeps the index in memory only.
+index_snapshot_path = os.environ.get("SWIM_INDEX_SNAPSHOT")
+
+MAGIC = b"SWIX"
+VERSION = 2
+# magic, version, little-endian flag, slot count, student count, entry count, grid fingerprint
+HEADER = struct.Struct("<4sHHIII32s")
+
+
+def grid_slots(time_slots: dict) -> List[Tuple[str, str, int]]:
+    """
+    Lists the (day, time_str, teachable style mask) of every slot of a freshly
+    initialized `time_slots` grid, in a stable order.
+    """
+    slots = []
+    for day in sorted(time_slots):
+        for time_str in sorted(time_slots[day], key=lambda value: int(value.split(":")[0])):
+            mask = 0
+            for instructor in time_slots[day][time_str]["instructors"]:
+                for style in instructor.swim_style:
+                    mask |= STYLE_BITS.get(style, 0)
+            slots.append((day, time_str, mask))
+    return slots
+
+
+def grid_fingerprint(slots: List[Tuple[str, str, int]]) -> bytes:
+    """
+    Hashes the slot grid. An index is only reused while the instructors produce the same grid.
+    """
+    return hashlib.sha256(json.dumps(slots).encode("utf-8")).digest()
+
+
+class ScheduleIndex:
+    """
+    Precomputed scheduling index: the instructor slot grid plus, for every student,
+    the slot/style buckets their availability expands to.
+
+    Each student maps to a run of uint32 entries `slot_id << 4 | style_mask`, one per
+    canonical availability slot (`Student.availability_slots`) that falls on a grid
+    slot, in the same order as the expansion in `assign_students_to_slots`. A scheduling
+    phase only has to AND each entry with the styles still teachable at that slot.
+
+    The arrays are stored contiguously (CSR layout: `offsets` + `entries`), so a
+    snapshot on disk can be memory-mapped and used without copying. Students
+    submitted after the snapshot are kept in `extra_entries` until the next save.
+
+    Once `attach`ed to a roster, the index also partitions the Student objects by
+    lesson type (`partitions`: lesson type -> (position, student) in index order), so
+    a scheduling phase visits only its own students, with their entries at hand.
+    """
+
+    def __init__(self, slots: List[Tuple[str, str, int]], names: List[str], offsets, entries,
+                 backing: Optional[mmap.mmap] = None):
+        self.slots = slots
+        self.slot_ids = {(day, time_str): slot_id for slot_id, (day, time_str, _) in enumerate(slots)}
+        self.fingerprint = grid_fingerprint(slots)
+        self.names = names
+        self.positions = {name: position for position, name in enumerate(names)}
+        self.offsets = offsets
+        self.entries = entries
+        self.extra_entries: Dict[str, array] = {}
+        self.backing = backing  # Keeps the mmap alive while the memoryviews are in use
+        self.roster = None  # The student collection the partitions were taken from
+        self.partitions: Dict[str, List[Tuple[int, Student]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.names) + len(self.extra_entries)
+
+    def student_entries(self, name: str):
+        """
+        Returns the bucket entries of a student, or None if the student is not indexed.
+        """
+        position = self.positions.get(name)
+        if position is not None:
+            return self.entries[self.offsets[position]:self.offsets[position + 1]]
+        return self.extra_entries.get(name)
+
+    def add_student(self, student: Student):
+        """
+        Indexes a student submitted after the index was built.
+        """
+        if student.name not in self.positions and student.name not in self.extra_entries:
+            position = len(self)
+            self.extra_entries[student.name] = expand_student(student, self.slot_ids)
+            if self.roster is not None:
+                self.partitions.setdefault(student.lesson_type, []).append((position, student))
+
+    def attach(self, roster: Iterable[Student]):
+        """
+        Binds the index to the Student objects of `roster` and partitions them by lesson
+        type. Students of `roster` that are not indexed yet are added as extra entries.
+        """
+        partitions: Dict[str, List[Tuple[int, Student]]] = {}
+        missing = []
+        for student in roster:
+            position = self.positions.get(student.name)
+            if position is None:
+                missing.append(student)
+            else:
+                partitions.setdefault(student.lesson_type, []).append((position, student))
+        for members in partitions.values():
+            members.sort(key=itemgetter(0))
+
+        self.roster = roster
+        self.partitions = partitions
+        for student in missing:
+            self.add_student(student)
+
+    def adopt_partitions(self, previous: "ScheduleIndex"):
+        """
+        Takes over the roster binding of `previous`, an index with the same students at
+        the same positions (its `merged()` copy or the snapshot it was saved to).
+        """
+        self.roster = previous.roster
+        self.partitions = previous.partitions
+
+    def covers(self, slots: List[Tuple[str, str, int]]) -> bool:
+        """
+        True if every slot of the grid `slots` is indexed, i.e. the grid only lost
+        instructor hours since the index was built (e.g. a term week with a sick day).
+        Entries carry the student's own styles and `live_style_masks` drops slots and
+        styles nobody teaches any more, so such a grid is served without rebuilding.
+        """
+        return all((day, time_str) in self.slot_ids for day, time_str, _ in slots)
+
+    def phase_members(self, lesson_types: List[str]) -> Iterator[Tuple[Student, object]]:
+        """
+        Yields (student, bucket entries) for the attached students of `lesson_types`, in
+        index order, without visiting students of other lesson types.
+        """
+        partitions = [self.partitions[lesson_type] for lesson_type in lesson_types if lesson_type in self.partitions]
+        members = partitions[0] if len(partitions) == 1 else heapq.merge(*partitions, key=itemgetter(0))
+        indexed = len(self.names)
+        offsets, entries = self.offsets, self.entries
+        for position, student in members:
+            if position < indexed:
+                yield student, entries[offsets[position]:offsets[position + 1]]
+            else:
+                yield student, self.extra_entries[student.name]
+
+    def merged(self) -> "ScheduleIndex":
+        """
+        Returns an in-memory index that folds `extra_entries` into the main arrays.
+        """
+        names = list(self.names)
+        offsets = array("I", self.offsets)
+        entries = array("I", self.entries)
+        for name, student_entries in self.extra_entries.items():
+            names.append(name)
+            entries.extend(student_entries)
+            offsets.append(len(entries))
+        index = ScheduleIndex(self.slots, names, offsets, entries)
+        index.adopt_partitions(self)
+        return index
+
+    def save(self, path: str):
+        """
+        Writes the index as a binary snapshot (atomically, via a temporary file).
+
+        Layout: header, JSON slot table, NUL-separated student names, padding to a
+        4-byte boundary, then the `offsets` and `entries` uint32 arrays.
+        """
+        index = self.merged() if self.extra_entries else self
+        slot_table = json.dumps(index.slots).encode("utf-8")
+        name_blob = "\0".join(index.names).encode("utf-8")
+
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as snapshot:
+            snapshot.write(HEADER.pack(MAGIC, VERSION, sys.byteorder == "little", len(index.slots),
+                                       len(index.names), len(index.entries), index.fingerprint))
+            snapshot.write(struct.pack("<II", len(slot_table), len(name_blob)))
+            snapshot.write(slot_table)
+            snapshot.write(name_blob)
+            snapshot.write(b"\0" * (-snapshot.tell() % 4))
+            snapshot.write(array("I", index.offsets).tobytes())
+            snapshot.write(array("I", index.entries).tobytes())
+        os.replace(temporary_path, path)
+
+
+def expand_student(student: Student, slot_ids: Dict[Tuple[str, str], int]) -> array:
+    """
+    Expands a student's availability into bucket entries (see `ScheduleIndex`).
+    """
+    style_mask = 0
+    for style in student.swim_style:
+        style_mask |= STYLE_BITS.get(style, 0)
+
+    entries = array("I")
+    if not style_mask:
+        return entries
+    for day, hour in student.availability_slots():
+        slot_id = slot_ids.get((day, f"{hour}:00"))
+        if slot_id is not None:
+            entries.append(slot_id << 4 | style_mask)
+    return entries
+
+
+def build_index(time_slots: dict, roster: Iterable[Student]) -> ScheduleIndex:
+    """
+    Builds an index for `roster` over a freshly initialized `time_slots` grid.
+    Students get positions (the order scheduling phases visit them in) in `roster` order.
+    """
+    slots = grid_slots(time_slots)
+    slot_ids = {(day, time_str): slot_id for slot_id, (day, time_str, _) in enumerate(slots)}
+    names = []
+    offsets = array("I", [0])
+    entries = array("I")
+    for student in roster:
+        names.append(student.name)
+        entries.extend(expand_student(student, slot_ids))
+        offsets.append(len(entries))
+    return ScheduleIndex(slots, names, offsets, entries)
+
+
+def load_index(path: str, time_slots: dict) -> Optional[ScheduleIndex]:
+    """
+    Memory-maps a snapshot written by `ScheduleIndex.save`.
+
+    Returns None if the file is missing, malformed, written on a machine with a
+    different byte order, or built for a different instructor grid than `time_slots`.
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as snapshot:
+        try:
+            backing = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None  # Empty file
+
+    try:
+        magic, version, little_endian, slot_count, student_count, entry_count, fingerprint = \
+            HEADER.unpack_from(backing, 0)
+        if magic != MAGIC or version != VERSION or bool(little_endian) != (sys.byteorder == "little"):
+            return None
+        if fingerprint != grid_fingerprint(grid_slots(time_slots)):
+            return None
+
+        position = HEADER.size
+        slot_table_size, name_blob_size = struct.unpack_from("<II", backing, position)
+        position += 8
+        slots = [tuple(slot) for slot in json.loads(backing[position:position + slot_table_size])]
+        position += slot_table_size
+        name_blob = backing[position:position + name_blob_size].decode("utf-8")
+        names = name_blob.split("\0") if student_count else []
+        position += name_blob_size
+        position += -position % 4
+
+        view = memoryview(backing)
+        offsets = view[position:position + 4 * (student_count + 1)].cast("I")
+        position += 4 * (student_count + 1)
+        entries = view[position:position + 4 * entry_count].cast("I")
+    except (struct.error, ValueError, UnicodeDecodeError):
+        return None
+
+    if len(slots) != slot_count or len(names) != student_count:
+        return None
+    return ScheduleIndex(slots, names, offsets, entries, backing=backing)
@@ -0,0 +1,40 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class ScheduleLookup:
+    """
+    Hash indexes over one computed schedule, built once per schedule version.
+
+    Each index maps a key straight to the lesson dicts of the `/schedule` response
+    (shared, not copied), so a lookup costs O(size of the result) instead of a scan
+    of every lesson:
+    - `by_instructor`: instructor name -> their lessons, in schedule order
+    - `by_student`: student name -> (status, lesson), status "assigned" or "unassigned"
+    - `by_slot`: (day, start hour) -> lessons starting in that slot
+    """
+
+    def __init__(self, schedule: dict):
+        self.by_instructor: Dict[str, List[dict]] = {}
+        self.by_student: Dict[str, Tuple[str, dict]] = {}
+        self.by_slot: Dict[Tuple[str, int], List[dict]] = {}
+
+        for lesson in schedule["assigned_lessons"]:
+            self.by_instructor.setdefault(lesson["instructor"], []).append(lesson)
+            if lesson["start_time"]:
+                hour = int(lesson["start_time"].split(":")[0])
+                self.by_slot.setdefault((lesson["day"], hour), []).append(lesson)
+            for name in lesson["students"]:
+                self.by_student[name] = ("assigned", lesson)
+
+        for lesson in schedule["unassigned_lessons"]:
+            for name in lesson["students"]:
+                self.by_student[name] = ("unassigned", lesson)
+
+    def instructor_lessons(self, name: str) -> List[dict]:
+        return self.by_instructor.get(name, [])
+
+    def student_lesson(self, name: str) -> Optional[Tuple[str, dict]]:
+        return self.by_student.get(name)
+
+    def slot_lessons(self, day: str, hour: int) -> List[dict]:
+        return self.by_slot.get((day, hour), [])
@@ -0,0 +1,244 @@
+import os
+import sys
+import time as timer
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from models import Instructor, Student
+
+# Attach the `quality` block to every computed schedule (SWIM_SCHEDULE_QUALITY, default on)
+quality_enabled = os.environ.get("SWIM_SCHEDULE_QUALITY", "1") != "0"
+
+GROUP_TYPES = ("group", "flexible_group")
+
+
+class FlowNetwork:
+    """
+    Small max-flow network (Dinic's algorithm) with integer capacities.
+    """
+
+    def __init__(self, node_count: int):
+        self.edges: List[List[int]] = []  # [target, remaining capacity], paired with its reverse edge at index ^ 1
+        self.outgoing: List[List[int]] = [[] for _ in range(node_count)]
+
+    def add_edge(self, source: int, target: int, capacity: int):
+        self.outgoing[source].append(len(self.edges))
+        self.edges.append([target, capacity])
+        self.outgoing[target].append(len(self.edges))
+        self.edges.append([source, 0])
+
+    def max_flow(self, source: int, sink: int) -> int:
+        flow = 0
+        while True:
+            levels = self.levels(source)
+            if levels[sink] < 0:
+                return flow
+            next_edge = [0] * len(self.outgoing)
+            while True:
+                pushed = self.augment(source, sink, levels, next_edge)
+                if not pushed:
+                    break
+                flow += pushed
+
+    def levels(self, source: int) -> List[int]:
+        levels = [-1] * len(self.outgoing)
+        levels[source] = 0
+        pending = deque([source])
+        while pending:
+            node = pending.popleft()
+            for edge in self.outgoing[node]:
+                target, capacity = self.edges[edge]
+                if capacity > 0 and levels[target] < 0:
+                    levels[target] = levels[node] + 1
+                    pending.append(target)
+        return levels
+
+    def augment(self, source: int, sink: int, levels: List[int], next_edge: List[int]) -> int:
+        """
+        Pushes flow along one shortest augmenting path (iterative DFS over the level graph).
+        """
+        path = []  # Edge indices from `source`
+        node = source
+        while True:
+            if node == sink:
+                pushed = min(self.edges[edge][1] for edge in path)
+                for edge in path:
+                    self.edges[edge][1] -= pushed
+                    self.edges[edge ^ 1][1] += pushed
+                return pushed
+            outgoing = self.outgoing[node]
+            while next_edge[node] < len(outgoing):
+                edge = outgoing[next_edge[node]]
+                target, capacity = self.edges[edge]
+                if capacity > 0 and levels[target] == levels[node] + 1:
+                    break
+                next_edge[node] += 1
+            else:
+                if not path:
+                    return 0
+                levels[node] = -1  # Dead end: prune it from this phase
+                node = self.edges[path.pop() ^ 1][0]
+                next_edge[node] += 1
+                continue
+            path.append(edge)
+            node = self.edges[edge][0]
+
+
+def instructor_hours(instructors: List[Instructor]) -> Dict[Tuple[str, int], Dict[str, FrozenSet[str]]]:
+    """
+    Maps every (day, hour) of the slot grid to {instructor name: styles taught}, using
+    the same hour expansion as `initialize_time_slots`.
+    """
+    grid: Dict[Tuple[str, int], Dict[str, FrozenSet[str]]] = {}
+    for instructor in instructors:
+        for window in instructor.availability:
+            for hour in range(window["start"].hour, window["end"].hour):
+                grid.setdefault((window["day"], hour), {})[instructor.name] = frozenset(instructor.swim_style)
+    return grid
+
+
+def upper_bound(students: Iterable[Student], instructors: List[Instructor]) -> Dict[str, int]:
+    """
+    Upper bound on the students any schedule can place, per lesson type, from a
+    relaxation of the scheduler's rules:
+
+    - group / flexible_group: a group lesson takes any number of students, so every
+      student with at least one teachable (day, hour, style) bucket counts.
+    - flexible_private: counts if one of its buckets is shared with a group-type
+      student (the only way a group lesson can exist there to join); the others
+      compete for private capacity below.
+    - private (and the remaining flexible_private): one lesson per instructor-hour,
+      so the bound is the max flow source -> student -> instructor-hour -> sink.
+      Students with the same compatible instructor-hours are merged into one node
+      (capacity = their count), and instructor-hours of the same slot and styles
+      likewise, which keeps the network small for large rosters.
+
+    Any real schedule also satisfies these rules, so it never places more students.
+    """
+    grid = instructor_hours(instructors)
+    slot_styles = {slot: frozenset().union(*taught.values()) for slot, taught in grid.items()}
+
+    bound = {"group": 0, "flexible_group": 0, "private": 0, "flexible_private": 0}
+    group_buckets = set()
+    candidates: List[Tuple[Student, List[Tuple[str, int]]]] = []
+    for student in students:
+        styles = set(student.swim_style)
+        slots = [slot for slot in student.availability_slots() if styles & slot_styles.get(slot, frozenset())]
+        if student.lesson_type in GROUP_TYPES:
+            if slots:
+                bound[student.lesson_type] += 1
+                group_buckets.update((slot, style) for slot in slots for style in styles & slot_styles[slot])
+        elif slots:
+            candidates.append((student, slots))
+
+    classes: Dict[Tuple[str, FrozenSet], int] = {}
+    for student, slots in candidates:
+        styles = set(student.swim_style)
+        if student.lesson_type == "flexible_private" and any((slot, style) in group_buckets
+                                                            for slot in slots for style in styles):
+            bound["flexible_private"] += 1
+            continue
+        hours = frozenset((slot, taught) for slot in slots
+                          for taught in set(grid[slot].values()) if styles & taught)
+        key = (student.lesson_type, hours)
+        classes[key] = classes.get(key, 0) + 1
+
+    capacities: Dict[Tuple, int] = {}
+    for slot, taught in grid.items():
+        for styles in taught.values():
+            capacities[(slot, styles)] = capacities.get((slot, styles), 0) + 1
+
+    # Nodes: 0 source, 1 sink, then student classes, then instructor-hour groups
+    hour_nodes = {key: 2 + len(classes) + position for position, key in enumerate(capacities)}
+    network = FlowNetwork(2 + len(classes) + len(capacities))
+    for key, capacity in capacities.items():
+        network.add_edge(hour_nodes[key], 1, capacity)
+    class_edges = []
+    for position, ((lesson_type, hours), count) in enumerate(classes.items()):
+        node = 2 + position
+        class_edges.append((lesson_type, len(network.edges)))
+        network.add_edge(0, node, count)
+        for key in hours:
+            network.add_edge(node, hour_nodes[key], count)
+    network.max_flow(0, 1)
+
+    for lesson_type, edge in class_edges:
+        bound[lesson_type] += network.edges[edge ^ 1][1]  # Flow on the source edge = its reverse capacity
+    return bound
+
+
+def utilization(schedule: dict, instructors: List[Instructor]) -> Tuple[Dict[str, dict], List[dict]]:
+    """
+    Booked vs. available instructor-hours, per instructor and per (day, hour) slot.
+    A group lesson counts once, however many students it has.
+    """
+    grid = instructor_hours(instructors)
+    booked = {(lesson["instructor"], lesson["day"], int(lesson["start_time"].split(":")[0]))
+              for lesson in schedule["assigned_lessons"] if lesson["instructor"] is not None}
+
+    per_instructor: Dict[str, dict] = {}
+    for (day, hour), taught in grid.items():
+        for name in taught:
+            counts = per_instructor.setdefault(name, {"booked_hours": 0, "available_hours": 0})
+            counts["available_hours"] += 1
+            counts["booked_hours"] += (name, day, hour) in booked
+    for counts in per_instructor.values():
+        counts["utilization"] = round(counts["booked_hours"] / counts["available_hours"], 4)
+
+    per_slot = []
+    for (day, hour), taught in sorted(grid.items(), key=lambda item: (item[0][0], item[0][1])):
+        lessons = sum((name, day, hour) in booked for name in taught)
+        per_slot.append({"day": day, "hour": hour, "instructors": len(taught), "lessons": lessons,
+                         "utilization": round(lessons / len(taught), 4)})
+    return per_instructor, per_slot
+
+
+def report(schedule: dict, students: Iterable[Student], instructors: List[Instructor], conflicts: int = 0) -> dict:
+    """
+    Builds the `quality` block of a schedule: students placed vs. the `upper_bound`,
+    instructor / slot `utilization`, and the number of `instructor_conflicts` found by
+    `occupancy.find_conflicts` (always 0 unless a scheduling phase is broken).
+
+    `gap` is how many more students the best possible schedule could place at most;
+    `unplaceable` students cannot be placed by any schedule with these instructors.
+    """
+    students = list(students)
+    bound = upper_bound(students, instructors)
+    per_instructor, per_slot = utilization(schedule, instructors)
+    placed = sum(len(lesson["students"]) for lesson in schedule["assigned_lessons"])
+    total_bound = sum(bound.values())
+    return {
+        "students": len(students),
+        "placed": placed,
+        "upper_bound": total_bound,
+        "upper_bound_by_lesson_type": bound,
+        "gap": total_bound - placed,
+        "placed_vs_bound": round(placed / total_bound, 4) if total_bound else 1.0,
+        "unplaceable": len(students) - total_bound,
+        "instructor_utilization": per_instructor,
+        "slot_utilization": per_slot,
+        "instructor_conflicts": conflicts,
+    }
+
+
+def benchmark(count: int = 20000, seed: int = 0):
+    """
+    Prints how long the quality report takes next to the scheduling run it describes.
+    """
+    import main
+    from test_data import generate_students
+
+    main.students = set(generate_students(count, seed=seed))
+    main.students_by_name = {student.name: student for student in main.students}
+    started = timer.perf_counter()
+    schedule = main.compute_schedule()
+    scheduled = timer.perf_counter()
+    quality = report(schedule, main.students, main.instructors)
+    reported = timer.perf_counter()
+    print(f"{count} students: schedule {(scheduled - started) * 1000:.0f} ms (incl. quality), "
+          f"quality alone {(reported - scheduled) * 1000:.0f} ms")
+    print({key: value for key, value in quality.items() if key not in ("slot_utilization",)})
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
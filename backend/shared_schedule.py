@@ -0,0 +1,129 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Optional, Tuple
+
+import http_cache
+
+# Directory shared by all uvicorn workers. Unset (the default) keeps the single-process mode.
+shared_directory = os.environ.get("SWIM_SHARED_DIR")
+
+# How often the writer checks the roster for new submissions, in seconds
+publish_interval = float(os.environ.get("SWIM_PUBLISH_INTERVAL", "0.05"))
+
+PUBLISHED_FILE = "published.bin"
+WRITER_LOCK_FILE = "writer.lock"
+MAGIC = b"SWPB"
+# magic, header length; followed by a JSON header
+# {"version": n, "sections": {name: [offset, length]}, "etags": {name: etag}}
+PREFIX = struct.Struct("<4sI")
+
+
+def publish(directory: str, version: int, sections: Dict[str, bytes]):
+    """
+    Publishes an immutable, versioned buffer with pre-serialized response bodies.
+
+    The buffer is written to a temporary file and renamed over `published.bin`, so
+    readers either see the previous complete buffer or the new one. Readers that
+    still map the previous file keep a valid mapping until they switch.
+
+    Args:
+        directory (str): The shared directory.
+        version (int): Roster version the buffer was computed from.
+        sections (dict): Section name -> serialized body (e.g. "schedule" -> JSON bytes).
+    """
+    offsets = {}
+    position = 0
+    for name, body in sections.items():
+        offsets[name] = [position, len(body)]
+        position += len(body)
+    etags = {name: http_cache.make_etag(body) for name, body in sections.items()}
+    header = json.dumps({"version": version, "sections": offsets, "etags": etags}).encode("utf-8")
+
+    temporary_path = os.path.join(directory, f"{PUBLISHED_FILE}.{version}.tmp")
+    with open(temporary_path, "wb") as buffer:
+        buffer.write(PREFIX.pack(MAGIC, len(header)))
+        buffer.write(header)
+        for body in sections.values():
+            buffer.write(body)
+    os.replace(temporary_path, os.path.join(directory, PUBLISHED_FILE))
+
+
+class PublishedReader:
+    """
+    Read side of the published buffer, one per worker process.
+
+    `current()` re-maps the file only when it was replaced (checked with one `stat`
+    call), and hands out memoryview slices of the mapping, which Starlette sends
+    without copying.
+    """
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, PUBLISHED_FILE)
+        self.lock = threading.Lock()
+        self.identity = None  # (inode, mtime) of the mapped file
+        # (version, sections, etags), replaced as a whole so readers never see a mix
+        self.published: Tuple[int, Dict[str, memoryview], Dict[str, str]] = (-1, {}, {})
+        self.backing: Optional[mmap.mmap] = None
+
+    def current(self) -> Tuple[int, Dict[str, memoryview], Dict[str, str]]:
+        """
+        Returns (version, sections, etags) of the latest published buffer, or
+        (-1, {}, {}) if nothing was published yet.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return -1, {}, {}
+
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        if identity != self.identity:
+            with self.lock:
+                if identity != self.identity:
+                    self.remap(identity)
+        return self.published
+
+    def remap(self, identity):
+        with open(self.path, "rb") as buffer:
+            backing = mmap.mmap(buffer.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = PREFIX.unpack_from(backing, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a published schedule buffer")
+        header = json.loads(backing[PREFIX.size:PREFIX.size + header_length])
+        base = PREFIX.size + header_length
+        view = memoryview(backing)
+
+        # Old memoryviews may still be referenced by in-flight responses, so the old
+        # mapping is left for the garbage collector instead of being closed here.
+        sections = {name: view[base + offset:base + offset + length]
+                    for name, (offset, length) in header["sections"].items()}
+        self.published = (header["version"], sections, header["etags"])
+        self.backing = backing
+        self.identity = identity
+
+
+def acquire_writer_lock(directory: str):
+    """
+    Tries to become the single writer for `directory`.
+
+    Returns:
+        file | None: The open lock file (keep it open to hold the lock), or None if
+        another worker is already the writer.
+
+    Raises:
+        RuntimeError: On platforms without `fcntl` (multi-worker mode is POSIX only).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        raise RuntimeError("Multi-worker mode (SWIM_SHARED_DIR) requires a POSIX platform")
+
+    lock_file = open(os.path.join(directory, WRITER_LOCK_FILE), "a+")
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
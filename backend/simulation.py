@@ -0,0 +1,171 @@
+import asyncio
+import os
+import pickle
+import threading
+import time as timer
+from typing import Dict, List, Tuple
+
+import admission_queue
+import batch_schedule
+import tenants
+from models import Instructor, SimulationVariant
+from roster_store import parse_hhmm, serialize_availability
+
+# Worker processes for `/simulate` scenarios (SWIM_SIMULATION_PROCESSES), started on the first request
+simulation_processes = int(os.environ.get("SWIM_SIMULATION_PROCESSES", str(min(4, os.cpu_count() or 1))))
+
+# Most variants one `/simulate` request may ask for (SWIM_SIMULATION_MAX_VARIANTS)
+max_variants = int(os.environ.get("SWIM_SIMULATION_MAX_VARIANTS", "16"))
+
+
+def instructor_records(instructors: List[Instructor]) -> List[dict]:
+    """
+    Returns independent, JSON-friendly copies of `instructors` that variants can edit.
+    """
+    return [
+        {"name": instructor.name, "swim_style": list(instructor.swim_style),
+         "availability": serialize_availability(instructor.availability)}
+        for instructor in instructors
+    ]
+
+
+def apply_variant(base: List[dict], variant: SimulationVariant) -> List[dict]:
+    """
+    Applies a what-if variant to the instructor records `base` (which are not modified).
+
+    Raises:
+        ValueError: If the variant names an instructor that does not exist (or already exists, when hiring).
+    """
+    records = instructor_records(variant.instructors) if variant.instructors is not None else \
+        [{**record, "availability": list(record["availability"])} for record in base]
+    by_name = {record["name"]: record for record in records}
+
+    for name in variant.remove_instructors:
+        if name not in by_name:
+            raise ValueError(f"Variant {variant.name}: no instructor named {name} to remove")
+        records.remove(by_name.pop(name))
+
+    for window in variant.add_availability:
+        record = by_name.get(window.instructor)
+        if record is None:
+            raise ValueError(f"Variant {variant.name}: no instructor named {window.instructor}")
+        record["availability"].append({"day": window.day, "start": window.start, "end": window.end})
+
+    for record in instructor_records(variant.add_instructors):
+        if record["name"] in by_name:
+            raise ValueError(f"Variant {variant.name}: instructor {record['name']} already exists")
+        by_name[record["name"]] = record
+        records.append(record)
+    return records
+
+
+def roster_blob(rows: List[list]) -> bytes:
+    """
+    Serializes a roster snapshot (`main.student_row` rows) once for all scenarios of a request.
+    """
+    return pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class Simulator:
+    """
+    Runs scheduling jobs (what-if scenarios, multi-start runs) on a pool of worker processes.
+
+    Every job rebuilds the roster from the same serialized snapshot inside its
+    worker, so jobs never share Student objects with each other or with the
+    live state, and they run in parallel.
+    """
+
+    def __init__(self, processes: int = simulation_processes):
+        self.processes = processes
+        self.pool = None
+        self.lock = threading.Lock()
+
+    async def run(self, function, jobs: list) -> list:
+        """
+        Runs `function(job)` for every job on the pool (e.g. `run_scenario`).
+
+        Returns:
+            list: The results, in the order of `jobs`.
+        """
+        with self.lock:
+            if self.pool is None:
+                self.pool = batch_schedule.start_pool(self.processes)
+        loop = asyncio.get_running_loop()
+
+        futures = []
+        for job in jobs:
+            future = loop.create_future()
+            self.pool.apply_async(
+                function, (job,),
+                callback=lambda result, future=future: loop.call_soon_threadsafe(
+                    admission_queue.resolve, future, result),
+                error_callback=lambda error, future=future: loop.call_soon_threadsafe(
+                    admission_queue.resolve, future, None, error))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+
+
+def roster_state(main, blob: bytes, instructors: list) -> dict:
+    """
+    Worker side: rebuilds a roster snapshot (see `roster_blob`) as a fresh tenant state.
+    """
+    from models import Student
+
+    roster = [
+        Student(name=student_name, lesson_type=lesson_type, swim_style=swim_style,
+                availability=[{"day": day, "start": parse_hhmm(start), "end": parse_hhmm(end)}
+                              for day, start, end in windows])
+        for student_name, lesson_type, swim_style, windows in pickle.loads(blob)
+    ]
+    state = tenants.new_tenant_state(main, instructors)
+    state["students"] = set(roster)
+    state["students_by_name"] = {student.name: student for student in roster}
+    return state
+
+
+def run_scenario(job: Tuple[str, bytes, List[dict]]) -> dict:
+    """
+    Worker side: schedules the roster snapshot with one scenario's instructors.
+    """
+    import main
+
+    name, blob, records = job
+    started = timer.perf_counter()
+    state = roster_state(main, blob, batch_schedule.build_instructors(records))
+    schedule = tenants.with_tenant_state(main, state, lambda: tenants.tenant_schedule(main))
+    return summarize(name, records, schedule, timer.perf_counter() - started)
+
+
+def summarize(name: str, records: List[dict], schedule: dict, elapsed: float) -> dict:
+    lessons_per_instructor: Dict[str, int] = {record["name"]: 0 for record in records}
+    for lesson in schedule["assigned_lessons"]:
+        lessons_per_instructor[lesson["instructor"]] = lessons_per_instructor.get(lesson["instructor"], 0) + 1
+    return {
+        "name": name,
+        "instructors": len(records),
+        "assigned_students": sum(len(lesson["students"]) for lesson in schedule["assigned_lessons"]),
+        "unassigned_students": sum(len(lesson["students"]) for lesson in schedule["unassigned_lessons"]),
+        "assigned_lessons": len(schedule["assigned_lessons"]),
+        "unassigned_lessons": len(schedule["unassigned_lessons"]),
+        "lessons_per_instructor": lessons_per_instructor,
+        "elapsed_ms": round(elapsed * 1000, 3),
+    }
+
+
+def compare(results: List[dict]) -> List[dict]:
+    """
+    Adds each scenario's change in assigned / unassigned students and lessons relative
+    to the first scenario (the baseline).
+    """
+    baseline = results[0]
+    for result in results:
+        result["vs_baseline"] = {
+            key: result[key] - baseline[key]
+            for key in ("assigned_students", "unassigned_students", "assigned_lessons", "unassigned_lessons")
+        }
+    return results
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+# Directory holding the log and its snapshot. Unset (the default) disables the log.
+log_directory = os.environ.get("SWIM_LOG_DIR")
+
+LOG_FILE = "submissions.log"
+SNAPSHOT_FILE = "snapshot.json"
+
+
+class SubmissionLog:
+    """
+    Append-only, fsync'ed log of roster changes with group commit.
+
+    Every record is one JSON line: {"seq": n, "op": ..., **payload}. `append` blocks
+    until its record is on disk, but a single writer thread flushes everything that
+    queued up while the previous fsync was running. Concurrent submissions therefore
+    share one fsync instead of paying for one each.
+
+    `compact` writes the current state as a snapshot (first line: {"seq": n}, second
+    line: a JSON array of [op, payload] pairs) and truncates the log. Recovery reads the snapshot, then replays only log records
+    newer than the snapshot's seq.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.log_path = os.path.join(directory, LOG_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+
+        self.condition = threading.Condition()
+        self.file_lock = threading.Lock()  # Held while writing or swapping the log file
+        self.pending: List[str] = []
+        self.next_seq = self.last_seq_on_disk() + 1
+        self.durable_seq = self.next_seq - 1
+        self.failure: Optional[BaseException] = None
+        self.replayed_log_records = 0
+
+        self.log_file = open(self.log_path, "a", encoding="utf-8")
+        self.writer = threading.Thread(target=self.writer_loop, name="submission-log-writer", daemon=True)
+        self.writer.start()
+
+    def append(self, op: str, payload: dict) -> int:
+        """
+        Appends a record and waits until it is durable.
+
+        Returns:
+            int: The sequence number of the record.
+
+        Raises:
+            OSError: If the writer thread failed to write or fsync the log.
+        """
+        with self.condition:
+            seq = self.next_seq
+            self.next_seq += 1
+            self.pending.append(json.dumps({"seq": seq, "op": op, **payload}) + "\n")
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: self.durable_seq >= seq or self.failure is not None)
+            if self.durable_seq < seq:
+                raise OSError(f"Submission log write failed: {self.failure}")
+        return seq
+
+    def writer_loop(self):
+        """
+        Background thread: drains every pending record, writes them with one fsync,
+        then wakes up all the waiting `append` calls.
+        """
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                batch, self.pending = self.pending, []
+                batch_seq = self.next_seq - 1
+
+            try:
+                with self.file_lock:
+                    self.log_file.write("".join(batch))
+                    self.log_file.flush()
+                    os.fsync(self.log_file.fileno())
+            except OSError as error:
+                with self.condition:
+                    self.failure = error
+                    self.condition.notify_all()
+                continue
+
+            with self.condition:
+                self.durable_seq = batch_seq
+                self.condition.notify_all()
+
+    def replay(self) -> Iterator[Tuple[str, dict]]:
+        """
+        Yields (op, payload) for the snapshot followed by every newer log record.
+
+        A torn last line (crash in the middle of a write) is ignored. After the
+        generator is exhausted, `replayed_log_records` tells whether the log held
+        anything beyond the snapshot (i.e. whether compacting is worthwhile).
+        """
+        self.replayed_log_records = 0
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as snapshot:
+                snapshot_seq = json.loads(snapshot.readline())["seq"]
+                # One JSON array for the whole body: a single json.loads is much faster than one per line
+                for op, payload in json.loads(snapshot.readline() or "[]"):
+                    yield op, payload
+
+        for payload in self.read_log():
+            if payload.pop("seq") > snapshot_seq:
+                self.replayed_log_records += 1
+                yield payload.pop("op"), payload
+
+    def read_log(self) -> Iterator[dict]:
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, encoding="utf-8") as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Torn write at the tail; everything before it is intact
+
+    def last_seq_on_disk(self) -> int:
+        """
+        Returns the highest sequence number in the snapshot or the log (0 if both are empty).
+
+        Records are appended in seq order, so only the last intact log line is parsed.
+        """
+        last_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as snapshot:
+                last_seq = json.loads(snapshot.readline())["seq"]
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as log:
+                tail = deque(log, maxlen=2)
+            for line in reversed(tail):
+                try:
+                    return max(last_seq, json.loads(line)["seq"])
+                except json.JSONDecodeError:
+                    continue  # Torn last line
+        return last_seq
+
+    def compact(self, records: List[Tuple[str, dict]]):
+        """
+        Replaces the snapshot with `records` (the full current state) and empties the log.
+
+        Must be called when no `append` is in flight, e.g. right after startup replay.
+        The snapshot is written to a temporary file, fsync'ed and renamed, so a crash
+        leaves either the old or the new snapshot in place.
+        """
+        with self.file_lock:
+            seq = self.next_seq - 1
+            temporary_path = self.snapshot_path + ".tmp"
+            with open(temporary_path, "w", encoding="utf-8") as snapshot:
+                snapshot.write(json.dumps({"seq": seq}) + "\n")
+                snapshot.write(json.dumps(records) + "\n")
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(temporary_path, self.snapshot_path)
+            fsync_directory(self.directory)
+
+            # The snapshot covers everything up to `seq`, so the log can start over
+            self.log_file.close()
+            self.log_file = open(self.log_path, "w", encoding="utf-8")
+            os.fsync(self.log_file.fileno())
+
+
+def fsync_directory(directory: str):
+    """
+    Makes a rename inside `directory` durable (no-op on platforms without directory fds).
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def open_log() -> Optional[SubmissionLog]:
+    """
+    Opens the submission log in `SWIM_LOG_DIR`, or returns None when it is not configured.
+    """
+    if not log_directory:
+        return None
+    return SubmissionLog(log_directory)
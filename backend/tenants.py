@@ -0,0 +1,328 @@
+import asyncio
+import bisect
+import hashlib
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time as timer
+from typing import Dict, List, Optional, Tuple
+
+import admission_queue
+import http_cache
+
+# Worker processes that own the tenants (SWIM_TENANT_WORKERS), started on the first tenant request
+tenant_worker_count = int(os.environ.get("SWIM_TENANT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Points per worker on the hash ring; more points spread tenants more evenly
+ring_replicas = 64
+
+# Settings a tenant worker must not inherit: its tenants live in its own memory only, and only the
+# front process records traffic
+LOCAL_ONLY_SETTINGS = ["SWIM_ROSTER_BACKEND", "SWIM_LOG_DIR", "SWIM_SHARED_DIR", "SWIM_INDEX_SNAPSHOT", "SWIM_WORKERS",
+                       "SWIM_RECORD_TRAFFIC", "SWIM_RECORD_SALT"]
+
+# Module-level state of main.py that belongs to one tenant, swapped in for each request
+TENANT_STATE = [
+    "students", "students_by_name", "instructors", "instructors_changed", "time_slots",
+    "assigned_lessons", "unassigned_lessons", "scheduling_index", "state_version",
+    "response_cache", "schedule_versions", "current_lookup", "feasibility_index",
+]
+
+# (status code, JSON body, ETag or None, extra headers), as sent back by a tenant worker
+TenantResult = Tuple[int, bytes, Optional[str], dict]
+
+
+def ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hashing of tenant ids onto worker numbers.
+
+    Every worker owns `replicas` points on a 64-bit ring; a tenant belongs to the
+    worker of the first point at or after the tenant's hash. Changing the worker
+    count only moves the tenants whose arc changed owner (about 1/N of them), so
+    most tenants keep their warm state.
+    """
+
+    def __init__(self, nodes: List[int], replicas: int = ring_replicas):
+        points = sorted((ring_hash(f"worker-{node}#{replica}"), node) for node in nodes for replica in range(replicas))
+        self.hashes = [point for point, _ in points]
+        self.nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> int:
+        position = bisect.bisect_left(self.hashes, ring_hash(key)) % len(self.hashes)
+        return self.nodes[position]
+
+
+class TenantPool:
+    """
+    Routes tenant operations to a fixed pool of worker processes.
+
+    Each worker owns the tenants the hash ring assigns to it and runs their
+    operations one at a time, so a long scheduling run of one big club only
+    delays the tenants of that worker, and total throughput grows with the
+    number of workers. Requests are handed to a per-worker sender thread and
+    answered through a per-worker receiver thread, so the event loop never
+    blocks on a busy worker. A worker that dies is replaced by its receiver thread.
+    """
+
+    def __init__(self, worker_count: int = tenant_worker_count):
+        self.worker_count = max(1, worker_count)
+        self.ring = HashRing(list(range(self.worker_count)))
+        self.lock = threading.Lock()
+        self.request_ids = itertools.count()
+        self.pending: Dict[int, Tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self.started = False
+        self.closed = False
+        self.processes: list = [None] * self.worker_count
+        self.outboxes: List[Optional[queue.Queue]] = [None] * self.worker_count
+        self.tenants: List[set] = [set() for _ in range(self.worker_count)]
+        self.handled = [0] * self.worker_count
+        self.restarts = [0] * self.worker_count
+
+    def start(self):
+        """
+        Spawns the workers, once. Blocking (every worker is a new interpreter), so
+        the first tenant request runs it in a thread, off the event loop.
+        """
+        with self.lock:
+            if self.started:
+                return
+            for worker in range(self.worker_count):
+                self.start_worker(worker)
+            self.started = True
+        print(f"🏊 Started {self.worker_count} tenant workers")
+
+    def start_worker(self, worker: int):
+        """
+        Spawns worker number `worker` with its sender and receiver threads. Called with `lock` held.
+        """
+        context = multiprocessing.get_context("spawn")  # Workers import a fresh main.py, no inherited state
+        connection, worker_connection = context.Pipe()
+        process = context.Process(target=serve_tenants, args=(worker_connection,),
+                                  name=f"tenant-worker-{worker}", daemon=True)
+        process.start()
+        worker_connection.close()
+        outbox = queue.Queue()
+        threading.Thread(target=self.send_loop, args=(connection, outbox),
+                         name=f"tenant-sender-{worker}", daemon=True).start()
+        threading.Thread(target=self.receive_loop, args=(worker, connection),
+                         name=f"tenant-receiver-{worker}", daemon=True).start()
+        self.processes[worker] = process
+        self.outboxes[worker] = outbox
+
+    def worker_for(self, tenant_id: str) -> int:
+        return self.ring.node_for(tenant_id)
+
+    async def call(self, tenant_id: str, operation: str, argument=None) -> TenantResult:
+        """
+        Runs `operation` for `tenant_id` on the worker that owns the tenant.
+
+        Raises:
+            RuntimeError: If the worker process exited before answering.
+        """
+        if not self.started:
+            await asyncio.to_thread(self.start)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        worker = self.worker_for(tenant_id)
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Tenant workers are shut down")
+            request_id = next(self.request_ids)
+            self.pending[request_id] = (worker, loop, future)
+            if operation == "drop":
+                self.tenants[worker].discard(tenant_id)
+            else:
+                self.tenants[worker].add(tenant_id)
+            outbox = self.outboxes[worker]
+        outbox.put((request_id, tenant_id, operation, argument))
+        return await future
+
+    def send_loop(self, connection, outbox: queue.Queue):
+        while True:
+            message = outbox.get()
+            try:
+                connection.send(message)
+            except OSError:
+                return  # The worker is gone; the receiver fails its requests and replaces it
+            if message is None:
+                return
+
+    def receive_loop(self, worker: int, connection):
+        while True:
+            try:
+                request_id, result = connection.recv()
+            except (EOFError, OSError):
+                break
+            with self.lock:
+                self.handled[worker] += 1
+                _, loop, future = self.pending.pop(request_id)
+            loop.call_soon_threadsafe(admission_queue.resolve, future, result)
+
+        # The worker is gone: fail whatever it still owed and, unless shutting down, replace
+        # it (its tenants start over empty, like after a restart). Requests taken from here
+        # on go to the new worker.
+        with self.lock:
+            lost = [request_id for request_id, (owner, _, _) in self.pending.items() if owner == worker]
+            waiting = [self.pending.pop(request_id) for request_id in lost]
+            self.outboxes[worker].put(None)  # Stops the old sender
+            if not self.closed:
+                print(f"⚠️ Tenant worker {worker} exited; starting a new one")
+                self.tenants[worker] = set()
+                self.restarts[worker] += 1
+                self.start_worker(worker)
+        failure = RuntimeError(f"Tenant worker {worker} exited")
+        for _, loop, future in waiting:
+            loop.call_soon_threadsafe(admission_queue.resolve, future, None, failure)
+
+    def stats(self) -> dict:
+        with self.lock:
+            in_flight = [0] * self.worker_count
+            for worker, _, _ in self.pending.values():
+                in_flight[worker] += 1
+            return {
+                "workers": [
+                    {
+                        "worker": worker,
+                        "pid": self.processes[worker].pid if self.processes[worker] is not None else None,
+                        "tenants": len(self.tenants[worker]),
+                        "in_flight": in_flight[worker],
+                        "handled": self.handled[worker],
+                        "restarts": self.restarts[worker],
+                    }
+                    for worker in range(self.worker_count)
+                ],
+            }
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            outboxes = [outbox for outbox in self.outboxes if outbox is not None]
+            processes = [process for process in self.processes if process is not None]
+        for outbox in outboxes:
+            outbox.put(None)
+        for process in processes:
+            process.join(timeout=5)
+
+
+def serve_tenants(connection):
+    """
+    Entry point of a tenant worker process.
+
+    Imports its own copy of `main` and keeps one state dict per tenant (the
+    `TENANT_STATE` globals). For each request the tenant's state is swapped into
+    `main`, the operation runs with the regular single-process code paths, and the
+    state is swapped back out. Requests are handled strictly one after another.
+    """
+    isolate_worker_settings()
+    import main
+    default_instructors = [instructor.model_copy(deep=True) for instructor in main.instructors]
+    tenants: Dict[str, dict] = {}
+
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+
+        request_id, tenant_id, operation, argument = message
+        try:
+            if operation == "drop":
+                existed = tenants.pop(tenant_id, None) is not None
+                result = reply({"message": f"Tenant {tenant_id} {'removed' if existed else 'does not exist'}."},
+                               200 if existed else 404)
+            else:
+                state = tenants.get(tenant_id)
+                if state is None:
+                    state = tenants[tenant_id] = new_tenant_state(main, default_instructors)
+                result = run_for_tenant(main, state, operation, argument)
+        except Exception as error:  # Report the failure, keep serving the other tenants
+            result = reply({"message": f"Tenant operation {operation} failed: {error}"}, 500)
+        connection.send((request_id, result))
+
+
+def isolate_worker_settings():
+    """
+    Keeps a worker process that schedules several independent rosters from using the
+    front process's roster database, log, shared buffer, index snapshot or traffic recording.
+    Must run before the worker imports `main`.
+    """
+    for name in LOCAL_ONLY_SETTINGS:
+        os.environ.pop(name, None)
+    os.environ["SWIM_TRACE"] = "0"  # Traces are keyed by student name, which rosters may share
+
+
+def new_tenant_state(main, default_instructors) -> dict:
+    """
+    Returns the state of a new tenant: no students, the default instructors.
+    """
+    import schedule_history
+    return {
+        "students": set(),
+        "students_by_name": {},
+        "instructors": [instructor.model_copy(deep=True) for instructor in default_instructors],
+        "instructors_changed": False,
+        "time_slots": {},
+        "assigned_lessons": [],
+        "unassigned_lessons": [],
+        "scheduling_index": None,
+        "state_version": timer.time_ns() // 1000,
+        "response_cache": {},
+        "schedule_versions": schedule_history.ScheduleHistory(),
+        "current_lookup": None,
+        "feasibility_index": None,
+    }
+
+
+def with_tenant_state(main, state: dict, action):
+    """
+    Runs `action()` with the tenant's state swapped into `main`, and keeps whatever
+    `main` rebound (e.g. a rebuilt index or a new state version) in `state`.
+    """
+    for name in TENANT_STATE:
+        setattr(main, name, state[name])
+    try:
+        return action()
+    finally:
+        for name in TENANT_STATE:
+            state[name] = getattr(main, name)
+
+
+def run_for_tenant(main, state: dict, operation: str, argument) -> TenantResult:
+    return with_tenant_state(main, state, lambda: run_operation(main, operation, argument))
+
+
+def run_operation(main, operation: str, argument) -> TenantResult:
+    if operation == "submit_student":
+        return reply(main.commit_submissions([argument])[0])
+    if operation == "len_students":
+        return reply(len(main.students))
+    if operation == "students":
+        _, etag, body, _, _ = main.cached_body("students", main.students_payload)
+        return 200, body, etag, {}
+    if operation == "schedule":
+        version, etag, body, _, _ = main.cached_body("schedule", lambda: tenant_schedule(main),
+                                                     on_build=main.record_schedule)
+        return 200, body, etag, {"X-Schedule-Version": str(version)}
+    if operation == "set_instructors":
+        main.set_instructors(argument)
+        return reply({"message": f"{len(argument)} instructors set."})
+    raise ValueError(f"Unknown tenant operation: {operation}")
+
+
+def tenant_schedule(main) -> dict:
+    # Unlike the single-tenant dev server, an empty tenant never falls back to the test students
+    if not main.students:
+        return {"assigned_lessons": [], "unassigned_lessons": []}
+    return main.compute_schedule()
+
+
+def reply(payload, status_code: int = 200) -> TenantResult:
+    return status_code, http_cache.json_bytes(payload), None, {}
@@ -0,0 +1,227 @@
+import os
+import time as timer
+from collections import OrderedDict
+from datetime import time
+from typing import Dict, List, Tuple
+
+import batch_schedule
+import simulation
+import tenants
+from models import Instructor, TermException
+from roster_store import parse_hhmm
+
+# Most weeks one `/schedule/term` request may plan (SWIM_TERM_MAX_WEEKS)
+max_weeks = int(os.environ.get("SWIM_TERM_MAX_WEEKS", "52"))
+
+# Distinct week schedules kept for later term requests (SWIM_TERM_CACHE_WEEKS)
+cache_weeks = int(os.environ.get("SWIM_TERM_CACHE_WEEKS", "64"))
+
+END_OF_DAY = time(23, 59)
+
+
+def exception_hours(exception: TermException) -> Tuple[time, time]:
+    """
+    Returns the (start, end) an exception removes, widened to whole hours since lessons
+    take whole hours (away 10:30-11:00 means no 10:00 lesson). No times: the whole day.
+
+    Raises:
+        ValueError: If a time is not "HH:MM" or the exception ends before it starts.
+    """
+    try:
+        start = parse_hhmm(exception.start) if exception.start is not None else time(0, 0)
+        end = parse_hhmm(exception.end) if exception.end is not None else END_OF_DAY
+    except ValueError:
+        raise ValueError(f"Week {exception.week}: exception times must be \"HH:MM\"")
+    if end <= start:
+        raise ValueError(f"Week {exception.week}: exception on {exception.day} ends before it starts")
+    end_hour = end.hour + 1 if end.minute else end.hour
+    return time(start.hour, 0), time(end_hour, 0) if end_hour < 24 else END_OF_DAY
+
+
+def cut_window(window: dict, start: time, end: time) -> List[dict]:
+    """
+    Removes `start`-`end` from one availability window, leaving zero, one or two windows.
+    """
+    if window["end"] <= start or window["start"] >= end:
+        return [window]
+    pieces = []
+    if window["start"] < start:
+        pieces.append({"day": window["day"], "start": window["start"], "end": start})
+    if window["end"] > end:
+        pieces.append({"day": window["day"], "start": end, "end": window["end"]})
+    return pieces
+
+
+def week_instructors(instructors: List[Instructor], exceptions: List[TermException]) -> List[Instructor]:
+    """
+    Returns fresh copies of `instructors` with the hours the week's exceptions remove
+    cut out of their availability. An exception without an instructor (a holiday)
+    applies to all of them.
+
+    Raises:
+        ValueError: If an exception names an instructor that does not exist, or has bad times.
+    """
+    names = {instructor.name for instructor in instructors}
+    cuts: Dict[Tuple[str, str], List[Tuple[time, time]]] = {}
+    for exception in exceptions:
+        if exception.instructor is not None and exception.instructor not in names:
+            raise ValueError(f"Week {exception.week}: no instructor named {exception.instructor}")
+        hours = exception_hours(exception)
+        for name in [exception.instructor] if exception.instructor is not None else names:
+            cuts.setdefault((name, exception.day), []).append(hours)
+
+    copies = []
+    for instructor in instructors:
+        windows = [dict(window) for window in instructor.availability]
+        for (name, day), spans in cuts.items():
+            if name != instructor.name:
+                continue
+            for start, end in spans:
+                windows = [piece for window in windows
+                           for piece in (cut_window(window, start, end) if window["day"] == day else [window])]
+        copies.append(Instructor(name=instructor.name, swim_style=list(instructor.swim_style), availability=windows))
+    return copies
+
+
+def availability_key(instructors: List[Instructor]) -> tuple:
+    """
+    Identifies what a week offers: who teaches which styles when. The scheduler is
+    deterministic, so weeks with equal keys (and the same roster) get equal schedules.
+    """
+    return tuple((instructor.name, tuple(instructor.swim_style),
+                  tuple((window["day"], window["start"], window["end"]) for window in instructor.availability))
+                 for instructor in instructors)
+
+
+def numbered_lessons(lessons: List[dict], week: int, first_id: int) -> Tuple[List[dict], int]:
+    """
+    Copies one week's lessons with term-wide ids (from `first_id`) and their `week`.
+
+    Returns:
+        tuple: The lessons and the first id left for the next week.
+    """
+    numbered = [{**lesson, "lesson_id": first_id + lesson["lesson_id"], "week": week} for lesson in lessons]
+    return numbered, first_id + max((lesson["lesson_id"] + 1 for lesson in lessons), default=0)
+
+
+def run_weeks(job: Tuple[bytes, List[dict], List[List[dict]]]) -> List[dict]:
+    """
+    Worker side (simulation pool): schedules the roster snapshot once per week
+    availability of `job`, in order. The scheduling index is built once, on the
+    regular grid, and serves every week (see `ScheduleIndex.covers`).
+    """
+    import main
+
+    blob, regular, weeks = job
+    state = simulation.roster_state(main, blob, batch_schedule.build_instructors(regular))
+
+    def run():
+        main.reset_state()
+        main.ensure_scheduling_index()
+        schedules = []
+        for records in weeks:
+            main.instructors = batch_schedule.build_instructors(records)
+            for student in main.students:
+                student.assigning_score = 0  # Every week starts from the same scores
+            schedules.append(main.compute_schedule())
+        return schedules
+
+    return tenants.with_tenant_state(main, state, run)
+
+
+class TermPlanner:
+    """
+    Schedules a term of N weeks with per-week instructor exceptions.
+
+    A week's schedule only depends on the roster and the availability left after
+    its exceptions, so every distinct week is scheduled once and kept (up to
+    `cache_weeks`, for the current roster version): a 12-week term with two sick
+    days costs about three scheduling runs, and a later request only recomputes
+    the weeks whose exceptions changed.
+
+    The missing weeks run on the simulation process pool against one roster
+    snapshot, as `/simulate` scenarios do, so the live schedule and state are not
+    touched. Each pool job schedules several weeks on one scheduling index.
+    The cache is only used from the event loop.
+    """
+
+    def __init__(self, capacity: int = cache_weeks):
+        self.capacity = capacity
+        self.weeks: "OrderedDict[tuple, dict]" = OrderedDict()  # (roster version, availability key) -> week schedule
+
+    async def plan(self, simulator: simulation.Simulator, instructors: List[Instructor], snapshot: tuple,
+                   weeks: int, exceptions: List[TermException]) -> dict:
+        """
+        Returns the schedule of every week of the term, with lesson ids unique across it.
+
+        Args:
+            snapshot (tuple): (version, count, blob) of the roster, see `main.roster_snapshot`.
+
+        Raises:
+            ValueError: If an exception lies outside the term or does not match an instructor.
+        """
+        started = timer.perf_counter()
+        version, count, blob = snapshot
+        by_week: Dict[int, List[TermException]] = {}
+        for exception in exceptions:
+            if not 1 <= exception.week <= weeks:
+                raise ValueError(f"Exception week {exception.week} is outside the term (weeks 1-{weeks})")
+            by_week.setdefault(exception.week, []).append(exception)
+        staff = {week: week_instructors(instructors, by_week.get(week, [])) for week in range(1, weeks + 1)}
+        keys = {week: (version, availability_key(staff[week])) for week in staff}
+
+        for key in [key for key in self.weeks if key[0] != version]:
+            del self.weeks[key]  # Scheduled for an older roster
+        schedules = {key: self.weeks[key] for key in keys.values() if key in self.weeks}
+        missing = {}
+        for week, key in keys.items():
+            if key not in schedules and key not in missing:
+                missing[key] = staff[week]
+        if missing:
+            schedules.update(await self.schedule_weeks(simulator, blob, instructors, missing))
+
+        self.weeks.update(schedules)
+        for key in keys.values():
+            self.weeks.move_to_end(key)
+        while len(self.weeks) > max(self.capacity, len(schedules)):
+            self.weeks.popitem(last=False)
+
+        term = []
+        next_assigned = next_unassigned = 0
+        computed = set()
+        for week in range(1, weeks + 1):
+            schedule = schedules[keys[week]]
+            assigned, next_assigned = numbered_lessons(schedule["assigned_lessons"], week, next_assigned)
+            unassigned, next_unassigned = numbered_lessons(schedule["unassigned_lessons"], week, next_unassigned)
+            reused = keys[week] not in missing or keys[week] in computed
+            computed.add(keys[week])
+            term.append({
+                "week": week,
+                "exceptions": [exception.model_dump() for exception in by_week.get(week, [])],
+                "reused": reused,
+                **schedule,
+                "assigned_lessons": assigned,
+                "unassigned_lessons": unassigned,
+            })
+        return {
+            "roster_version": version,
+            "students": count,
+            "weeks": term,
+            "computed_weeks": len(missing),
+            "reused_weeks": weeks - len(missing),
+            "elapsed_ms": round((timer.perf_counter() - started) * 1000, 3),
+        }
+
+    @staticmethod
+    async def schedule_weeks(simulator: simulation.Simulator, blob: bytes, instructors: List[Instructor],
+                             missing: Dict[tuple, List[Instructor]]) -> dict:
+        """
+        Schedules the week availabilities of `missing` on the simulation pool, spread
+        over at most one job per pool process.
+        """
+        keys = list(missing)
+        chunks = [keys[first::simulator.processes] for first in range(min(simulator.processes, len(keys)))]
+        regular = simulation.instructor_records(instructors)
+        jobs = [(blob, regular, [simulation.instructor_records(missing[key]) for key in chunk]) for chunk in chunks]
+        results = await simulator.run(run_weeks, jobs)
+        return {key: schedule for chunk, schedules in zip(chunks, results) for key, schedule in zip(chunk, schedules)}
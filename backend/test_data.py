@@ -1,6 +1,13 @@
+import random
 from datetime import time
+from typing import List
 from models import Student
 
+# Value pools used by the synthetic roster generator (same options as the frontend form)
+LESSON_TYPES = ["group", "private", "flexible_group", "flexible_private"]
+SWIM_STYLES = ["freestyle", "breaststroke", "butterfly", "backstroke"]
+DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday"]
+
 test_students = [
 
     # 🎯 Iris: Group lesson; available exactly at the start of Tuesday (8:00–9:00) for breaststroke.
@@ -166,3 +173,50 @@ test_students = [
                   {"day": "Wednesday", "start": time(9, 0), "end": time(10, 0)}
               ]) for i in range(1, 3)],
 ]
+
+
+def generate_students(count: int, seed: int = 0, name_prefix: str = "Synthetic",
+                      repeat_days: bool = False) -> List[Student]:
+    """
+    Generates a reproducible synthetic roster for benchmarks and load tests.
+
+    The same `count` and `seed` always produce the same students, so runs can be
+    compared across builds without any external data.
+
+    Args:
+        count (int): Number of students to generate.
+        seed (int): Seed for the random generator.
+        name_prefix (str): Prefix for the generated (unique) student names.
+        repeat_days (bool): Allow several (possibly overlapping) windows on the same day,
+            as the frontend form does.
+
+    Returns:
+        list[Student]: Students with 1-2 swim styles and 1-3 availability windows
+        between 8:00 and 20:00.
+    """
+    rng = random.Random(seed)
+    roster = []
+    for i in range(count):
+        availability = random_availability(rng, repeat_days)
+        roster.append(Student(
+            name=f"{name_prefix}{seed}_{i}",
+            lesson_type=rng.choice(LESSON_TYPES),
+            swim_style=rng.sample(SWIM_STYLES, rng.randint(1, 2)),
+            availability=availability,
+        ))
+    return roster
+
+
+def random_availability(rng: random.Random, repeat_days: bool = False) -> List[dict]:
+    """
+    Draws the 1-3 availability windows (between 8:00 and 20:00) of one synthetic student,
+    as sent: not merged yet.
+    """
+    availability = []
+    window_count = rng.randint(1, 3)
+    days = rng.choices(DAYS, k=window_count) if repeat_days else rng.sample(DAYS, window_count)
+    for day in days:
+        start_hour = rng.randint(8, 18)
+        end_hour = rng.randint(start_hour + 1, min(start_hour + 3, 20))
+        availability.append({"day": day, "start": time(start_hour, 0), "end": time(end_hour, 0)})
+    return availability
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules import each other by flat module name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """
+    TestClient on a freshly started backend (the startup hook clears the roster).
+    Instructors replaced by a test and the student limit are restored afterwards.
+    """
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(main, "instructors", main.instructors)
+    monkeypatch.setattr(main, "instructors_changed", False)
+    monkeypatch.setattr(main, "max_students", 500)
+    with TestClient(main.app) as test_client:
+        yield test_client
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import admission_queue
+import main
+from load_test import student_payload
+from test_data import generate_students
+
+
+def test_burst_is_committed_in_batches_in_order():
+    release = threading.Event()
+    batches = []
+
+    def commit_batch(items):
+        release.wait()
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    queue = admission_queue.AdmissionQueue(commit_batch, capacity=100, max_batch=8)
+
+    async def burst():
+        tasks = [asyncio.ensure_future(queue.submit(item)) for item in range(20)]
+        await asyncio.sleep(0.05)  # Let everything queue up behind the blocked first batch
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(burst()) == [item * 10 for item in range(20)]
+    assert [item for batch in batches for item in batch] == list(range(20))
+    assert max(len(batch) for batch in batches) == 8
+    assert queue.stats()["committed"] == 20 and queue.stats()["batches"] == len(batches) < 20
+
+
+def test_full_queue_fails_fast():
+    release = threading.Event()
+    queue = admission_queue.AdmissionQueue(lambda items: release.wait() and items, capacity=2, max_batch=1)
+
+    async def overload():
+        first = asyncio.ensure_future(queue.submit("first"))
+        await asyncio.sleep(0.05)  # The committer is now blocked on "first"
+        waiting = [asyncio.ensure_future(queue.submit(name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+        with pytest.raises(admission_queue.QueueFull) as error:
+            await queue.submit("c")
+        release.set()
+        await asyncio.gather(first, *waiting)
+        return error.value
+
+    error = asyncio.run(overload())
+    assert error.retry_after >= 1
+    assert queue.stats()["rejected"] == 1 and queue.stats()["committed"] == 3
+
+
+def test_failed_batch_fails_its_requests_only():
+    def commit_batch(items):
+        if "bad" in items:
+            raise RuntimeError("disk full")
+        return items
+
+    queue = admission_queue.AdmissionQueue(commit_batch, max_batch=1)
+
+    async def submit_both():
+        with pytest.raises(RuntimeError):
+            await queue.submit("bad")
+        return await queue.submit("good")
+
+    assert asyncio.run(submit_both()) == "good"
+
+
+def test_concurrent_submissions_respect_the_limit(client, monkeypatch):
+    monkeypatch.setattr(main, "max_students", 10)
+    roster = generate_students(15, seed=5)
+    payloads = [student_payload(student) for student in roster] + [student_payload(roster[0])]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        messages = [response.json()["message"]
+                    for response in pool.map(lambda payload: client.post("/submit_student", json=payload), payloads)]
+
+    assert sum(message.endswith("spots available.") for message in messages) == 10
+    assert sum("Maximum student limit" in message for message in messages) + \
+        sum("already in the list" in message for message in messages) == 6
+    assert client.get("/len_students").json() == 10
+    assert len(main.students_by_name) == 10
+
+
+def test_full_admission_queue_answers_429(client, monkeypatch):
+    monkeypatch.setattr(main.admission, "capacity", 0)
+    response = client.post("/submit_student", json=student_payload(generate_students(1)[0]))
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert client.get("/len_students").json() == 0
@@ -0,0 +1,110 @@
+from datetime import time
+
+import pytest
+
+import exact_solver
+import main
+from load_test import student_payload
+from test_data import generate_students
+
+
+@pytest.fixture
+def exact_mode(monkeypatch):
+    monkeypatch.setattr(exact_solver, "exact_enabled", True)
+    monkeypatch.setattr(exact_solver, "exact_time_limit", 1.0)
+
+
+def validate(schedule: dict, roster, instructors):
+    """
+    Checks the scheduler's rules on a schedule: one lesson per instructor per slot, styles and
+    availability respected on both sides, and every student listed exactly once.
+    """
+    by_name = {student.name: student for student in roster}
+    by_instructor = {instructor.name: instructor for instructor in instructors}
+    seen, used = set(), set()
+    for lesson in schedule["assigned_lessons"]:
+        hour = int(lesson["start_time"][:2])
+        slot = (lesson["instructor"], lesson["day"], hour)
+        assert slot not in used
+        used.add(slot)
+        instructor = by_instructor[lesson["instructor"]]
+        assert lesson["swim_style"] in instructor.swim_style
+        assert any(window["day"] == lesson["day"] and window["start"].hour <= hour < window["end"].hour
+                   for window in instructor.availability)
+        for name in lesson["students"]:
+            assert name not in seen
+            seen.add(name)
+            student = by_name[name]
+            if lesson["lesson_type"] == "private":
+                assert len(lesson["students"]) == 1 and lesson["swim_style"] in student.swim_style
+                assert student.lesson_type in ("private", "flexible_private")
+                assert (lesson["day"], hour) in set(student.availability_slots())
+            elif student.lesson_type == "flexible_private":
+                assert any(window["day"] == lesson["day"] and window["start"] <= time(hour) and
+                           time(hour + 1) <= window["end"] for window in student.availability)
+            else:
+                assert student.lesson_type in ("group", "flexible_group") and lesson["swim_style"] in student.swim_style
+                assert (lesson["day"], hour) in set(student.availability_slots())
+    for lesson in schedule["unassigned_lessons"]:
+        for name in lesson["students"]:
+            assert name not in seen
+            seen.add(name)
+    assert seen == set(by_name)
+
+
+@pytest.mark.parametrize("count", [8, 20, 40])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_exact_schedule_is_valid_and_never_worse(count, seed, exact_mode, monkeypatch):
+    roster = generate_students(count, seed=seed)
+    monkeypatch.setattr(main, "students", set(roster))
+    monkeypatch.setattr(main, "students_by_name", {student.name: student for student in roster})
+
+    schedule = main.compute_schedule()
+    stats = schedule["solver"]
+
+    validate(schedule, roster, main.instructors)
+    assert main.occupancy.find_conflicts(main.assigned_lessons) == []
+    placed = sum(len(lesson["students"]) for lesson in schedule["assigned_lessons"])
+    assert (placed, len(schedule["assigned_lessons"])) == (stats["placed"], stats["lessons"])
+    assert (stats["placed"], -stats["lessons"]) >= (stats["greedy_placed"], -stats["greedy_lessons"])
+    assert placed <= schedule["quality"]["upper_bound"]
+
+
+def test_small_roster_is_proven_optimal(exact_mode, monkeypatch):
+    roster = generate_students(8, seed=0)
+    monkeypatch.setattr(main, "students", set(roster))
+    monkeypatch.setattr(main, "students_by_name", {student.name: student for student in roster})
+    assert main.compute_schedule()["solver"]["optimal"]
+
+
+def test_schedule_endpoint_publishes_the_solver_result(client, exact_mode):
+    for student in generate_students(20, seed=3):
+        client.post("/submit_student", json=student_payload(student))
+
+    first = client.get("/schedule")
+    assert first.json()["solver"]["mode"] == "exact"
+    second = client.get("/schedule")
+    assert second.headers["X-Schedule-Version"] == first.headers["X-Schedule-Version"]
+    assert second.json() == first.json()
+
+
+def test_result_is_dropped_when_the_roster_changes_during_the_search(client, exact_mode, monkeypatch):
+    for student in generate_students(20, seed=3):
+        client.post("/submit_student", json=student_payload(student))
+    late_student = generate_students(1, seed=99)[0]
+    solve = exact_solver.solve
+
+    def solve_while_a_student_arrives(*args, **kwargs):
+        # The search runs without the state lock, so a submission can commit meanwhile
+        main.commit_submissions([late_student])
+        return solve(*args, **kwargs)
+
+    monkeypatch.setattr(exact_solver, "solve", solve_while_a_student_arrives)
+    stale = client.get("/schedule").json()
+    assert "solver" not in stale
+    assert late_student.name not in str(stale)
+
+    monkeypatch.setattr(exact_solver, "solve", solve)
+    current = client.get("/schedule").json()
+    assert "solver" in current
+    assert late_student.name in str(current)
@@ -0,0 +1,38 @@
+def prospective(lesson_type, styles, day, start, end, name="Prospect"):
+    return {"name": name, "lesson_type": lesson_type, "swim_style": styles,
+            "availability": [{"day": day, "start": start, "end": end}]}
+
+
+def test_covered_window_is_feasible(client):
+    result = client.post("/feasibility", json=prospective("group", ["breaststroke"], "Tuesday", "08:00", "09:00")).json()
+    assert result["feasible"]
+    assert {"day": "Tuesday", "hour": 8, "start_time": "08:00", "instructor": "Yoni",
+            "swim_style": "breaststroke"} in result["options"]
+    assert all(option["swim_style"] == "breaststroke" for option in result["options"])
+
+
+def test_uncovered_window_is_infeasible(client):
+    # Nobody teaches on Monday morning
+    result = client.post("/feasibility", json=prospective("private", ["freestyle"], "Monday", "08:00", "10:00")).json()
+    assert not result["feasible"]
+    assert result["options"] == [] and result["joinable_lessons"] == []
+
+
+def test_precheck_does_not_submit(client):
+    client.post("/feasibility", json=prospective("group", ["breaststroke"], "Tuesday", "08:00", "09:00"))
+    assert client.get("/len_students").json() == 0
+
+
+def test_flexible_private_lists_joinable_group_lessons(client):
+    response = client.get("/schedule")
+    group = next(lesson for lesson in response.json()["assigned_lessons"] if lesson["lesson_type"] == "group")
+    student = prospective("flexible_private", [group["swim_style"]], group["day"], group["start_time"],
+                          group["end_time"])
+
+    result = client.post("/feasibility", json=student).json()
+    assert group in result["joinable_lessons"]
+    assert result["schedule_version"] == int(response.headers["X-Schedule-Version"])
+
+    # Only flexible_private students are merged into group lessons
+    student["lesson_type"] = "private"
+    assert client.post("/feasibility", json=student).json()["joinable_lessons"] == []
@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+
+import pytest
+
+import load_test
+import main
+from latency_stats import percentile
+
+
+def test_parse_mix():
+    assert load_test.parse_mix("submit_student=4, schedule=1") == {"submit_student": 4, "schedule": 1}
+    with pytest.raises(ValueError):
+        load_test.parse_mix("unknown=1")
+    with pytest.raises(ValueError):
+        load_test.parse_mix("schedule=0")
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.50) == 0.0
+
+
+@pytest.fixture(autouse=True)
+def keep_student_limit(monkeypatch):
+    # An in-process run overrides `main.max_students`
+    monkeypatch.setattr(main, "max_students", main.max_students)
+
+
+def test_in_process_load_run_has_no_errors():
+    args = argparse.Namespace(url=None, mix=None, students=40, seed=1, max_students=500,
+                              requests=120, concurrency=8, timeout=30.0)
+    report = asyncio.run(load_test.main_async(args))
+
+    assert report["total"]["requests"] == 120
+    assert report["total"]["error_rate"] == 0.0
+    assert set(report["endpoints"]) <= set(load_test.DEFAULT_MIX)
+    assert sum(stats["requests"] for stats in report["endpoints"].values()) == 120
+
+
+def test_same_seed_sends_same_traffic():
+    reports = []
+    for _ in range(2):
+        args = argparse.Namespace(url=None, mix="submit_student=1,len_students=1", students=20, seed=3,
+                                  max_students=500, requests=40, concurrency=1, timeout=30.0)
+        reports.append(asyncio.run(load_test.main_async(args)))
+    assert {endpoint: stats["requests"] for endpoint, stats in reports[0]["endpoints"].items()} == \
+           {endpoint: stats["requests"] for endpoint, stats in reports[1]["endpoints"].items()}
@@ -0,0 +1,61 @@
+from datetime import time
+
+import pytest
+
+import occupancy
+from load_test import student_payload
+from models import Instructor, Lesson
+from test_data import generate_students
+
+
+def make_instructor(name="Dana"):
+    return Instructor(name=name, swim_style=["freestyle"],
+                      availability=[{"day": "Monday", "start": time(8, 0), "end": time(12, 0)}])
+
+
+def make_lesson(instructor, start, end, day="Monday", lesson_id=0):
+    return Lesson(lesson_id=lesson_id, lesson_type="private", swim_style="freestyle", students=[],
+                  instructor=instructor, day=day, start_time=start, end_time=end)
+
+
+def test_quarter_span():
+    assert occupancy.quarter_span(time(8, 0), time(8, 45)) == 0b111 << 32
+    assert occupancy.quarter_span(time(8, 10), time(8, 20)) == 0b11 << 32  # Partly covered quarters count
+    assert occupancy.quarter_span(time(9, 0), time(9, 0)) == 0
+    assert occupancy.format_span(occupancy.quarter_span(time(8, 0), time(8, 45))) == "08:00-08:45"
+
+
+def test_booking_tracks_occupancy():
+    instructor = make_instructor()
+    instructor.book(make_lesson(instructor, time(8, 0), time(8, 45)))
+    assert not instructor.is_free("Monday", time(8, 30), time(9, 0))
+    assert instructor.is_free("Monday", time(8, 45), time(9, 30))
+    assert instructor.is_free("Tuesday", time(8, 0), time(8, 45))
+
+    # Back to back is fine, an overlap is not
+    instructor.book(make_lesson(instructor, time(8, 45), time(9, 30)))
+    with pytest.raises(occupancy.BookingConflict):
+        instructor.book(make_lesson(instructor, time(9, 0), time(10, 0)))
+    assert len(instructor.lessons) == 2
+
+    instructor.clear_bookings()
+    assert instructor.lessons == [] and instructor.is_free("Monday", time(8, 0), time(12, 0))
+
+
+def test_find_conflicts_does_not_trust_the_bitmaps():
+    dana, eli = make_instructor("Dana"), make_instructor("Eli")
+    lessons = [
+        make_lesson(dana, time(8, 0), time(8, 45), lesson_id=1),
+        make_lesson(dana, time(8, 30), time(9, 15), lesson_id=2),  # Never booked, still caught
+        make_lesson(dana, time(8, 0), time(8, 45), day="Tuesday", lesson_id=3),
+        make_lesson(eli, time(8, 0), time(8, 45), lesson_id=4),
+    ]
+    assert occupancy.find_conflicts(lessons) == ["Dana on Monday: lessons 1 and 2 overlap at 08:30-08:45"]
+    assert occupancy.find_conflicts(lessons[:1] + lessons[2:]) == []
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_schedules_have_no_instructor_conflicts(client, seed):
+    for student in generate_students(120, seed=seed):
+        client.post("/submit_student", json=student_payload(student))
+    assert client.get("/schedule").json()["quality"]["instructor_conflicts"] == 0
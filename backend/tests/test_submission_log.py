@@ -0,0 +1,72 @@
+import pytest
+
+import main
+import submission_log
+from load_test import student_payload
+from test_data import generate_students
+
+SOLO_INSTRUCTOR = {"name": "Solo", "swim_style": ["freestyle", "backstroke"],
+                   "availability": [{"day": "Monday", "start": "08:00", "end": "12:00"}]}
+
+
+@pytest.fixture
+def log_directory(tmp_path, monkeypatch):
+    """
+    Enables the submission log in a temporary directory, as SWIM_LOG_DIR does.
+    """
+    monkeypatch.setattr(main, "durable_log", submission_log.SubmissionLog(str(tmp_path)))
+    return str(tmp_path)
+
+
+def test_append_replay_and_compact(tmp_path):
+    log = submission_log.SubmissionLog(str(tmp_path))
+    assert [log.append("student", {"name": name}) for name in "abc"] == [1, 2, 3]
+    assert [record["name"] for _, record in log.replay()] == ["a", "b", "c"]
+    assert log.replayed_log_records == 3
+
+    log.compact([("students", {"rows": ["a", "b", "c"]})])
+    log.append("student", {"name": "d"})
+    assert list(log.replay()) == [("students", {"rows": ["a", "b", "c"]}), ("student", {"name": "d"})]
+    assert log.replayed_log_records == 1
+
+    # A reopened log continues the sequence after the snapshot and the log tail
+    assert submission_log.SubmissionLog(str(tmp_path)).append("student", {"name": "e"}) == 5
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    log = submission_log.SubmissionLog(str(tmp_path))
+    log.append("student", {"name": "a"})
+    with open(log.log_path, "a", encoding="utf-8") as file:
+        file.write('{"seq": 2, "op": "stud')
+
+    reopened = submission_log.SubmissionLog(str(tmp_path))
+    assert [record["name"] for _, record in reopened.replay()] == ["a"]
+    assert reopened.append("student", {"name": "b"}) == 2
+
+
+def test_recovery_keeps_roster_order_and_instructors(client, log_directory):
+    roster = generate_students(40, seed=7)
+    for student in roster:
+        assert client.post("/submit_student", json=student_payload(student)).status_code == 200
+    assert client.put("/instructors", json=[SOLO_INSTRUCTOR]).status_code == 200
+    before = client.get("/schedule").json()
+    names = [student.name for student in roster]
+
+    # Restart: replays the log, then compacts it into a snapshot
+    main.reset_data_on_startup()
+    assert list(main.students_by_name) == names
+    assert [instructor.name for instructor in main.instructors] == ["Solo"]
+    assert main.durable_log.replayed_log_records > 0
+
+    # Restart again: everything comes from the snapshot
+    main.reset_data_on_startup()
+    assert main.durable_log.replayed_log_records == 0
+    assert list(main.students_by_name) == names
+    assert [instructor.name for instructor in main.instructors] == ["Solo"]
+    assert client.get("/schedule").json()["assigned_lessons"] == before["assigned_lessons"]
+
+
+def test_invalid_instructor_times_are_rejected(client, log_directory):
+    bad = dict(SOLO_INSTRUCTOR, availability=[{"day": "Monday", "start": "8h", "end": "12:00"}])
+    assert client.put("/instructors", json=[bad]).status_code == 400
+    assert list(main.durable_log.replay()) == []
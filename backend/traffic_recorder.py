@@ -0,0 +1,222 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import threading
+import time as timer
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+import response_encoding
+
+# NDJSON file that recorded API traffic is appended to (SWIM_RECORD_TRAFFIC). Unset (the default) records nothing.
+recording_path = os.environ.get("SWIM_RECORD_TRAFFIC")
+
+# Key for the student name pseudonyms (SWIM_RECORD_SALT). Set it when several workers append to one file,
+# otherwise every process picks a random one and the same student gets a different pseudonym per worker.
+recording_salt = os.environ.get("SWIM_RECORD_SALT") or os.urandom(16).hex()
+
+# Endpoints whose exchanges are recorded
+RECORDED_PATHS = {"/submit_student", "/schedule", "/students", "/len_students"}
+
+# Request headers kept in the recording (they choose the response format); all others are dropped
+RECORDED_HEADERS = {"accept"}
+
+# JSON keys holding student names (strings, or lists of them for "students")
+NAME_KEYS = {"name", "student", "students"}
+
+
+@lru_cache(maxsize=65536)
+def pseudonym(name: str) -> str:
+    """
+    Replaces a student name with a stable pseudonym ("student-<12 hex digits>").
+    Pseudonyms are themselves valid names, so a replay can submit them as recorded.
+    """
+    digest = hashlib.blake2b(name.encode("utf-8"), key=recording_salt.encode("utf-8")[:64], digest_size=6)
+    return f"student-{digest.hexdigest()}"
+
+
+def sanitize(value, found: Dict[str, str], mentioned: Dict[str, str]):
+    """
+    Returns `value` (parsed JSON) with student names replaced by their pseudonyms.
+
+    Strings under NAME_KEYS are replaced (and collected into `found`, original ->
+    pseudonym); the names of `mentioned` (those of the request) are also replaced
+    inside any other string, e.g. "Student Dana added.".
+    """
+    if isinstance(value, dict):
+        cleaned = {}
+        for key, item in value.items():
+            if key in NAME_KEYS and isinstance(item, str):
+                cleaned[key] = found.setdefault(item, pseudonym(item))
+            elif key in NAME_KEYS and isinstance(item, list) and all(isinstance(name, str) for name in item):
+                cleaned[key] = [found.setdefault(name, pseudonym(name)) for name in item]
+            else:
+                cleaned[key] = sanitize(item, found, mentioned)
+        return cleaned
+    if isinstance(value, list):
+        return [sanitize(item, found, mentioned) for item in value]
+    if isinstance(value, str):
+        for name, alias in mentioned.items():
+            if name in value:
+                value = value.replace(name, alias)
+    return value
+
+
+def decode_body(body: bytes, content_type: str, content_encoding: Optional[str] = None):
+    """
+    Parses a response body (JSON or MessagePack, after undoing gzip/brotli). Columnar
+    bodies are decoded back to rows: their string table is not under NAME_KEYS, so
+    `sanitize` only finds the names in row form.
+
+    Returns:
+        The parsed value, or {"sha256": ...} of the body when it cannot be parsed here.
+    """
+    if content_encoding == "gzip":
+        body = gzip.decompress(body)
+    elif content_encoding == "br" and response_encoding.brotli is not None:
+        body = response_encoding.brotli.decompress(body)
+    elif content_encoding:
+        return {"sha256": hashlib.sha256(body).hexdigest()}
+    if not body:
+        return None
+    media_type = content_type.split(";")[0].strip()
+    try:
+        if "msgpack" in media_type and response_encoding.msgpack is not None:
+            value = response_encoding.msgpack.unpackb(body, raw=False)
+        elif "json" in media_type:
+            value = json.loads(body)
+        else:
+            return {"sha256": hashlib.sha256(body).hexdigest()}
+        if media_type in (response_encoding.COLUMNAR_JSON, response_encoding.COLUMNAR_MSGPACK):
+            value = response_encoding.decode_columnar(value)
+        return value
+    except (ValueError, KeyError, IndexError, TypeError):
+        # Never record a body that was only partly decoded (a columnar string table holds raw names)
+        return {"sha256": hashlib.sha256(body).hexdigest()}
+
+
+class Recording:
+    """
+    Appends recorded exchanges to an NDJSON file, one JSON object per line:
+
+        {"ts": epoch seconds, "method": "POST", "path": "/submit_student", "query": "",
+         "headers": {"accept": ...}, "body": <request JSON>, "status": 200,
+         "response": <response JSON>, "latency_ms": 1.234}
+
+    Requests only queue the raw bytes; a writer thread parses, pseudonymizes (see
+    `sanitize`) and writes them, so recording adds no JSON work to the request path.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pending: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name="traffic-recorder", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)  # Flush what is queued when the process exits without a shutdown event
+
+    def add(self, exchange: dict):
+        self.pending.put(exchange)
+
+    def write_loop(self):
+        with open(self.path, "a", encoding="utf-8") as file:
+            while True:
+                exchange = self.pending.get()
+                if exchange is None:
+                    return
+                try:
+                    line = json.dumps(self.record(exchange), separators=(",", ":"))
+                except Exception as error:  # A bad body must not stop the recording
+                    print(f"⚠️ Could not record {exchange['method']} {exchange['path']}: {error!r}")
+                    continue
+                file.write(line + "\n")  # One write per line, so several workers can append to one file
+                file.flush()
+
+    @staticmethod
+    def record(exchange: dict) -> dict:
+        names: Dict[str, str] = {}  # Student names in the request, also replaced in free-text responses
+        body = exchange["body"]
+        request_json = sanitize(json.loads(body), names, {}) if body else None
+        response = decode_body(exchange["response"], exchange["content_type"], exchange["content_encoding"])
+        return {
+            "ts": exchange["ts"],
+            "method": exchange["method"],
+            "path": exchange["path"],
+            "query": exchange["query"],
+            "headers": exchange["headers"],
+            "body": request_json,
+            "status": exchange["status"],
+            "response": sanitize(response, {}, names),
+            "latency_ms": exchange["latency_ms"],
+        }
+
+    def close(self):
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join(timeout=5)
+
+
+class TrafficRecorder:
+    """
+    ASGI middleware recording the exchanges of `RECORDED_PATHS` into a `Recording`.
+    Other paths (and the `/events` stream) pass through untouched.
+    """
+
+    def __init__(self, app, recording: Recording, paths: Set[str] = frozenset(RECORDED_PATHS)):
+        self.app = app
+        self.recording = recording
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        started_at = timer.time()
+        started = timer.perf_counter()
+        request_body: List[bytes] = []
+        response_body: List[bytes] = []
+        response_start = {}
+
+        async def recording_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                request_body.append(message.get("body", b""))
+            return message
+
+        async def recording_send(message):
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, recording_receive, recording_send)
+
+        request_headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        response_headers = {key.decode("latin-1").lower(): value.decode("latin-1")
+                            for key, value in response_start.get("headers", [])}
+        self.recording.add({
+            "ts": started_at,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "headers": {key: value for key, value in request_headers.items() if key in RECORDED_HEADERS},
+            "body": b"".join(request_body),
+            "status": response_start.get("status"),
+            "response": b"".join(response_body),
+            "content_type": response_headers.get("content-type", ""),
+            "content_encoding": response_headers.get("content-encoding"),
+            "latency_ms": round((timer.perf_counter() - started) * 1000, 3),
+        })
+
+
+def open_recording() -> Optional[Recording]:
+    """
+    Opens the traffic recording at `SWIM_RECORD_TRAFFIC`, or returns None when it is not configured.
+    """
+    if not recording_path:
+        return None
+    return Recording(recording_path)
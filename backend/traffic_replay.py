@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import json
+import time as timer
+from typing import Dict, List, Optional, Set
+
+import httpx
+
+from latency_stats import percentile
+from traffic_recorder import decode_body
+
+# Response fields that differ between any two runs (timings); not compared
+VOLATILE_KEYS = {"elapsed_ms", "elapsed_s"}
+
+# Lists in set iteration order, which changes with the names (pseudonyms hash differently); compared as multisets
+UNORDERED_KEYS = {"students"}
+
+
+def load_recording(path: str) -> List[dict]:
+    """
+    Reads an NDJSON recording (see `traffic_recorder.Recording`) in completion order:
+    a recorded response saw the effects of the requests that completed before it, so
+    a sequential replay (concurrency 1) sends them in that order.
+
+    Raises:
+        ValueError: If a line is not a JSON object with a method and a path.
+    """
+    exchanges = []
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                exchange = json.loads(line)
+            except ValueError as error:
+                raise ValueError(f"{path}:{number}: not JSON ({error})")
+            if not isinstance(exchange, dict) or "method" not in exchange or "path" not in exchange:
+                raise ValueError(f"{path}:{number}: not a recorded exchange")
+            exchange["line"] = number
+            exchanges.append(exchange)
+    exchanges.sort(key=lambda exchange: exchange.get("ts", 0) + exchange.get("latency_ms", 0.0) / 1000)
+    return exchanges
+
+
+def short(value) -> str:
+    text = json.dumps(value)
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+def first_difference(recorded, replayed, ignore: Set[str], path: str = "$") -> Optional[str]:
+    """
+    Describes the first place where two responses differ ("$.assigned_lessons[3].swim_style:
+    ... -> ..."), or returns None if they are equal apart from the `ignore` keys (and
+    the order of `UNORDERED_KEYS` lists).
+    """
+    if isinstance(recorded, dict) and isinstance(replayed, dict):
+        for key in list(recorded) + [key for key in replayed if key not in recorded]:
+            if key in ignore:
+                continue
+            if key not in replayed:
+                return f"{path}.{key}: missing in the replay"
+            if key not in recorded:
+                return f"{path}.{key}: new in the replay"
+            old, new = recorded[key], replayed[key]
+            if key in UNORDERED_KEYS and isinstance(old, list) and isinstance(new, list):
+                old, new = sorted(old, key=json.dumps), sorted(new, key=json.dumps)
+            difference = first_difference(old, new, ignore, f"{path}.{key}")
+            if difference:
+                return difference
+        return None
+    if isinstance(recorded, list) and isinstance(replayed, list):
+        for position, (old, new) in enumerate(zip(recorded, replayed)):
+            difference = first_difference(old, new, ignore, f"{path}[{position}]")
+            if difference:
+                return difference
+        if len(recorded) != len(replayed):
+            return f"{path}: {len(recorded)} items -> {len(replayed)}"
+        return None
+    if recorded != replayed:
+        return f"{path}: {short(recorded)} -> {short(replayed)}"
+    return None
+
+
+async def replay(client: httpx.AsyncClient, exchanges: List[dict], speed: float, concurrency: int) -> List[dict]:
+    """
+    Sends every recorded request again: each one starts at its recorded offset divided
+    by `speed` (speed 0: no waiting), with at most `concurrency` requests in flight.
+
+    Returns:
+        list: Per exchange, {"latency": seconds, "status", "response", "error"}.
+    """
+    limit = asyncio.Semaphore(concurrency)
+    first = min((exchange.get("ts", 0) for exchange in exchanges), default=0)
+    started = timer.perf_counter()
+
+    async def send(exchange: dict) -> dict:
+        if speed:
+            delay = (exchange.get("ts", first) - first) / speed - (timer.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        url = exchange["path"] + (f"?{exchange['query']}" if exchange.get("query") else "")
+        async with limit:
+            sent = timer.perf_counter()
+            try:
+                response = await client.request(exchange["method"], url, headers=exchange.get("headers") or {},
+                                                json=exchange.get("body"))
+            except httpx.HTTPError as error:
+                return {"latency": timer.perf_counter() - sent, "status": None, "response": None, "error": repr(error)}
+            latency = timer.perf_counter() - sent
+        return {"latency": latency, "status": response.status_code, "error": None,
+                "response": decode_body(response.content, response.headers.get("content-type", ""))}
+
+    return list(await asyncio.gather(*(send(exchange) for exchange in exchanges)))
+
+
+def build_report(exchanges: List[dict], results: List[dict], elapsed: float, ignore: Set[str],
+                 show_diffs: int) -> dict:
+    """
+    Summarizes a replay per endpoint and overall: replayed latency p50/p90/p99/max (ms)
+    next to the recorded p50/p99, errors (no response or 5xx), and how many responses
+    differ from the recorded ones; the first `show_diffs` differences are listed.
+    """
+    by_endpoint: Dict[str, List[tuple]] = {}
+    diffs = []
+    for exchange, result in zip(exchanges, results):
+        if result["status"] != exchange.get("status"):
+            difference = f"status {exchange.get('status')} -> {result['status'] or result['error']}"
+        else:
+            difference = first_difference(exchange.get("response"), result["response"], ignore)
+        if difference and len(diffs) < show_diffs:
+            diffs.append({"line": exchange["line"], "endpoint": exchange["path"], "difference": difference})
+        by_endpoint.setdefault(exchange["path"], []).append((exchange, result, difference))
+
+    def summarize(samples: List[tuple]) -> dict:
+        latencies = sorted(result["latency"] for _, result, _ in samples)
+        recorded = sorted(exchange.get("latency_ms", 0.0) for exchange, _, _ in samples)
+        return {
+            "requests": len(samples),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p90_ms": round(percentile(latencies, 0.90) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            "recorded_p50_ms": round(percentile(recorded, 0.50), 3),
+            "recorded_p99_ms": round(percentile(recorded, 0.99), 3),
+            "errors": sum(1 for _, result, _ in samples if result["status"] is None or result["status"] >= 500),
+            "differences": sum(1 for _, _, difference in samples if difference),
+        }
+
+    all_samples = [sample for samples in by_endpoint.values() for sample in samples]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": summarize(all_samples),
+        "endpoints": {endpoint: summarize(samples) for endpoint, samples in by_endpoint.items()},
+        "diffs": diffs,
+    }
+
+
+def save_replay(path: str, exchanges: List[dict], results: List[dict]):
+    """
+    Writes the replayed responses as a recording (original requests and pacing), so
+    a second build can be replayed against this one's responses.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        for exchange, result in zip(exchanges, results):
+            saved = {key: value for key, value in exchange.items() if key != "line"}
+            saved.update(status=result["status"], response=result["response"],
+                          latency_ms=round(result["latency"] * 1000, 3))
+            file.write(json.dumps(saved, separators=(",", ":")) + "\n")
+
+
+def print_report(report: dict):
+    print(f"\n⏱️  Elapsed: {report['elapsed_s']} s")
+    print(f"{'endpoint':<16}{'requests':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'rec p50':>9}{'rec p99':>9}{'errors':>8}{'diffs':>7}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for endpoint, stats in rows:
+        print(f"{endpoint:<16}{stats['requests']:>9}{stats['p50_ms']:>9}{stats['p90_ms']:>9}{stats['p99_ms']:>9}"
+              f"{stats['max_ms']:>9}{stats['recorded_p50_ms']:>9}{stats['recorded_p99_ms']:>9}"
+              f"{stats['errors']:>8}{stats['differences']:>7}")
+    for diff in report["diffs"]:
+        print(f"  line {diff['line']} {diff['endpoint']}: {diff['difference']}")
+
+
+async def main_async(args) -> dict:
+    exchanges = load_recording(args.recording)
+
+    if args.url:
+        # Replay against a running server started from a clean state, e.g. `uvicorn main:app --port 8000`
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        # Replay against the FastAPI app in-process; start from the same clean state as a fresh server
+        import main
+        main.reset_data_on_startup()
+        if args.max_students:
+            main.max_students = args.max_students
+        # Unhandled app exceptions become 500s so they show up as errors
+        transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=args.timeout)
+
+    async with client:
+        started = timer.perf_counter()
+        results = await replay(client, exchanges, args.speed, args.concurrency)
+        elapsed = timer.perf_counter() - started
+
+    if args.save:
+        save_replay(args.save, exchanges, results)
+    return build_report(exchanges, results, elapsed, VOLATILE_KEYS | set(args.ignore), args.show_diffs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded API traffic (SWIM_RECORD_TRAFFIC) and compare.")
+    parser.add_argument("recording", help="NDJSON recording, or a replay saved with --save.")
+    parser.add_argument("--url", help="Base URL of a running server. Omit to run the app in-process.")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Pacing: 1 keeps the recorded timing, 10 is ten times faster, 0 sends without waiting.")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Requests in flight at once (1 replays strictly in recorded order).")
+    parser.add_argument("--ignore", action="append", default=[], help="Response key to leave out of the diff.")
+    parser.add_argument("--show-diffs", type=int, default=10, help="Differences to list.")
+    parser.add_argument("--save", help="Write the replayed responses here, as a recording for the next build.")
+    parser.add_argument("--max-students", type=int, default=None,
+                        help="In-process only: override main.max_students for the run.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import React, {useEffect, useState} from "react";
 import {Alert, Button, Modal, ScrollView, Text, TouchableOpacity, View} from "react-native";
 import WeekView, {WeekViewEvent} from "react-native-week-view";
 import {API_URL} from "../constants/api";
+import {subscribeToServerEvents} from "../services/serverEvents";
 import {Ionicons} from '@expo/vector-icons';
 
 // Defines a color for each instructor, used to differentiate events on the calendar
@@ -46,6 +47,13 @@ const createFixedWeekDate = (weekday: string, hour: number, minutes: number = 0)
     return eventDate;
 };
 
+/**
+ * Last schedule received from the backend and its ETag.
+ * Kept outside the component so it survives remounts; the backend answers
+ * `304 Not Modified` when the schedule has not changed since.
+ */
+let cachedSchedule: { etag: string | null, version: string | null, data: any } | null = null;
+
 /**
  * Displays the weekly schedule and allows the user to:
  * - View assigned lessons in a calendar view
@@ -59,14 +67,28 @@ const ScheduleScreen: React.FC<{ setShowSchedule: (value: boolean) => void }> =
     const [showAll, setShowAll] = useState(false);
 
     /**
-     * Fetches the schedule from the backend on component mount
-     * and transforms the lesson data into WeekView-compatible events.
+     * Fetches the schedule from the backend on component mount, and again whenever
+     * the event stream reports a new schedule version, and transforms the lesson
+     * data into WeekView-compatible events.
      */
     useEffect(() => {
         const fetchSchedule = async () => {
             try {
-                const response = await fetch(`${API_URL}/schedule`);
-                const data = await response.json();
+                const headers: Record<string, string> = cachedSchedule?.etag ? {"If-None-Match": cachedSchedule.etag} : {};
+                const response = await fetch(`${API_URL}/schedule`, {headers});
+
+                // Reuse the cached schedule if the backend reports it unchanged
+                let data;
+                if (response.status === 304 && cachedSchedule) {
+                    data = cachedSchedule.data;
+                } else {
+                    data = await response.json();
+                    cachedSchedule = {
+                        etag: response.headers.get("ETag"),
+                        version: response.headers.get("X-Schedule-Version"),
+                        data,
+                    };
+                }
 
                 // Transform assigned lessons into events
                 const transformedEvents: WeekViewEvent[] = data.assigned_lessons.map((lesson: any) => {
@@ -101,6 +123,11 @@ const ScheduleScreen: React.FC<{ setShowSchedule: (value: boolean) => void }> =
         };
 
         fetchSchedule();
+        return subscribeToServerEvents(({schedule_version}) => {
+            if (String(schedule_version) !== cachedSchedule?.version) {
+                fetchSchedule();
+            }
+        });
     }, []);
 
     return (
@@ -1,4 +1,4 @@
-import React, {useState} from "react";
+import React, {useEffect, useState} from "react";
 import {Alert, Button, Image, ScrollView, StyleSheet, Text, TextInput, TouchableOpacity, View} from "react-native";
 import {Dropdown} from "react-native-element-dropdown";
 import {API_URL} from "../constants/api";
@@ -41,7 +41,7 @@ const logo = require("../assets/images/cut2.png");
 /**
  * StudentSubmissionScreen allows users to submit new students
  * by entering their name, lesson preferences, swim styles, and availability.
- * Once 30 students are submitted or pressing finish, the app switches to the schedule view.
+ * Once the backend's student limit is reached or pressing finish, the app switches to the schedule view.
  */
 const StudentSubmissionScreen: React.FC<{
     setShowSchedule: (value: boolean) => void;
@@ -57,6 +57,44 @@ const StudentSubmissionScreen: React.FC<{
     const [isTimePickerVisible, setTimePickerVisible] = useState(false);
     const [tempStartTime, setTempStartTime] = useState<string | null>(null);
     const [tempEndTime, setTempEndTime] = useState<string | null>(null);  // ✅ Add end time state
+    const [feasibility, setFeasibility] = useState<{ feasible: boolean, options: any[], joinable_lessons: any[] } | null>(null);
+
+    /**
+     * Live feedback while the form is edited: asks the backend's `/feasibility`
+     * precheck whether the chosen styles and times can be served at all.
+     * Requests are debounced so quick edits send a single request.
+     */
+    useEffect(() => {
+        if (selectedSwimStyles.length === 0 || timeRanges.length === 0) {
+            setFeasibility(null);
+            return;
+        }
+
+        const timer = setTimeout(async () => {
+            try {
+                const response = await fetch(`${API_URL}/feasibility`, {
+                    method: "POST",
+                    headers: {"Content-Type": "application/json"},
+                    body: JSON.stringify({
+                        name: name.trim() || "prospective student",
+                        lesson_type: lessonType || "group",
+                        swim_style: selectedSwimStyles,
+                        availability: timeRanges.map(({day, startTime, endTime}) => ({
+                            day,
+                            start: startTime,
+                            end: endTime,
+                        })),
+                    }),
+                });
+                if (response.ok) {
+                    setFeasibility(await response.json());
+                }
+            } catch (error) {
+                console.error("Error checking feasibility:", error);
+            }
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [lessonType, selectedSwimStyles, timeRanges]);
 
     /**
      * Submits the student form to the backend.
@@ -193,6 +231,16 @@ const StudentSubmissionScreen: React.FC<{
                     ))}
                 </View>
 
+                {/* Live feasibility feedback for the selected styles and times */}
+                {feasibility && (
+                    <Text style={feasibility.feasible ? styles.feasible : styles.infeasible}>
+                        {feasibility.feasible
+                            ? `✅ ${feasibility.options.length} possible lesson slots` +
+                            (feasibility.joinable_lessons.length ? `, ${feasibility.joinable_lessons.length} group lessons to join` : "")
+                            : "⚠️ No instructor teaches these styles at the selected times"}
+                    </Text>
+                )}
+
                 {/* Modal time picker for availability */}
                 {isTimePickerVisible && (
                     <View style={styles.modalContainer}>
@@ -292,6 +340,10 @@ const styles = StyleSheet.create({
     // Text inside day buttons
     dayText: {fontSize: 16},
 
+    // Feasibility feedback below the availability selection
+    feasible: {fontSize: 14, color: "green", marginBottom: 10},
+    infeasible: {fontSize: 14, color: "#b00020", marginBottom: 10},
+
     // Grid layout for checkboxes and day buttons
     checkboxGrid: {
         flexDirection: "row",
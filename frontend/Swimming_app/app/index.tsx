@@ -1,8 +1,9 @@
-import React, {useEffect, useState} from "react";
+import React, {useEffect, useRef, useState} from "react";
 import {View} from "react-native";
 import StudentSubmissionScreen from "./StudentSubmissionScreen";
 import ScheduleScreen from "./ScheduleScreen";
 import {API_URL} from "../constants/api";
+import {subscribeToServerEvents} from "../services/serverEvents";
 
 /**
  * Root component of the application.
@@ -13,10 +14,12 @@ import {API_URL} from "../constants/api";
 const App: React.FC = () => {
     const [studentsCount, setStudentsCount] = useState(0);
     const [showSchedule, setShowSchedule] = useState(false);
+    // Roster limit of the backend (SWIM_MAX_STUDENTS), sent with every `state` event
+    const maxStudents = useRef<number | null>(null);
 
     /**
      * Fetches the current number of submitted students from the backend.
-     * If the number reaches 30, the schedule screen is automatically shown.
+     * If the number reaches the backend's limit, the schedule screen is automatically shown.
      */
     const fetchStudentCount = async () => {
         try {
@@ -24,7 +27,7 @@ const App: React.FC = () => {
             const count = await response.json();
             setStudentsCount(count);
 
-            if (count >= 30) {
+            if (maxStudents.current !== null && count >= maxStudents.current) {
                 setShowSchedule(true);
             }
         } catch (error) {
@@ -32,9 +35,15 @@ const App: React.FC = () => {
         }
     };
 
-    // Fetch the student count once when the app mounts
+    // Keep the student count up to date from the backend's event stream (no polling)
     useEffect(() => {
-        fetchStudentCount();
+        return subscribeToServerEvents(({students, max_students}) => {
+            maxStudents.current = max_students;
+            setStudentsCount(students);
+            if (students >= max_students) {
+                setShowSchedule(true);
+            }
+        });
     }, []);
 
     return (
@@ -0,0 +1,82 @@
+import {API_URL} from "../constants/api";
+
+/**
+ * Payload of the `state` event pushed by the backend on `/events`.
+ */
+export type ServerState = {
+    students: number,
+    schedule_version: number,
+    max_students: number,
+};
+
+/**
+ * XMLHttpRequest keeps the whole response text of the stream, so the connection is
+ * re-opened once this many characters have been parsed.
+ */
+const MAX_STREAM_LENGTH = 1_000_000;
+
+/**
+ * Subscribes to the backend's server-sent events channel (`/events`).
+ *
+ * React Native has no built-in EventSource, so the stream is read with
+ * XMLHttpRequest progress events, which expose the response text as it arrives.
+ * The connection is re-opened after errors, using the `retry` delay sent by the backend,
+ * and right away after `MAX_STREAM_LENGTH` characters (the backend resends the state on connect).
+ *
+ * @param onState - Called with every `state` event (once on connect, then on each change)
+ * @returns A function that closes the subscription
+ */
+export const subscribeToServerEvents = (onState: (state: ServerState) => void): (() => void) => {
+    let xhr: XMLHttpRequest | null = null;
+    let retryDelay = 2000;
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+
+    const connect = () => {
+        let parsedLength = 0;
+        const request = new XMLHttpRequest();
+        xhr = request;
+        request.open("GET", `${API_URL}/events`);
+        request.setRequestHeader("Accept", "text/event-stream");
+
+        // Parse every complete event ("\n\n"-terminated block) received since the last call
+        request.onprogress = () => {
+            const text = request.responseText;
+            let end = text.indexOf("\n\n", parsedLength);
+            while (end !== -1) {
+                const block = text.slice(parsedLength, end);
+                parsedLength = end + 2;
+                let event = "message";
+                let data = "";
+                for (const line of block.split("\n")) {
+                    if (line.startsWith("event:")) event = line.slice(6).trim();
+                    else if (line.startsWith("data:")) data += line.slice(5).trim();
+                    else if (line.startsWith("retry:")) retryDelay = Number(line.slice(6)) || retryDelay;
+                }
+                if (event === "state" && data) {
+                    onState(JSON.parse(data));
+                }
+                end = text.indexOf("\n\n", parsedLength);
+            }
+            if (parsedLength > MAX_STREAM_LENGTH && !closed && xhr === request) {
+                connect();  // Replaces `xhr` first, so the abort below does not schedule a reconnect
+                request.abort();
+            }
+        };
+
+        // The backend keeps the stream open; any end of it means we should reconnect
+        request.onloadend = () => {
+            if (!closed && xhr === request) {  // Not for a stream replaced after MAX_STREAM_LENGTH
+                reconnectTimer = setTimeout(connect, retryDelay);
+            }
+        };
+        request.send();
+    };
+
+    connect();
+    return () => {
+        closed = true;
+        if (reconnectTimer) clearTimeout(reconnectTimer);
+        xhr?.abort();
+    };
+};